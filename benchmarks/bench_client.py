@@ -0,0 +1,196 @@
+"""
+Throughput and latency of the Client methods, signing and decoding under
+1, 16 and 256 concurrent callers, against a local server replaying
+currency.com payloads (see payloads.py):
+
+    python -m benchmarks.bench_client --output results.json
+    python -m benchmarks.bench_client --compare results.json
+
+Every case is run by a pool of threads sharing one Client. Results are
+saved as JSON; --compare reports the cases whose throughput or p99
+latency got worse than a previous run by more than --tolerance.
+"""
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import time
+from threading import Thread
+
+from currencycom.client import (CandlesticksChartInervals, Client,
+                                OrderSide, OrderType)
+from currencycom.simulator import redirect_endpoints
+
+from .bench_signing import API_SECRET, PARAMS
+from .payloads import bodies
+from .replay_server import ReplayServer
+
+CONCURRENCY = (1, 16, 256)
+
+
+def http_cases(client):
+    return {
+        'get_server_time': client.get_server_time,
+        'get_exchange_info': client.get_exchange_info,
+        'get_klines': lambda: client.get_klines(
+            'BTC/USD', CandlesticksChartInervals.MINUTE, limit=1000),
+        'get_order_book': lambda: client.get_order_book('BTC/USD',
+                                                        limit=1000),
+        'get_24h_price_change': client.get_24h_price_change,
+        'get_account_info': client.get_account_info,
+        'new_order': lambda: client.new_order('BTC/USD', OrderSide.BUY,
+                                              OrderType.MARKET, 0.02),
+    }
+
+
+def cpu_cases(client):
+    payloads = bodies()
+    cases = {'sign': lambda: client._get_params_with_signature(**PARAMS)}
+    for path in ('exchangeInfo', 'klines', 'depth', 'order'):
+        cases['decode_' + path] = \
+            lambda body=payloads[path]: client.json_decoder(body)
+    return cases
+
+
+def percentile(ordered, q):
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def measure(fn, concurrency, calls):
+    """
+    Run fn calls times from concurrency threads
+    """
+    latencies = [None] * calls
+    errors = []
+    counter = itertools.count()
+
+    def worker():
+        while True:
+            i = next(counter)
+            if i >= calls:
+                return
+            start = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                errors.append(e)
+                continue
+            latencies[i] = time.perf_counter() - start
+
+    threads = [Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    ordered = sorted(latency for latency in latencies if latency is not None)
+    return {
+        'calls': calls,
+        'errors': len(errors),
+        'seconds': seconds,
+        'throughput': len(ordered) / seconds,
+        'mean_ms': sum(ordered) / len(ordered) * 1e3 if ordered else None,
+        'p50_ms': percentile(ordered, 0.5) * 1e3 if ordered else None,
+        'p99_ms': percentile(ordered, 0.99) * 1e3 if ordered else None,
+    }
+
+
+def run(calls=500, concurrency=CONCURRENCY, only=None, log=print):
+    results = []
+
+    def bench(name, fn, threads, number):
+        if only and not any(pattern in name for pattern in only):
+            return
+        # Open the connections and warm the caches first
+        measure(fn, threads, min(number, threads))
+        result = {'name': name, 'concurrency': threads,
+                  **measure(fn, threads, number)}
+        results.append(result)
+        log('{name:>22} x{concurrency:<4} {throughput:10.1f}/s '
+            'p50 {p50_ms:8.3f} ms  p99 {p99_ms:8.3f} ms  '
+            'errors {errors}'.format(**result))
+
+    with ReplayServer() as url, redirect_endpoints(url):
+        for threads in concurrency:
+            with Client('key', API_SECRET.decode(), pool_maxsize=threads,
+                        pool_block=True) as client:
+                for name, fn in http_cases(client).items():
+                    bench(name, fn, threads, max(calls, threads))
+                for name, fn in cpu_cases(client).items():
+                    bench(name, fn, threads, max(calls * 10, threads))
+    return results
+
+
+def _revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """
+    Cases slower than the baseline by more than tolerance, as messages
+    """
+    previous = {(result['name'], result['concurrency']): result
+                for result in baseline['results']}
+    regressions = []
+    for result in results:
+        before = previous.get((result['name'], result['concurrency']))
+        if before is None or not before['throughput'] \
+                or before['p99_ms'] is None or result['p99_ms'] is None:
+            continue
+        throughput = result['throughput'] / before['throughput']
+        p99 = result['p99_ms'] / before['p99_ms']
+        if throughput < 1 - tolerance or p99 > 1 + tolerance:
+            regressions.append(
+                '{} x{}: throughput {:+.0%}, p99 {:+.0%}'.format(
+                    result['name'], result['concurrency'],
+                    throughput - 1, p99 - 1))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--calls', type=int, default=500,
+                        help='requests per case, ten times more for the '
+                             'signing and decoding cases')
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=list(CONCURRENCY))
+    parser.add_argument('--only', nargs='+',
+                        help='run the cases the names of which contain '
+                             'one of these')
+    parser.add_argument('--output', help='save the results to this file')
+    parser.add_argument('--compare', help='results of a previous run')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='share of throughput or p99 latency lost '
+                             'before a case is reported')
+    args = parser.parse_args(argv)
+
+    results = run(args.calls, args.concurrency, args.only)
+    report = {
+        'revision': _revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION', regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Cost of preparing one signed request.
+
+    python -m benchmarks.bench_signing
+"""
+import hashlib
+import hmac
+import timeit
+from datetime import datetime
+
+from requests.models import RequestEncodingMixin
+
+from currencycom.client import Client, CurrencyComConstants
+
+API_SECRET = b'x' * 64
+
+PARAMS = {
+    'accountId': None,
+    'expireTimestamp': None,
+    'guaranteedStopLoss': False,
+    'leverage': None,
+    'newOrderRespType': 'FULL',
+    'price': 7173.6186,
+    'quantity': 0.001,
+    'recvWindow': None,
+    'side': 'BUY',
+    'stopLoss': None,
+    'symbol': 'BTC/USD',
+    'takeProfit': None,
+    'type': 'LIMIT',
+}
+
+
+def legacy_prepare():
+    """
+    Signing as done before the Signer: datetime timestamp, requests
+    encoder, HMAC keyed on every call and a new header dict.
+    """
+    kwargs = dict(PARAMS)
+    kwargs['timestamp'] = int(datetime.now().timestamp() * 1000)
+    # pylint: disable=no-member
+    body = RequestEncodingMixin._encode_params(kwargs)
+    sign = hmac.new(API_SECRET, bytes(body, 'utf-8'),
+                    hashlib.sha256).hexdigest()
+    params = {'signature': sign, **kwargs}
+    headers = {CurrencyComConstants.HEADER_API_KEY_NAME: 'key'}
+    return params, headers
+
+
+def run(number=20000, repeat=5):
+    client = Client('key', API_SECRET.decode())
+
+    def prepare():
+        return (client._get_params_with_signature(**PARAMS),
+                client._get_header())
+
+    results = {}
+    for name, fn in (('legacy', legacy_prepare), ('signer', prepare)):
+        best = min(timeit.repeat(fn, number=number, repeat=repeat))
+        results[name] = best / number * 1e6
+    return results
+
+
+def main():
+    results = run()
+    for name, microseconds in results.items():
+        print('{:>8}: {:6.2f} us per signed request'.format(name,
+                                                            microseconds))
+    print('speedup: {:.1f}x'.format(results['legacy'] / results['signer']))
+
+
+if __name__ == '__main__':
+    main()
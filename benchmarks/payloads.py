@@ -0,0 +1,168 @@
+"""
+Response bodies served by the replay server, shaped like the responses of
+currency.com and generated from a fixed seed so every run serves the same
+bytes.
+"""
+import json
+import random
+
+SEED = 20200101
+SYMBOLS = 500
+KLINES = 1000
+BOOK_DEPTH = 1000
+FILLS = 20
+START_TIME = 1586953000000
+
+
+def _price(rng, base=100.0):
+    return '{:.8f}'.format(base * (1 + rng.uniform(-0.05, 0.05)))
+
+
+def exchange_info(rng):
+    symbols = []
+    for i in range(SYMBOLS):
+        symbols.append({
+            'symbol': 'SYM{}/USD'.format(i),
+            'name': 'Symbol {}'.format(i),
+            'status': 'TRADING',
+            'baseAsset': 'SYM{}'.format(i),
+            'baseAssetPrecision': 3,
+            'quoteAsset': 'USD',
+            'quoteAssetId': 'USD',
+            'quotePrecision': 3,
+            'orderTypes': ['LIMIT', 'MARKET'],
+            'icebergAllowed': False,
+            'filters': [
+                {'filterType': 'LOT_SIZE', 'minQty': '0.001',
+                 'maxQty': '10000', 'stepSize': '0.001'},
+                {'filterType': 'MIN_NOTIONAL', 'minNotional': '1'},
+            ],
+            'marginTradingAllowed': bool(i % 2),
+            'spotTradingAllowed': True,
+            'exchangeFee': rng.choice([0.1, 0.2]),
+            'tradingFee': rng.choice([0.1, 0.2]),
+            'makerFee': 0.2,
+            'takerFee': 0.2,
+            'assetType': rng.choice(['CRYPTOCURRENCY', 'EQUITY', 'COMMODITY']),
+        })
+    return {
+        'timezone': 'UTC',
+        'serverTime': START_TIME,
+        'rateLimits': [
+            {'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE',
+             'intervalNum': 1, 'limit': 1200},
+            {'rateLimitType': 'ORDERS', 'interval': 'SECOND',
+             'intervalNum': 1, 'limit': 10},
+            {'rateLimitType': 'ORDERS', 'interval': 'DAY',
+             'intervalNum': 1, 'limit': 864000},
+        ],
+        'exchangeFilters': [],
+        'symbols': symbols,
+    }
+
+
+def klines(rng):
+    bars = []
+    close = 7000.0
+    for i in range(KLINES):
+        open_ = close
+        close = open_ * (1 + rng.gauss(0, 0.002))
+        bars.append([
+            START_TIME + i * 60000,
+            '{:.2f}'.format(open_),
+            '{:.2f}'.format(max(open_, close) * (1 + rng.random() * 0.001)),
+            '{:.2f}'.format(min(open_, close) * (1 - rng.random() * 0.001)),
+            '{:.2f}'.format(close),
+            '{:.8f}'.format(rng.random() * 100),
+        ])
+    return bars
+
+
+def order_book(rng):
+    def side(sign):
+        return [['{:.2f}'.format(7000 + sign * (i + 1) * 0.5),
+                 '{:.8f}'.format(rng.random() * 10)]
+                for i in range(BOOK_DEPTH)]
+    return {'lastUpdateId': 1027024, 'asks': side(1), 'bids': side(-1)}
+
+
+def full_order(rng):
+    return {
+        'symbol': 'BTC/USD',
+        'orderId': '00000000-0000-0000-0000-00000002ca43',
+        'clientOrderId': '00000000-0000-0000-0000-00000002ca43',
+        'transactTime': START_TIME,
+        'price': '7183.3881',
+        'origQty': '0.02',
+        'executedQty': '0.02',
+        'cummulativeQuoteQty': None,
+        'status': 'FILLED',
+        'timeInForce': 'FOK',
+        'type': 'MARKET',
+        'side': 'BUY',
+        'fills': [{'price': _price(rng, 7183.0), 'qty': '0.001',
+                   'commission': '0', 'commissionAsset': 'dUSD'}
+                  for _ in range(FILLS)],
+    }
+
+
+def account(rng):
+    return {
+        'makerCommission': 0.2,
+        'takerCommission': 0.2,
+        'buyerCommission': 0.2,
+        'sellerCommission': 0.2,
+        'canTrade': True,
+        'canWithdraw': True,
+        'canDeposit': True,
+        'updateTime': START_TIME,
+        'balances': [{'accountId': str(2376109060084932 + i),
+                      'collateralCurrency': i == 0,
+                      'asset': 'A{}'.format(i),
+                      'free': round(rng.random() * 1000, 8),
+                      'locked': 0.0,
+                      'default': i == 0}
+                     for i in range(20)],
+    }
+
+
+def tickers(rng):
+    return [{
+        'symbol': 'SYM{}/USD'.format(i),
+        'priceChange': _price(rng, 1.0),
+        'priceChangePercent': _price(rng, 1.0),
+        'weightedAvgPrice': _price(rng),
+        'prevClosePrice': _price(rng),
+        'lastPrice': _price(rng),
+        'lastQty': '220.0',
+        'bidPrice': _price(rng),
+        'askPrice': _price(rng),
+        'openPrice': _price(rng),
+        'highPrice': _price(rng),
+        'lowPrice': _price(rng),
+        'volume': '22632',
+        'quoteVolume': '440.0',
+        'openTime': START_TIME,
+        'closeTime': START_TIME + 86400000,
+        'firstId': 0,
+        'lastId': 0,
+        'count': 0,
+    } for i in range(SYMBOLS)]
+
+
+def bodies():
+    """
+    JSON bodies by endpoint path, relative to CurrencyComConstants.BASE_URL
+    """
+    rng = random.Random(SEED)
+    payloads = {
+        'time': {'serverTime': START_TIME},
+        'exchangeInfo': exchange_info(rng),
+        'klines': klines(rng),
+        'depth': order_book(rng),
+        'order': full_order(rng),
+        'account': account(rng),
+        'ticker/24hr': tickers(rng),
+    }
+    return {path: json.dumps(payload).encode()
+            for path, payload in payloads.items()}
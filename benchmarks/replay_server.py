@@ -0,0 +1,77 @@
+"""
+Keep-alive HTTP server replaying the bodies of payloads.bodies(), run in a
+separate process so that it does not compete with the measured client for
+the GIL:
+
+    with ReplayServer() as base_url:
+        ...
+"""
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from currencycom.client import CurrencyComConstants
+
+from .payloads import bodies
+
+BASE_PATH = urlsplit(CurrencyComConstants.BASE_URL).path
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, Nagle's algorithm would
+    # hold the body until the client acknowledges the headers
+    disable_nagle_algorithm = True
+
+    def _reply(self):
+        path = urlsplit(self.path).path
+        body = self.server.bodies.get(path[len(BASE_PATH):])
+        if body is None:
+            self.send_response(404)
+            body = b'{"code": -1121, "msg": "Unknown endpoint"}'
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_DELETE = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for the connections of 256 concurrent callers
+    request_queue_size = 1024
+
+
+def _serve(ports):
+    server = _Server(('127.0.0.1', 0), _ReplayHandler)
+    server.bodies = bodies()
+    ports.put(server.server_port)
+    server.serve_forever()
+
+
+class ReplayServer(object):
+    """
+    Context manager starting the server and returning the base url to
+    use instead of CurrencyComConstants.BASE_URL
+    """
+
+    def __init__(self):
+        self._process = None
+
+    def __enter__(self):
+        ports = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=_serve, args=(ports,),
+                                                daemon=True)
+        self._process.start()
+        port = ports.get(timeout=30)
+        return 'http://127.0.0.1:{}{}'.format(port, BASE_PATH)
+
+    def __exit__(self, *args):
+        self._process.terminate()
+        self._process.join()
@@ -0,0 +1,337 @@
+import asyncio
+from time import perf_counter
+
+import aiohttp
+from requests.models import RequestEncodingMixin
+from yarl import URL
+
+from .client import (CandlesticksChartInervals, Client, CurrencyComConstants,
+                     RawResponse)
+from .concurrency import aiter_completed, aiter_windows, async_gather
+from .exceptions import CurrencyComException, CurrencyComRequestException
+from .session import PoolStats
+
+
+class AsyncClient(Client):
+    """
+    asyncio version of the Client.
+
+    Every public method of the Client is available with the same
+    parameters, validation and signing, but returns a coroutine:
+
+        async with AsyncClient('API_KEY', 'SECRET_KEY') as client:
+            klines = await client.get_klines(
+                'BTC/USD', CandlesticksChartInervals.MINUTE)
+
+    Parameters are validated when the method is called, so invalid
+    values raise ValueError before anything is awaited.
+    """
+
+    def __init__(self, api_key, api_secret,
+                 session: aiohttp.ClientSession = None,
+                 pool_connections: int = 100,
+                 pool_maxsize: int = 0,
+                 timeout=10,
+                 keep_alive: bool = True,
+                 time_sync=None,
+                 rate_limiter=None,
+                 retry_policy=None,
+                 circuit_breakers=None,
+                 json_decoder=None,
+                 raw: bool = False,
+                 metrics=None,
+                 cassette=None):
+        """
+        :param api_key:
+        :param api_secret:
+        :param session: already configured aiohttp session to share between
+        several clients. Pool parameters below are ignored when it is passed.
+        :param pool_connections: total number of simultaneous connections,
+        0 for no limit
+        :param pool_maxsize: number of simultaneous connections per host,
+        0 for no limit
+        :param timeout: seconds, either a single value or a (connect, read)
+        tuple
+        :param keep_alive: reuse connections between requests
+        :param time_sync: TimeSync used to stamp signed requests with the
+        server time and to choose recvWindow when it is not set
+        :param rate_limiter: RateLimiter every request waits for, see
+        enable_rate_limiter
+        :param retry_policy: retries of idempotent requests
+        :param circuit_breakers: per-endpoint circuit breakers
+        :param json_decoder: callable decoding the response bodies from
+        bytes. Default JsonDecoder(), orjson when it is installed
+        :param raw: return every response as a RawResponse with the body
+        left undecoded, see also raw_responses
+        :param metrics: RequestMetrics timing every request, nothing is
+        timed by default. The dns and connect phases are only known for
+        the sessions created by the client.
+        :param cassette: Cassette recording the responses and replaying
+        them for the same requests
+        """
+        self._stats = PoolStats()
+        self._own_session = False
+        super().__init__(api_key, api_secret,
+                         session=session,
+                         pool_connections=pool_connections,
+                         pool_maxsize=pool_maxsize,
+                         timeout=timeout,
+                         keep_alive=keep_alive,
+                         time_sync=time_sync,
+                         rate_limiter=rate_limiter,
+                         retry_policy=retry_policy,
+                         circuit_breakers=circuit_breakers,
+                         json_decoder=json_decoder,
+                         raw=raw,
+                         metrics=metrics,
+                         cassette=cassette)
+
+    def _create_session(self, pool_connections, pool_maxsize, pool_block,
+                        timeout, keep_alive):
+        # aiohttp sessions have to be created inside a running event loop,
+        # see _get_session
+        self._own_session = True
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._timeout = timeout
+        self._keep_alive = keep_alive
+        return None
+
+    def __enter__(self):
+        raise TypeError('Use async with AsyncClient(...) instead')
+
+    def __exit__(self, *args):
+        raise TypeError('Use async with AsyncClient(...) instead')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """
+        Close all pooled connections
+        """
+        if self._own_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def pool_stats(self):
+        return self._stats.as_dict()
+
+    async def enable_rate_limiter(self, rate_limits=None,
+                                  headroom: float = 0.9):
+        """
+        Coroutine version of Client.enable_rate_limiter
+        """
+        if rate_limits is None:
+            rate_limits = (await self.get_exchange_info())['rateLimits']
+        return super().enable_rate_limiter(rate_limits, headroom)
+
+    def _client_timeout(self):
+        if isinstance(self._timeout, tuple):
+            connect, read = self._timeout
+            return aiohttp.ClientTimeout(sock_connect=connect,
+                                         sock_read=read)
+        return aiohttp.ClientTimeout(total=self._timeout)
+
+    def _trace_config(self):
+        stats = self._stats
+
+        async def on_reuse(session, context, params):
+            stats.record(True)
+
+        async def on_start(session, context, params):
+            context.started = perf_counter()
+
+        async def on_dns(session, context, params):
+            sample = context.trace_request_ctx
+            if sample is not None:
+                sample.add('dns', perf_counter() - context.started)
+
+        async def on_create(session, context, params):
+            stats.record(False)
+            sample = context.trace_request_ctx
+            if sample is not None:
+                # Resolving the host is part of creating the connection
+                sample.add('connect', perf_counter() - context.started
+                           - sample.phases.get('dns', 0.0))
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_reuseconn.append(on_reuse)
+        trace.on_connection_create_start.append(on_start)
+        trace.on_dns_resolvehost_end.append(on_dns)
+        trace.on_connection_create_end.append(on_create)
+        return trace
+
+    def _get_session(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self._pool_connections,
+                limit_per_host=self._pool_maxsize,
+                force_close=not self._keep_alive)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self._client_timeout(),
+                trace_configs=[self._trace_config()])
+        return self._session
+
+    @staticmethod
+    async def _then(result, callback):
+        result = await result
+        if type(result) is RawResponse:
+            return result
+        return callback(result)
+
+    async def _send(self, method, url, params=None, headers=None,
+                    sample=None, cassette_key=None):
+        if params:
+            # Encode exactly like requests does, so the signed query string
+            # is sent as is.
+            # pylint: disable=no-member
+            url = '{}?{}'.format(url,
+                                 RequestEncodingMixin._encode_params(params))
+        try:
+            if sample is None:
+                async with self._get_session().request(
+                        method.upper(), URL(url, encoded=True),
+                        headers=headers) as r:
+                    body = await r.read()
+            else:
+                sent = perf_counter()
+                async with self._get_session().request(
+                        method.upper(), URL(url, encoded=True),
+                        headers=headers, trace_request_ctx=sample) as r:
+                    headers_after = perf_counter() - sent
+                    body = await r.read()
+                sample.http(headers_after)
+                sample.status = r.status
+                sample.bytes_sent = len(url)
+                sample.bytes_received = len(body)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise CurrencyComRequestException(
+                '{} {} failed: {!r}'.format(method.upper(), url, e)) from e
+        if cassette_key is not None:
+            self.cassette.put(cassette_key, r.status, r.headers, body)
+        return self._result(r.status, r.headers, body, sample)
+
+    async def _request(self, method, url, costs=None, signed_params=None,
+                       **kwargs):
+        key = None
+        if self.cassette is not None:
+            key, recorded = self._replay(method, url, signed_params, kwargs)
+            if recorded is not None:
+                return self._result(*recorded)
+        attempt = 0
+        breaker = self.circuit_breakers[url]
+        metrics = self.metrics
+        while True:
+            breaker.before_request()
+            sample = None if metrics is None else metrics.start(method, url)
+            if costs:
+                await self.rate_limiter.async_acquire(costs)
+                if sample is not None:
+                    sample.lap('rate_limit')
+            try:
+                prepared = self._prepare(signed_params, kwargs)
+                if sample is not None and signed_params is not None:
+                    sample.lap('sign')
+                result = await self._send(method, url, **prepared,
+                                          sample=sample, cassette_key=key)
+            except CurrencyComException as e:
+                if sample is not None:
+                    metrics.finish(sample, e)
+                delay = self._on_error(method, url, e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                if sample is not None:
+                    metrics.finish(sample)
+                breaker.record_success()
+                return result
+
+    async def iter_klines(self, symbol,
+                          interval: CandlesticksChartInervals,
+                          start_time,
+                          end_time=None,
+                          max_workers: int = 4):
+        """
+        Async generator version of Client.iter_klines
+        """
+        self._require_decoded('iter_klines')
+
+        def fetch(window):
+            return self.get_klines(symbol, interval,
+                                   start_time=window[0],
+                                   end_time=window[1],
+                                   limit=CurrencyComConstants.KLINES_MAX_LIMIT)
+
+        last_open_time = None
+        async for _, bars in aiter_windows(
+                fetch,
+                self._kline_windows(interval, start_time, end_time),
+                max_workers=max_workers):
+            for bar in bars:
+                if last_open_time is None or bar[0] > last_open_time:
+                    last_open_time = bar[0]
+                    yield bar
+
+    async def iter_agg_trades(self, symbol,
+                              start_time,
+                              end_time=None,
+                              max_workers: int = 4):
+        """
+        Async generator version of Client.iter_agg_trades
+        """
+        self._require_decoded('iter_agg_trades')
+
+        def fetch(window):
+            return self.get_agg_trades(
+                symbol,
+                start_time=window[0],
+                end_time=window[1],
+                limit=CurrencyComConstants.AGG_TRADES_MAX_LIMIT)
+
+        last_id = None
+        async for _, trades in aiter_windows(
+                fetch,
+                self._agg_trade_windows(start_time, end_time),
+                max_workers=max_workers,
+                split=self._split_saturated_window):
+            for trade in trades:
+                if last_id is None or trade['a'] > last_id:
+                    last_id = trade['a']
+                    yield trade
+
+    async def new_orders(self, orders, max_workers: int = 10):
+        """
+        Coroutine version of Client.new_orders
+        """
+        params = self._validate_orders(orders)
+        return await async_gather(
+            lambda p: self._post(CurrencyComConstants.ORDER_ENDPOINT, **p),
+            params, max_workers=max_workers,
+            errors=CurrencyComException)
+
+    async def fan_out(self, method, symbols, *args, max_workers: int = 10,
+                      **kwargs):
+        """
+        Coroutine version of Client.fan_out, max_workers limits the number
+        of requests in flight
+        """
+        results = await async_gather(
+            lambda symbol: method(symbol, *args, **kwargs),
+            symbols, max_workers=max_workers, errors=CurrencyComException)
+        return dict(zip(symbols, results))
+
+    def iter_fan_out(self, method, symbols, *args, max_workers: int = 10,
+                     **kwargs):
+        """
+        Async generator version of Client.iter_fan_out
+        """
+        return aiter_completed(
+            lambda symbol: method(symbol, *args, **kwargs),
+            symbols, max_workers=max_workers, errors=CurrencyComException)
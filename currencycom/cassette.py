@@ -0,0 +1,173 @@
+"""
+Record and replay of the responses of a Client:
+
+    client = Client('API_KEY', 'SECRET_KEY',
+                    cassette=Cassette('klines.cassette'))
+
+The first call of a request is sent and its response recorded, the next
+ones are served from the cassette, without touching the network, the rate
+limiter or the retries. Requests are matched on their method, endpoint
+path and parameters, signature, timestamp and recvWindow left out, so
+signed requests replay too. Only GET requests are replayed: orders,
+cancels and the other requests changing the account are always sent, or
+refused in strict mode. Only successful responses are recorded, so errors
+such as an invalid signature are not served again once fixed.
+
+A cassette is two append-only files: path holds the zlib compressed
+bodies, path + '.idx' one JSON line per response with its key, offset,
+size, status and headers. The index is loaded when the cassette is
+opened, bodies on their first replay and then kept in memory.
+"""
+import json
+import os
+import zlib
+from threading import Lock
+from typing import Mapping, NamedTuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests.structures import CaseInsensitiveDict
+
+from .exceptions import CurrencyComCassetteMissException
+from .signing import Signer
+
+# Parameters that change from one request to the next
+VOLATILE_PARAMS = frozenset(['signature', 'timestamp', 'recvWindow'])
+
+# Headers describing the transfer rather than the response
+_TRANSFER_HEADERS = frozenset(['connection', 'content-encoding',
+                               'content-length', 'date', 'keep-alive',
+                               'server', 'transfer-encoding'])
+
+
+class RecordedResponse(NamedTuple):
+    status_code: int
+    headers: Mapping
+    content: bytes
+
+
+class Cassette(object):
+    """
+    On-disk store of responses, see the module documentation.
+
+    Modes:
+        replay: serve recorded responses, send and record the others
+        record: send every request and record its response again
+        strict: serve recorded responses only, any other request, and any
+        request not in METHODS, raises CurrencyComCassetteMissException
+        without being sent
+    """
+
+    MODES = ('replay', 'record', 'strict')
+    # Methods of the requests replayed, the others are always sent
+    METHODS = frozenset(['GET'])
+
+    def __init__(self, path, mode: str = 'replay', compress_level: int = 6):
+        """
+        :param path: file of the bodies, created when missing
+        :param mode: 'replay', 'record' or 'strict'
+        :param compress_level: zlib level of the recorded bodies
+        """
+        if mode not in self.MODES:
+            raise ValueError('mode has to be one of {}. Got {}'.format(
+                self.MODES, mode))
+        self.path = path
+        self.mode = mode
+        self.compress_level = compress_level
+        self._index = {}
+        self._responses = {}
+        self._lock = Lock()
+        self._load_index()
+
+    @property
+    def index_path(self):
+        return self.path + '.idx'
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                key, offset, size, status, headers = json.loads(line)
+            except ValueError:
+                # Line cut by an interrupted recording
+                continue
+            self._index[key] = (offset, size, status, headers)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    @staticmethod
+    def key(method, url, params=None) -> str:
+        """
+        Key of a request: method, path of the url and sorted parameters,
+        without VOLATILE_PARAMS
+
+        :param params: dict of parameters or encoded query string
+        """
+        if params is None:
+            query = ''
+        elif isinstance(params, str):
+            query = params
+        else:
+            query = Signer.encode(params)
+        pairs = sorted(pair for pair in parse_qsl(query,
+                                                  keep_blank_values=True)
+                       if pair[0] not in VOLATILE_PARAMS)
+        return '{} {}?{}'.format(method.upper(), urlsplit(url).path,
+                                 urlencode(pairs))
+
+    def get(self, key) -> RecordedResponse:
+        """
+        Recorded response of key, None when the request has to be sent.
+        Raises CurrencyComCassetteMissException in strict mode instead.
+        Keys of methods not in METHODS are never found.
+        """
+        if self.mode == 'record':
+            return None
+        if key.split(' ', 1)[0] not in self.METHODS:
+            if self.mode == 'strict':
+                raise CurrencyComCassetteMissException(key)
+            return None
+        response = self._responses.get(key)
+        if response is not None:
+            return response
+        entry = self._index.get(key)
+        if entry is None:
+            if self.mode == 'strict':
+                raise CurrencyComCassetteMissException(key)
+            return None
+        offset, size, status, headers = entry
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            content = zlib.decompress(f.read(size))
+        response = self._responses[key] = RecordedResponse(
+            status, CaseInsensitiveDict(headers), content)
+        return response
+
+    def put(self, key, status_code, headers, content):
+        """
+        Record a successful response, errors and the requests not in
+        METHODS are not recorded
+        """
+        if not 200 <= status_code < 300 \
+                or key.split(' ', 1)[0] not in self.METHODS:
+            return
+        headers = {name: value for name, value in headers.items()
+                   if name.lower() not in _TRANSFER_HEADERS}
+        data = zlib.compress(content, self.compress_level)
+        with self._lock:
+            with open(self.path, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(data)
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps([key, offset, len(data), status_code,
+                                    headers]) + '\n')
+            self._index[key] = (offset, len(data), status_code, headers)
+            self._responses[key] = RecordedResponse(
+                status_code, CaseInsensitiveDict(headers), content)
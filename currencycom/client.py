@@ -1,10 +1,25 @@
-import hashlib
-import hmac
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta
 from enum import Enum
+from typing import Mapping, NamedTuple
 
 import requests
-from requests.models import RequestEncodingMixin
+
+from .cassette import Cassette
+from .columnar import agg_trades_to_columns, klines_to_columns
+from .concurrency import gather, iter_completed, iter_windows
+from .decoding import JsonDecoder
+from .exceptions import (CurrencyComException,
+                         CurrencyComInvalidResponseException,
+                         CurrencyComRateLimitException,
+                         CurrencyComRequestException, api_exception)
+from .metrics import RequestMetrics
+from .ratelimit import RateLimiter
+from .resilience import CircuitBreakers, RetryPolicy, is_failure
+from .session import PooledSession, take_connect_time
+from .signing import Signer
 
 
 class CurrencyComConstants(object):
@@ -18,6 +33,8 @@ class CurrencyComConstants(object):
     KLINES_MAX_LIMIT = 1000
     RECV_WINDOW_MAX_LIMIT = 60000
 
+    LEVERAGE_SYMBOL_SUFFIX = '_LEVERAGE'
+
     # Public API Endpoints
     SERVER_TIME_ENDPOINT = BASE_URL + 'time'
     EXCHANGE_INFORMATION_ENDPOINT = BASE_URL + 'exchangeInfo'
@@ -72,6 +89,10 @@ class CandlesticksChartInervals(Enum):
     DAY = '1d'
     WEEK = '1w'
 
+    def to_milliseconds(self):
+        units = {'m': 60000, 'h': 3600000, 'd': 86400000, 'w': 604800000}
+        return int(self.value[:-1]) * units[self.value[-1]]
+
 
 class TimeInForce(Enum):
     GTC = 'GTC'
@@ -83,6 +104,19 @@ class NewOrderResponseType(Enum):
     FULL = 'FULL'
 
 
+class RawResponse(NamedTuple):
+    """
+    Undecoded response of the raw mode
+    """
+    status_code: int
+    headers: Mapping
+    content: bytes
+
+
+# Clients in raw mode in the current context, see Client.raw_responses
+_raw_clients = ContextVar('raw_clients', default=())
+
+
 class Client(object):
     """
     This is API for market Currency.com
@@ -90,9 +124,124 @@ class Client(object):
     Swagger UI: https://apitradedoc.currency.com/swagger-ui.html#/
     """
 
-    def __init__(self, api_key, api_secret):
+    def __init__(self, api_key, api_secret,
+                 session: PooledSession = None,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 timeout=10,
+                 keep_alive: bool = True,
+                 time_sync=None,
+                 rate_limiter: RateLimiter = None,
+                 retry_policy: RetryPolicy = None,
+                 circuit_breakers: CircuitBreakers = None,
+                 json_decoder=None,
+                 raw: bool = False,
+                 metrics: RequestMetrics = None,
+                 cassette: Cassette = None):
+        """
+        :param api_key:
+        :param api_secret:
+        :param session: already configured session to share between several
+        clients. Pool parameters below are ignored when it is passed.
+        :param pool_connections: number of per-host connection pools
+        :param pool_maxsize: max number of keep-alive connections per host
+        :param pool_block: wait for a free connection instead of opening an
+        extra one when all pooled connections of a host are busy
+        :param timeout: seconds, either a single value or a (connect, read)
+        tuple
+        :param keep_alive: reuse connections between requests
+        :param time_sync: TimeSync used to stamp signed requests with the
+        server time and to choose recvWindow when it is not set
+        :param rate_limiter: RateLimiter every request waits for, see also
+        enable_rate_limiter
+        :param retry_policy: retries of idempotent requests. Default
+        RetryPolicy(), RetryPolicy(max_retries=0) disables them
+        :param circuit_breakers: per-endpoint circuit breakers. Default
+        CircuitBreakers()
+        :param json_decoder: callable decoding the response bodies from
+        bytes. Default JsonDecoder(), orjson when it is installed
+        :param raw: return every response as a RawResponse with the body
+        left undecoded, see also raw_responses
+        :param metrics: RequestMetrics timing every request, nothing is
+        timed by default
+        :param cassette: Cassette recording the responses and replaying
+        them for the same requests
+        """
         self.api_key = api_key
         self.api_secret = bytes(api_secret, 'utf-8')
+        self.time_sync = time_sync
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breakers = circuit_breakers or CircuitBreakers()
+        self.json_decoder = json_decoder or JsonDecoder()
+        self.raw = raw
+        self.metrics = metrics
+        self.cassette = cassette
+        self._signer = Signer(self.api_secret)
+        self._headers = {CurrencyComConstants.HEADER_API_KEY_NAME: api_key}
+        if session is None:
+            session = self._create_session(pool_connections=pool_connections,
+                                           pool_maxsize=pool_maxsize,
+                                           pool_block=pool_block,
+                                           timeout=timeout,
+                                           keep_alive=keep_alive)
+        self._session = session
+
+    def _create_session(self, **kwargs):
+        return PooledSession(**kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Close all pooled connections
+        """
+        self._session.close()
+
+    def pool_stats(self):
+        """
+        Connection reuse statistics of the underlying pool.
+
+        :return: dict object
+        {
+            "hits": 99,  // requests sent over a kept-alive connection
+            "misses": 1,  // requests that opened a new connection
+            "requests": 100,
+            "hit_ratio": 0.99
+        }
+        """
+        return self._session.pool_stats()
+
+    @contextmanager
+    def raw_responses(self):
+        """
+        Return the responses of the requests of this client made in the
+        block as RawResponse, e.g. to relay them as they are:
+
+            with client.raw_responses():
+                response = client.get_exchange_info()
+            publish(response.content)
+
+        Error statuses still raise CurrencyComAPIException.
+        """
+        token = _raw_clients.set(_raw_clients.get() + (self,))
+        try:
+            yield self
+        finally:
+            _raw_clients.reset(token)
+
+    def _is_raw(self):
+        return self.raw or self in _raw_clients.get()
+
+    def _require_decoded(self, method):
+        if self._is_raw():
+            raise ValueError('{} merges decoded responses, it cannot be '
+                             'used in raw mode'.format(method))
 
     @staticmethod
     def _validate_limit(limit):
@@ -109,6 +258,8 @@ class Client(object):
 
     @staticmethod
     def _to_epoch_miliseconds(dttm: datetime):
+        if isinstance(dttm, int):
+            return dttm
         if dttm:
             return int(dttm.timestamp() * 1000)
         else:
@@ -143,36 +294,189 @@ class Client(object):
                     "new_order_resp_type for LIMIT order can be only RESULT."
                     f" Got {new_order_resp_type.value}")
 
+    def _timestamp(self):
+        if self.time_sync is not None:
+            return self.time_sync.timestamp()
+        return int(time.time() * 1000)
+
     def _get_params_with_signature(self, **kwargs):
-        t = self._to_epoch_miliseconds(datetime.now())
-        kwargs['timestamp'] = t
-        # pylint: disable=no-member
-        body = RequestEncodingMixin._encode_params(kwargs)
-        sign = hmac.new(self.api_secret, bytes(body, 'utf-8'),
-                        hashlib.sha256).hexdigest()
-        return {'signature': sign, **kwargs}
+        """
+        Signed query string
+        """
+        if self.time_sync is not None and kwargs.get('recvWindow') is None:
+            kwargs['recvWindow'] = self.time_sync.recv_window()
+        kwargs['timestamp'] = self._timestamp()
+        return self._signer.signed_query(kwargs)
 
     def _get_header(self, **kwargs):
+        if not kwargs:
+            return self._headers
         return {
             **kwargs,
             CurrencyComConstants.HEADER_API_KEY_NAME: self.api_key
         }
 
+    def enable_rate_limiter(self, rate_limits=None, headroom: float = 0.9):
+        """
+        Throttle requests to stay under the exchange rate limits. The
+        limiter is shared by all the clients with the same api key.
+
+        :param rate_limits: rateLimits of exchangeInfo, downloaded when not
+        passed
+        :param headroom: share of every limit to aim at
+        """
+        if rate_limits is None:
+            rate_limits = self.get_exchange_info()['rateLimits']
+        self.rate_limiter = RateLimiter.shared(self.api_key, rate_limits,
+                                               headroom)
+        return self.rate_limiter
+
+    def _costs(self, method, url, params):
+        if self.rate_limiter is None:
+            return None
+        return self.rate_limiter.costs(method, url, params)
+
+    def _prepare(self, signed_params, kwargs):
+        # Signed requests are signed again on every attempt, with a fresh
+        # timestamp
+        if signed_params is not None:
+            kwargs['params'] = self._get_params_with_signature(
+                **signed_params)
+            kwargs['headers'] = self._get_header()
+        return kwargs
+
+    def _on_error(self, method, url, error: CurrencyComException, attempt):
+        """
+        Account for a failed attempt and return the seconds to wait before
+        the next one, or None when the error has to be raised.
+        """
+        breaker = self.circuit_breakers[url]
+        if is_failure(error):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if isinstance(error, CurrencyComRateLimitException) \
+                and error.retry_after and self.rate_limiter is not None:
+            self.rate_limiter.pause(error.retry_after)
+        if self.retry_policy.should_retry(method, error, attempt):
+            return self.retry_policy.delay(error, attempt)
+        return None
+
+    def _handle_response(self, r, sample=None):
+        if sample is not None:
+            sample.status = r.status_code
+            sample.bytes_sent = len(r.request.url) + len(r.request.body or b'')
+            sample.bytes_received = len(r.content)
+        if not r.ok:
+            raise api_exception(r.status_code, r.headers, r.text)
+        return self._decode(r.status_code, r.headers, r.content, sample)
+
+    def _result(self, status_code, headers, content, sample=None):
+        if status_code >= 400:
+            raise api_exception(status_code, headers,
+                                content.decode('utf-8', 'replace'))
+        return self._decode(status_code, headers, content, sample)
+
+    def _decode(self, status_code, headers, content, sample=None):
+        if self._is_raw():
+            return RawResponse(status_code, headers, content)
+        try:
+            result = self.json_decoder(content)
+        except ValueError as e:
+            raise CurrencyComInvalidResponseException(
+                'Invalid JSON response: {}'.format(e),
+                status_code, content) from e
+        if sample is not None:
+            sample.lap('decode')
+        return result
+
+    def _send(self, method, url, kwargs, sample=None, cassette_key=None):
+        if sample is not None:
+            take_connect_time()
+        try:
+            r = getattr(self._session, method)(url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            raise CurrencyComRequestException(
+                '{} {} failed: {}'.format(method.upper(), url, e)) from e
+        if sample is not None:
+            connect = take_connect_time()
+            if connect:
+                sample.add('connect', connect)
+            sample.http(r.elapsed.total_seconds())
+        if cassette_key is not None:
+            self.cassette.put(cassette_key, r.status_code, r.headers,
+                              r.content)
+        return self._handle_response(r, sample)
+
+    def _replay(self, method, url, signed_params, kwargs):
+        """
+        Key of the request in the cassette and its recorded response, None
+        when it has to be sent. Requests other than Cassette.METHODS are
+        neither replayed nor recorded, and not sent in strict mode.
+        """
+        key = self.cassette.key(method, url, kwargs.get('params')
+                                if signed_params is None else signed_params)
+        return key, self.cassette.get(key)
+
+    def _request(self, method, url, costs=None, signed_params=None,
+                 **kwargs):
+        key = None
+        if self.cassette is not None:
+            key, recorded = self._replay(method, url, signed_params, kwargs)
+            if recorded is not None:
+                return self._result(*recorded)
+        attempt = 0
+        breaker = self.circuit_breakers[url]
+        metrics = self.metrics
+        while True:
+            breaker.before_request()
+            sample = None if metrics is None else metrics.start(method, url)
+            if costs:
+                self.rate_limiter.acquire(costs)
+                if sample is not None:
+                    sample.lap('rate_limit')
+            try:
+                prepared = self._prepare(signed_params, kwargs)
+                if sample is not None and signed_params is not None:
+                    sample.lap('sign')
+                result = self._send(method, url, prepared, sample, key)
+            except CurrencyComException as e:
+                if sample is not None:
+                    metrics.finish(sample, e)
+                delay = self._on_error(method, url, e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+            else:
+                if sample is not None:
+                    metrics.finish(sample)
+                breaker.record_success()
+                return result
+
+    @staticmethod
+    def _then(result, callback):
+        if type(result) is RawResponse:
+            return result
+        return callback(result)
+
+    def _public_get(self, url, **kwargs):
+        return self._request('get', url,
+                             self._costs('get', url, kwargs.get('params')),
+                             **kwargs)
+
     def _get(self, url, **kwargs):
-        return requests.get(url,
-                            params=self._get_params_with_signature(**kwargs),
-                            headers=self._get_header())
+        return self._request('get', url, self._costs('get', url, kwargs),
+                             signed_params=kwargs)
 
     def _post(self, url, **kwargs):
-        return requests.post(url,
-                             params=self._get_params_with_signature(**kwargs),
-                             headers=self._get_header())
+        return self._request('post', url, self._costs('post', url, kwargs),
+                             signed_params=kwargs)
 
     def _delete(self, url, **kwargs):
-        return requests.delete(url,
-                               params=self._get_params_with_signature(
-                                   **kwargs),
-                               headers=self._get_header())
+        return self._request('delete', url,
+                             self._costs('delete', url, kwargs),
+                             signed_params=kwargs)
 
     def get_account_info(self,
                          show_zero_balance: bool = False,
@@ -216,15 +520,15 @@ class Client(object):
         }
         """
         self._validate_recv_window(recv_window)
-        r = self._get(CurrencyComConstants.ACCOUNT_INFORMATION_ENDPOINT,
-                      showZeroBalance=show_zero_balance,
-                      recvWindow=recv_window)
-        return r.json()
+        return self._get(CurrencyComConstants.ACCOUNT_INFORMATION_ENDPOINT,
+                         showZeroBalance=show_zero_balance,
+                         recvWindow=recv_window)
 
     def get_agg_trades(self, symbol,
                        start_time: datetime = None,
                        end_time: datetime = None,
-                       limit=500):
+                       limit=500,
+                       columnar: bool = False):
         """
         Get compressed, aggregate trades. Trades that fill at the same time,
         from the same order, with the same price will have the quantity
@@ -236,6 +540,8 @@ class Client(object):
         INCLUSIVE.
         :param end_time: Timestamp in ms to get aggregate trades from INCLUSIVE
         :param limit: Default 500; max 1000.
+        :param columnar: return AggTradeColumns of numpy arrays instead of
+        the list of dicts, requires numpy
         :return: dict object
 
         Response:
@@ -254,8 +560,12 @@ class Client(object):
                 CurrencyComConstants.AGG_TRADES_MAX_LIMIT
             ))
 
-        if start_time and end_time \
-                and end_time - start_time > timedelta(hours=1):
+        start_time = self._to_epoch_miliseconds(start_time)
+        end_time = self._to_epoch_miliseconds(end_time)
+
+        if start_time is not None and end_time is not None \
+                and timedelta(milliseconds=end_time - start_time) \
+                > timedelta(hours=1):
             raise ValueError(
                 'If both startTime and endTime are sent,'
                 ' time between startTime and endTime must be less than 1 hour.'
@@ -263,16 +573,72 @@ class Client(object):
 
         params = {'symbol': symbol, 'limit': limit}
 
-        if start_time:
-            params['startTime'] = self._to_epoch_miliseconds(start_time)
+        if start_time is not None:
+            params['startTime'] = start_time
 
-        if end_time:
-            params['endTime'] = self._to_epoch_miliseconds(end_time)
+        if end_time is not None:
+            params['endTime'] = end_time
 
-        r = requests.get(CurrencyComConstants.AGGREGATE_TRADE_LIST_ENDPOINT,
-                         params=params)
+        r = self._public_get(
+            CurrencyComConstants.AGGREGATE_TRADE_LIST_ENDPOINT,
+            params=params)
+        if columnar:
+            return self._then(r, agg_trades_to_columns)
+        return r
 
-        return r.json()
+    def _agg_trade_windows(self, start_time, end_time):
+        start = self._to_epoch_miliseconds(start_time)
+        end = self._to_epoch_miliseconds(end_time or datetime.now())
+        step = int(timedelta(hours=1).total_seconds() * 1000)
+        return self._time_windows(start, end, step)
+
+    @staticmethod
+    def _split_saturated_window(window, trades):
+        start, end = window
+        if len(trades) < CurrencyComConstants.AGG_TRADES_MAX_LIMIT \
+                or start == end:
+            return None
+        middle = (start + end) // 2
+        return [(start, middle), (middle + 1, end)]
+
+    def iter_agg_trades(self, symbol,
+                        start_time: datetime,
+                        end_time: datetime = None,
+                        max_workers: int = 4):
+        """
+        Aggregate trades for a time range of any length.
+
+        The range is tiled into windows shorter than 1 hour which are
+        downloaded concurrently. A window returning AGG_TRADES_MAX_LIMIT
+        trades may be truncated, so it is split in halves and downloaded
+        again. Trades are yielded in order without duplicates by aggregate
+        trade id.
+
+        :param symbol:
+        :param start_time: datetime or epoch milliseconds
+        :param end_time: datetime or epoch milliseconds. Default now
+        :param max_workers: max number of concurrent requests
+        :return: generator of trades in the get_agg_trades format
+        """
+        self._require_decoded('iter_agg_trades')
+
+        def fetch(window):
+            return self.get_agg_trades(
+                symbol,
+                start_time=window[0],
+                end_time=window[1],
+                limit=CurrencyComConstants.AGG_TRADES_MAX_LIMIT)
+
+        last_id = None
+        for _, trades in iter_windows(
+                fetch,
+                self._agg_trade_windows(start_time, end_time),
+                max_workers=max_workers,
+                split=self._split_saturated_window):
+            for trade in trades:
+                if last_id is None or trade['a'] > last_id:
+                    last_id = trade['a']
+                    yield trade
 
     def close_trading_position(self, position_id, recv_window=None):
         """
@@ -299,12 +665,11 @@ class Client(object):
         """
         self._validate_recv_window(recv_window)
 
-        r = self._post(
+        return self._post(
             CurrencyComConstants.CLOSE_TRADING_POSITION_ENDPOINT,
             positionId=position_id,
             recvWindow=recv_window
         )
-        return r.json()
 
     def get_order_book(self, symbol, limit=100):
         """
@@ -332,12 +697,10 @@ class Client(object):
           }
         """
         self._validate_limit(limit)
-        r = requests.get(CurrencyComConstants.ORDER_BOOK_ENDPOINT,
-                         params={'symbol': symbol, 'limit': limit})
-        return r.json()
+        return self._public_get(CurrencyComConstants.ORDER_BOOK_ENDPOINT,
+                                params={'symbol': symbol, 'limit': limit})
 
-    @staticmethod
-    def get_exchange_info():
+    def get_exchange_info(self):
         """
         Current exchange trading rules and symbol information.
 
@@ -374,14 +737,15 @@ class Client(object):
           ]
         }
         """
-        r = requests.get(CurrencyComConstants.EXCHANGE_INFORMATION_ENDPOINT)
-        return r.json()
+        return self._public_get(
+            CurrencyComConstants.EXCHANGE_INFORMATION_ENDPOINT)
 
     def get_klines(self, symbol,
                    interval: CandlesticksChartInervals,
                    start_time: datetime = None,
                    end_time: datetime = None,
-                   limit=500):
+                   limit=500,
+                   columnar: bool = False):
         """
         Kline/candlestick bars for a symbol. Klines are uniquely identified
         by their open time.
@@ -393,6 +757,8 @@ class Client(object):
         :param start_time:
         :param end_time:
         :param limit:Default 500; max 1000.
+        :param columnar: return KlineColumns of numpy arrays instead of the
+        list of lists, requires numpy
         :return: dict object
 
         Response:
@@ -416,13 +782,65 @@ class Client(object):
                   'interval': interval.value,
                   'limit': limit}
 
-        if start_time:
+        if start_time is not None:
             params['startTime'] = self._to_epoch_miliseconds(start_time)
-        if end_time:
+        if end_time is not None:
             params['endTime'] = self._to_epoch_miliseconds(end_time)
-        r = requests.get(CurrencyComConstants.KLINES_DATA_ENDPOINT,
-                         params=params)
-        return r.json()
+        r = self._public_get(CurrencyComConstants.KLINES_DATA_ENDPOINT,
+                             params=params)
+        if columnar:
+            return self._then(r, klines_to_columns)
+        return r
+
+    @staticmethod
+    def _time_windows(start, end, step):
+        while start <= end:
+            yield start, min(start + step - 1, end)
+            start += step
+
+    def _kline_windows(self, interval, start_time, end_time):
+        start = self._to_epoch_miliseconds(start_time)
+        end = self._to_epoch_miliseconds(end_time or datetime.now())
+        step = interval.to_milliseconds() \
+            * CurrencyComConstants.KLINES_MAX_LIMIT
+        return self._time_windows(start, end, step)
+
+    def iter_klines(self, symbol,
+                    interval: CandlesticksChartInervals,
+                    start_time: datetime,
+                    end_time: datetime = None,
+                    max_workers: int = 4):
+        """
+        Kline/candlestick bars for a time range of any length.
+
+        The range is split into windows of KLINES_MAX_LIMIT bars which are
+        downloaded concurrently, at most max_workers windows ahead of the
+        consumer. Bars are yielded in open time order without duplicates.
+
+        :param symbol:
+        :param interval:
+        :param start_time: datetime or epoch milliseconds
+        :param end_time: datetime or epoch milliseconds. Default now
+        :param max_workers: max number of concurrent requests
+        :return: generator of klines in the get_klines format
+        """
+        self._require_decoded('iter_klines')
+
+        def fetch(window):
+            return self.get_klines(symbol, interval,
+                                   start_time=window[0],
+                                   end_time=window[1],
+                                   limit=CurrencyComConstants.KLINES_MAX_LIMIT)
+
+        last_open_time = None
+        for _, bars in iter_windows(
+                fetch,
+                self._kline_windows(interval, start_time, end_time),
+                max_workers=max_workers):
+            for bar in bars:
+                if last_open_time is None or bar[0] > last_open_time:
+                    last_open_time = bar[0]
+                    yield bar
 
     def get_leverage_settings(self, symbol, recv_window=None):
         """
@@ -450,12 +868,11 @@ class Client(object):
         """
         self._validate_recv_window(recv_window)
 
-        r = self._get(
+        return self._get(
             CurrencyComConstants.LEVERAGE_SETTINGS_ENDPOINT,
             symbol=symbol,
             recvWindow=recv_window
         )
-        return r.json()
 
     def get_account_trade_list(self, symbol,
                                start_time: datetime = None,
@@ -508,10 +925,8 @@ class Client(object):
         if end_time:
             params['endTime'] = self._to_epoch_miliseconds(end_time)
 
-        r = self._get(CurrencyComConstants.ACCOUNT_TRADE_LIST_ENDPOINT,
-                      **params)
-
-        return r.json()
+        return self._get(CurrencyComConstants.ACCOUNT_TRADE_LIST_ENDPOINT,
+                         **params)
 
     def get_open_orders(self, symbol=None, recv_window=None):
         """
@@ -558,10 +973,9 @@ class Client(object):
 
         self._validate_recv_window(recv_window)
 
-        r = self._get(CurrencyComConstants.CURRENT_OPEN_ORDERS_ENDPOINT,
-                      symbol=symbol,
-                      recvWindow=recv_window)
-        return r.json()
+        return self._get(CurrencyComConstants.CURRENT_OPEN_ORDERS_ENDPOINT,
+                         symbol=symbol,
+                         recvWindow=recv_window)
 
     def new_order(self,
                   symbol,
@@ -647,6 +1061,37 @@ class Client(object):
           "symbol" : "BTC/USD"
         }
         """
+        return self._post(CurrencyComConstants.ORDER_ENDPOINT,
+                          **self._new_order_params(
+                              symbol, side, order_type, quantity,
+                              account_id=account_id,
+                              expire_timestamp=expire_timestamp,
+                              guaranteed_stop_loss=guaranteed_stop_loss,
+                              stop_loss=stop_loss,
+                              take_profit=take_profit,
+                              leverage=leverage,
+                              price=price,
+                              new_order_resp_type=new_order_resp_type,
+                              recv_window=recv_window))
+
+    def _new_order_params(self,
+                          symbol,
+                          side: OrderSide,
+                          order_type: OrderType,
+                          quantity: float,
+                          account_id: str = None,
+                          expire_timestamp: datetime = None,
+                          guaranteed_stop_loss: bool = False,
+                          stop_loss: float = None,
+                          take_profit: float = None,
+                          leverage: int = None,
+                          price: float = None,
+                          new_order_resp_type: NewOrderResponseType
+                          = NewOrderResponseType.FULL,
+                          recv_window=None):
+        """
+        Validate a new order and return the parameters of its request
+        """
         self._validate_recv_window(recv_window)
         self._validate_new_order_resp_type(new_order_resp_type, order_type)
 
@@ -657,8 +1102,7 @@ class Client(object):
 
         expire_timestamp_epoch = self._to_epoch_miliseconds(expire_timestamp)
 
-        r = self._post(
-            CurrencyComConstants.ORDER_ENDPOINT,
+        return dict(
             accountId=account_id,
             expireTimestamp=expire_timestamp_epoch,
             guaranteedStopLoss=guaranteed_stop_loss,
@@ -673,7 +1117,37 @@ class Client(object):
             takeProfit=take_profit,
             type=order_type.value,
         )
-        return r.json()
+
+    def _validate_orders(self, orders):
+        params = []
+        for i, order in enumerate(orders):
+            try:
+                params.append(self._new_order_params(**order))
+            except (TypeError, ValueError) as e:
+                raise ValueError('Order {}: {}'.format(i, e)) from e
+        return params
+
+    def new_orders(self, orders, max_workers: int = 10):
+        """
+        Place several orders concurrently.
+
+        Every order is validated before any of them is sent, an invalid
+        order raises ValueError and nothing is placed. Orders are then sent
+        in parallel over the pooled connections, keep max_workers not
+        greater than the pool_maxsize of the client to reuse them.
+
+        :param orders: list of dicts of new_order keyword arguments, e.g.
+        {'symbol': 'BTC/USD', 'side': OrderSide.BUY,
+         'order_type': OrderType.MARKET, 'quantity': 0.01}
+        :param max_workers: max number of orders in flight
+        :return: list with, in the order of orders, the new_order response
+        or the CurrencyComException raised for that order
+        """
+        params = self._validate_orders(orders)
+        return gather(
+            lambda p: self._post(CurrencyComConstants.ORDER_ENDPOINT, **p),
+            params, max_workers=max_workers,
+            errors=CurrencyComException)
 
     def cancel_order(self, symbol,
                      order_id,
@@ -706,16 +1180,14 @@ class Client(object):
 
         self._validate_recv_window(recv_window)
 
-        r = self._delete(
+        return self._delete(
             CurrencyComConstants.ORDER_ENDPOINT,
             symbol=symbol,
             orderId=order_id,
             recvWindow=recv_window
         )
-        return r.json()
 
-    @staticmethod
-    def get_24h_price_change(symbol=None):
+    def get_24h_price_change(self, symbol=None):
         """
         24-hour rolling window price change statistics. Careful when accessing
         this with no symbol.
@@ -771,12 +1243,11 @@ class Client(object):
           "count": 0
         }
         """
-        r = requests.get(CurrencyComConstants.PRICE_CHANGE_24H_ENDPOINT,
-                         params={'symbol': symbol} if symbol else {})
-        return r.json()
+        return self._public_get(
+            CurrencyComConstants.PRICE_CHANGE_24H_ENDPOINT,
+            params={'symbol': symbol} if symbol else {})
 
-    @staticmethod
-    def get_server_time():
+    def get_server_time(self):
         """
         Test connectivity to the API and get the current server time.
 
@@ -786,9 +1257,7 @@ class Client(object):
           "serverTime": 1499827319559
         }
         """
-        r = requests.get(CurrencyComConstants.SERVER_TIME_ENDPOINT)
-
-        return r.json()
+        return self._public_get(CurrencyComConstants.SERVER_TIME_ENDPOINT)
 
     def list_leverage_trades(self, recv_window=None):
         """
@@ -830,11 +1299,10 @@ class Client(object):
         }
         """
         self._validate_recv_window(recv_window)
-        r = self._get(
+        return self._get(
             CurrencyComConstants.TRADING_POSITIONS_ENDPOINT,
             recvWindow=recv_window
         )
-        return r.json()
 
     def update_trading_position(self,
                                 position_id,
@@ -854,11 +1322,68 @@ class Client(object):
         }
         """
         self._validate_recv_window(recv_window)
-        r = self._post(
+        return self._post(
             CurrencyComConstants.UPDATE_TRADING_POSITION_ENDPOINT,
             positionId=position_id,
             guaranteedStopLoss=guaranteed_stop_loss,
             stopLoss=stop_loss,
             takeProfit=take_profit
         )
-        return r.json()
+
+    def fan_out(self, method, symbols, *args, max_workers: int = 10,
+                **kwargs):
+        """
+        Call method(symbol, *args, **kwargs) for every symbol concurrently:
+
+            books = client.fan_out(client.get_order_book, symbols, limit=20)
+
+        Requests share the connection pool and the rate limiter of the
+        client, keep max_workers not greater than pool_maxsize.
+
+        :param method: method of the client taking the symbol first
+        :param symbols: list of symbols
+        :param max_workers: max number of requests in flight
+        :return: dict of symbol to the result, or to the
+        CurrencyComException raised for that symbol
+        """
+        results = gather(lambda symbol: method(symbol, *args, **kwargs),
+                         symbols, max_workers=max_workers,
+                         errors=CurrencyComException)
+        return dict(zip(symbols, results))
+
+    def iter_fan_out(self, method, symbols, *args, max_workers: int = 10,
+                     **kwargs):
+        """
+        Like fan_out, but yield (symbol, result or exception) pairs as soon
+        as every request completes
+        """
+        return iter_completed(
+            lambda symbol: method(symbol, *args, **kwargs),
+            symbols, max_workers=max_workers, errors=CurrencyComException)
+
+    def get_order_book_multi(self, symbols, limit=100,
+                             max_workers: int = 10):
+        """
+        get_order_book of every symbol, see fan_out
+        """
+        self._validate_limit(limit)
+        return self.fan_out(self.get_order_book, symbols, limit=limit,
+                            max_workers=max_workers)
+
+    def get_klines_multi(self, symbols,
+                         interval: CandlesticksChartInervals,
+                         max_workers: int = 10,
+                         **kwargs):
+        """
+        get_klines of every symbol, kwargs are passed to get_klines, see
+        fan_out
+        """
+        return self.fan_out(self.get_klines, symbols, interval,
+                            max_workers=max_workers, **kwargs)
+
+    def get_24h_price_change_multi(self, symbols, max_workers: int = 10):
+        """
+        get_24h_price_change of every symbol, see fan_out
+        """
+        return self.fan_out(self.get_24h_price_change, symbols,
+                            max_workers=max_workers)
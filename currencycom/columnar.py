@@ -0,0 +1,73 @@
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('numpy is required for the columnar output. '
+                          'Install it with: '
+                          'pip install python-currencycom[numpy]')
+
+
+class KlineColumns(NamedTuple):
+    """
+    Klines as contiguous arrays, one element per bar
+    """
+    open_time: 'np.ndarray'  # int64, epoch milliseconds
+    open: 'np.ndarray'  # float64
+    high: 'np.ndarray'  # float64
+    low: 'np.ndarray'  # float64
+    close: 'np.ndarray'  # float64
+    volume: 'np.ndarray'  # float64
+
+
+class AggTradeColumns(NamedTuple):
+    """
+    Aggregate trades as contiguous arrays, one element per trade
+    """
+    id: 'np.ndarray'  # int64, aggregate trade id
+    price: 'np.ndarray'  # float64
+    quantity: 'np.ndarray'  # float64
+    timestamp: 'np.ndarray'  # int64, epoch milliseconds
+    buyer_maker: 'np.ndarray'  # bool
+
+
+def klines_to_columns(klines) -> KlineColumns:
+    """
+    Convert the get_klines response into KlineColumns.
+
+    The response is loaded into a single numpy table, then every column is
+    parsed by numpy at once, without Python objects per value.
+    """
+    _require_numpy()
+    if not klines:
+        return KlineColumns(np.empty(0, np.int64),
+                            *np.empty((5, 0), np.float64))
+    table = np.array(klines)
+    ohlcv = table[:, 1:6].astype(np.float64).T.copy()
+    return KlineColumns(table[:, 0].astype(np.int64), *ohlcv)
+
+
+def agg_trades_to_columns(trades) -> AggTradeColumns:
+    """
+    Convert the get_agg_trades response into AggTradeColumns.
+    """
+    _require_numpy()
+    if not trades:
+        return AggTradeColumns(np.empty(0, np.int64),
+                               np.empty(0, np.float64),
+                               np.empty(0, np.float64),
+                               np.empty(0, np.int64),
+                               np.empty(0, np.bool_))
+    table = np.array([(t['a'], t['p'], t['q'], t['T']) for t in trades])
+    price, quantity = table[:, 1:3].astype(np.float64).T.copy()
+    return AggTradeColumns(
+        table[:, 0].astype(np.int64),
+        price,
+        quantity,
+        table[:, 3].astype(np.int64),
+        np.fromiter((t['m'] for t in trades), np.bool_, len(trades)))
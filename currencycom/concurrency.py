@@ -0,0 +1,180 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+
+
+def _returning(fn, errors):
+    def call(item):
+        try:
+            return fn(item)
+        except errors as e:
+            return e
+    return call
+
+
+def _submit(executor, fn, item):
+    """
+    Submit fn(item) to run in a copy of the context of the caller, so that
+    the context variables set by the caller, e.g. Client.raw_responses,
+    apply in the worker thread too
+    """
+    return executor.submit(copy_context().run, fn, item)
+
+
+def _async_returning(fn, errors, max_workers):
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def call(item):
+        async with semaphore:
+            try:
+                return await fn(item)
+            except errors as e:
+                return e
+    return call
+
+
+def gather(fn, items, max_workers=10, errors=Exception):
+    """
+    Call fn(item) for every item in a thread pool.
+
+    :param fn: blocking callable taking one item
+    :param items: list of items
+    :param max_workers: max number of concurrent fn calls
+    :param errors: exception classes returned instead of raised
+    :return: list of results or exceptions, in the order of items
+    """
+    if not items:
+        return []
+    with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(items))) as executor:
+        call = _returning(fn, errors)
+        futures = [_submit(executor, call, item) for item in items]
+        return [future.result() for future in futures]
+
+
+def iter_completed(fn, items, max_workers=10, errors=Exception):
+    """
+    Like gather, but yield (item, result or exception) pairs as soon as
+    every call completes
+    """
+    if not items:
+        return
+    call = _returning(fn, errors)
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(items)))
+    futures = {}
+    try:
+        for item in items:
+            futures[_submit(executor, call, item)] = item
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+async def async_gather(fn, items, max_workers=10, errors=Exception):
+    """
+    asyncio version of gather, fn(item) has to return an awaitable.
+    """
+    call = _async_returning(fn, errors, max_workers)
+    return list(await asyncio.gather(*[call(item) for item in items]))
+
+
+async def aiter_completed(fn, items, max_workers=10, errors=Exception):
+    """
+    asyncio version of iter_completed, fn(item) has to return an awaitable.
+    """
+    call = _async_returning(fn, errors, max_workers)
+
+    async def paired(item):
+        return item, await call(item)
+
+    tasks = [asyncio.ensure_future(paired(item)) for item in items]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def iter_windows(fetch, windows, max_workers=4, split=None):
+    """
+    Call fetch(window) for every window in a thread pool and yield
+    (window, result) pairs in the order of windows.
+
+    At most max_workers windows are fetched ahead of the consumer, so the
+    memory stays flat no matter how many windows there are.
+
+    :param fetch: blocking callable taking one window
+    :param windows: iterable of windows, may be lazy
+    :param max_workers: max number of concurrent fetch calls
+    :param split: optional callable taking (window, result) and returning
+    a list of sub-windows to fetch instead of that window, or None to keep
+    the result
+    """
+    windows = iter(windows)
+    queue = deque()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def submit(window):
+        return window, _submit(executor, fetch, window)
+
+    def refill():
+        while len(queue) < max_workers:
+            window = next(windows, None)
+            if window is None:
+                return
+            queue.append(submit(window))
+
+    try:
+        refill()
+        while queue:
+            window, future = queue.popleft()
+            result = future.result()
+            children = split(window, result) if split else None
+            if children:
+                queue.extendleft(submit(c) for c in reversed(children))
+            else:
+                yield window, result
+            refill()
+    finally:
+        for _, future in queue:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+async def aiter_windows(fetch, windows, max_workers=4, split=None):
+    """
+    asyncio version of iter_windows, fetch(window) has to return an
+    awaitable.
+    """
+    windows = iter(windows)
+    queue = deque()
+
+    def submit(window):
+        return window, asyncio.ensure_future(fetch(window))
+
+    def refill():
+        while len(queue) < max_workers:
+            window = next(windows, None)
+            if window is None:
+                return
+            queue.append(submit(window))
+
+    try:
+        refill()
+        while queue:
+            window, task = queue.popleft()
+            result = await task
+            children = split(window, result) if split else None
+            if children:
+                queue.extendleft(submit(c) for c in reversed(children))
+            else:
+                yield window, result
+            refill()
+    finally:
+        for _, task in queue:
+            task.cancel()
@@ -0,0 +1,84 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_NUMBER_START = '-0123456789'
+
+
+def _number(value: str):
+    """
+    int or float of a numeric string, the string itself otherwise
+    """
+    if not value[-1:].isdigit() or value[0] not in _NUMBER_START:
+        return value
+    try:
+        return int(value) if value.isdigit() else float(value)
+    except ValueError:
+        return value
+
+
+def _is_id(key):
+    return key[-2:] in ('id', 'Id')
+
+
+def parse_numbers(value):
+    """
+    Copy of a decoded JSON value with the numeric strings, e.g. the prices
+    "0.01634790", replaced by float or int. Values of keys ending in id or
+    Id, e.g. orderId, stay strings.
+    """
+    cls = type(value)
+    if cls is str:
+        return _number(value)
+    if cls is list:
+        return [parse_numbers(v) for v in value]
+    if cls is dict:
+        return {k: v if _is_id(k) else parse_numbers(v)
+                for k, v in value.items()}
+    return value
+
+
+class JsonDecoder(object):
+    """
+    Decoder of the response bodies, used by Client and AsyncClient:
+
+        client = Client('API_KEY', 'SECRET_KEY',
+                        json_decoder=JsonDecoder(parse_numbers=True))
+
+    orjson is used when it is installed, the json module otherwise.
+    """
+
+    BACKENDS = ('orjson', 'json')
+
+    def __init__(self, backend: str = None, parse_numbers: bool = False):
+        """
+        :param backend: 'orjson' or 'json', by default the fastest one
+        installed
+        :param parse_numbers: return numeric strings such as the prices
+        "0.01634790" as float or int, see parse_numbers
+        """
+        if backend is None:
+            backend = 'orjson' if orjson is not None else 'json'
+        if backend not in self.BACKENDS:
+            raise ValueError('backend has to be one of {}. Got {}'.format(
+                self.BACKENDS, backend))
+        if backend == 'orjson' and orjson is None:
+            raise ImportError('orjson is not installed. '
+                              'Install it with: pip install orjson')
+        self.backend = backend
+        self.parse_numbers = parse_numbers
+        self._loads = orjson.loads if backend == 'orjson' else json.loads
+
+    def __call__(self, content):
+        """
+        Decode a body, raise ValueError when it is not valid JSON
+
+        :param content: bytes or str
+        """
+        value = self._loads(content)
+        if self.parse_numbers:
+            value = parse_numbers(value)
+        return value
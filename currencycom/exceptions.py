@@ -0,0 +1,166 @@
+import json
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+class CurrencyComException(Exception):
+    """
+    Base class of the errors raised for failed requests
+    """
+
+
+class CurrencyComRequestException(CurrencyComException):
+    """
+    The request did not get any response: timeout, connection error...
+    """
+
+
+class CurrencyComInvalidResponseException(CurrencyComException):
+    """
+    The response body is not valid JSON
+    """
+
+    def __init__(self, message, status_code=None, body=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+
+class CurrencyComAPIException(CurrencyComException):
+    """
+    The exchange answered with an error status.
+
+    :param status_code: HTTP status
+    :param code: error code of the exchange, e.g. -1121
+    :param message: error message of the exchange, e.g. Invalid symbol.
+    :param body: raw response body
+    """
+
+    def __init__(self, status_code, code=None, message=None, body=None):
+        super().__init__('APIError(status={}, code={}): {}'.format(
+            status_code, code, message))
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+        self.body = body
+
+
+class CurrencyComServerException(CurrencyComAPIException):
+    """
+    5xx status, the request may succeed later
+    """
+
+
+class CurrencyComRateLimitException(CurrencyComAPIException):
+    """
+    429 or 418 status, requests have to be paused for retry_after seconds
+    """
+
+    def __init__(self, status_code, code=None, message=None, body=None,
+                 retry_after=None):
+        super().__init__(status_code, code, message, body)
+        self.retry_after = retry_after
+
+
+class CurrencyComCircuitOpenException(CurrencyComException):
+    """
+    Too many recent failures of the endpoint, requests to it are not sent
+    for retry_in seconds
+    """
+
+    def __init__(self, endpoint, retry_in):
+        super().__init__('Circuit open for {}, retry in {:.1f}s'.format(
+            endpoint, retry_in))
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CurrencyComCassetteMissException(CurrencyComException):
+    """
+    A strict Cassette has no response recorded for the request
+
+    :param key: key of the request, see Cassette.key
+    """
+
+    def __init__(self, key):
+        super().__init__('No response recorded for {}'.format(key))
+        self.key = key
+
+
+class CurrencyComStreamException(CurrencyComException):
+    """
+    The WebSocket server rejected a request, e.g. a subscription
+
+    :param destination: destination of the request
+    :param status: status of the response
+    :param payload: payload of the response
+    """
+
+    def __init__(self, destination, status, payload=None):
+        super().__init__('StreamError(destination={}, status={}): {}'.format(
+            destination, status, payload))
+        self.destination = destination
+        self.status = status
+        self.payload = payload
+
+
+class CurrencyComStreamTimeoutException(CurrencyComStreamException):
+    """
+    The WebSocket server did not answer a request in time
+
+    :param destination: destination of the request
+    :param timeout: seconds waited for the answer
+    """
+
+    def __init__(self, destination, timeout):
+        super().__init__(destination, 'TIMEOUT',
+                         'no answer after {}s'.format(timeout))
+        self.timeout = timeout
+
+
+RATE_LIMIT_STATUSES = (418, 429)
+
+
+def parse_retry_after(value):
+    """
+    Seconds to wait from a Retry-After header, either seconds or HTTP date
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+def api_exception(status_code, headers, body):
+    """
+    Exception for an error response
+
+    :param status_code: HTTP status
+    :param headers: response headers mapping
+    :param body: response body as text
+    """
+    code = message = None
+    try:
+        error = json.loads(body)
+    except ValueError:
+        message = body
+    else:
+        if isinstance(error, dict):
+            code = error.get('code')
+            message = error.get('msg', error.get('message'))
+        else:
+            message = body
+    if status_code in RATE_LIMIT_STATUSES:
+        return CurrencyComRateLimitException(
+            status_code, code, message, body,
+            retry_after=parse_retry_after(headers.get('Retry-After')))
+    if status_code >= 500:
+        return CurrencyComServerException(status_code, code, message, body)
+    return CurrencyComAPIException(status_code, code, message, body)
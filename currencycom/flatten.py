@@ -0,0 +1,160 @@
+import asyncio
+import time
+from typing import NamedTuple
+
+from .concurrency import async_gather, gather
+from .exceptions import CurrencyComException
+
+
+class FlattenReport(NamedTuple):
+    """
+    Outcome of Flattener.flatten, elapsed is the time to flat in seconds.
+    remaining_orders or remaining_positions is None when the last snapshot
+    of them failed.
+    """
+    flat: bool
+    cancelled: list
+    closed: list
+    remaining_orders: list
+    remaining_positions: list
+    errors: list
+    rounds: int
+    elapsed: float
+
+
+class Flattener(object):
+    """
+    Cancels every open order and closes every active leverage position.
+
+    Every round takes a snapshot of the open orders and positions, then
+    sends all the cancels and closes at once. Rounds are repeated until a
+    snapshot is flat or max_rounds is reached, so orders filled or
+    positions opened meanwhile are caught too. When one of the snapshots
+    fails, the other side is still acted on, the error is reported and the
+    failed snapshot is taken again next round. Requests go through the
+    client, enable its rate limiter to keep the burst under the limits:
+
+        client = Client('API_KEY', 'SECRET_KEY', pool_maxsize=20)
+        client.enable_rate_limiter()
+        report = Flattener(client).flatten()
+    """
+
+    ACTIVE_POSITION_STATE = 'ACTIVE'
+
+    def __init__(self, client,
+                 max_workers: int = 20,
+                 max_rounds: int = 5,
+                 retry_delay: float = 0.1,
+                 recv_window=None):
+        """
+        :param client: Client or AsyncClient
+        :param max_workers: max number of cancels and closes in flight
+        :param max_rounds: max number of rounds of cancels and closes
+        :param retry_delay: seconds to wait before every round but the first
+        :param recv_window: recvWindow of every request
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.max_rounds = max_rounds
+        self.retry_delay = retry_delay
+        self.recv_window = recv_window
+
+    def _open_orders(self):
+        return self.client.get_open_orders(recv_window=self.recv_window)
+
+    def _positions(self):
+        return self.client.list_leverage_trades(recv_window=self.recv_window)
+
+    def _active(self, positions):
+        return [p for p in positions['positions']
+                if p.get('state') == self.ACTIVE_POSITION_STATE]
+
+    def _act(self, action):
+        kind, item = action
+        if kind == 'cancel':
+            return self.client.cancel_order(item['symbol'], item['orderId'],
+                                            recv_window=self.recv_window)
+        return self.client.close_trading_position(
+            item['id'], recv_window=self.recv_window)
+
+    def _snapshot(self, orders, positions, errors):
+        """
+        Open orders and active positions of a round, None for the one the
+        poll of which failed with a CurrencyComException
+        """
+        for kind, result in (('open_orders', orders),
+                             ('positions', positions)):
+            if isinstance(result, CurrencyComException):
+                errors.append((kind, None, result))
+            elif isinstance(result, BaseException):
+                raise result
+        if isinstance(orders, BaseException):
+            orders = None
+        positions = None if isinstance(positions, BaseException) \
+            else self._active(positions)
+        return orders, positions
+
+    @staticmethod
+    def _actions(orders, positions):
+        return [('cancel', o) for o in orders or ()] \
+            + [('close', p) for p in positions or ()]
+
+    @staticmethod
+    def _record(actions, results, cancelled, closed, errors):
+        for (kind, item), result in zip(actions, results):
+            item_id = item['orderId'] if kind == 'cancel' else item['id']
+            if isinstance(result, CurrencyComException):
+                errors.append((kind, item_id, result))
+            elif kind == 'cancel':
+                cancelled.append(item_id)
+            else:
+                closed.append(item_id)
+
+    def flatten(self) -> FlattenReport:
+        start = time.perf_counter()
+        cancelled, closed, errors = [], [], []
+        rounds = 0
+        while True:
+            orders, positions = self._snapshot(*gather(
+                lambda poll: poll(), [self._open_orders, self._positions],
+                max_workers=2, errors=CurrencyComException), errors)
+            flat = orders == [] and positions == []
+            if flat or rounds == self.max_rounds:
+                break
+            if rounds:
+                time.sleep(self.retry_delay)
+            rounds += 1
+            actions = self._actions(orders, positions)
+            results = gather(self._act, actions,
+                             max_workers=self.max_workers,
+                             errors=CurrencyComException)
+            self._record(actions, results, cancelled, closed, errors)
+        return FlattenReport(flat, cancelled, closed,
+                             orders, positions, errors, rounds,
+                             time.perf_counter() - start)
+
+    async def async_flatten(self) -> FlattenReport:
+        """
+        flatten with an AsyncClient
+        """
+        start = time.perf_counter()
+        cancelled, closed, errors = [], [], []
+        rounds = 0
+        while True:
+            orders, positions = self._snapshot(*await asyncio.gather(
+                self._open_orders(), self._positions(),
+                return_exceptions=True), errors)
+            flat = orders == [] and positions == []
+            if flat or rounds == self.max_rounds:
+                break
+            if rounds:
+                await asyncio.sleep(self.retry_delay)
+            rounds += 1
+            actions = self._actions(orders, positions)
+            results = await async_gather(self._act, actions,
+                                         max_workers=self.max_workers,
+                                         errors=CurrencyComException)
+            self._record(actions, results, cancelled, closed, errors)
+        return FlattenReport(flat, cancelled, closed,
+                             orders, positions, errors, rounds,
+                             time.perf_counter() - start)
@@ -0,0 +1,339 @@
+"""
+Per-endpoint request metrics of Client and AsyncClient:
+
+    metrics = RequestMetrics()
+    client = Client('API_KEY', 'SECRET_KEY', metrics=metrics)
+    ...
+    print(metrics.prometheus())
+
+Every attempt of a request is timed in phases:
+
+    rate_limit  waiting for the RateLimiter
+    sign        signing the parameters
+    dns         resolving the host (AsyncClient only, Client counts it in
+                connect)
+    connect     opening a new connection, TCP + TLS, only recorded when a
+                connection was opened
+    server      from sending the request to the response headers
+    transfer    downloading the body
+    decode      decoding the body
+    total       the whole attempt
+
+Nothing is timed when a client has no metrics.
+"""
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter
+from urllib.parse import urlsplit
+
+# Seconds, from a cached keep-alive request to a slow download
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PHASES = ('rate_limit', 'sign', 'dns', 'connect', 'server', 'transfer',
+          'decode', 'total')
+
+
+class Histogram(object):
+    """
+    Counts of the observed values per bucket, the last bucket holds the
+    values above the highest bound
+    """
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """
+        (upper bound, number of values <= bound) pairs, the last bound is
+        float('inf')
+        """
+        total = 0
+        pairs = []
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, q: float):
+        """
+        Estimate of the q quantile, interpolated inside its bucket. None
+        when nothing was observed.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower = 0.0
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.bounds):
+                    # Above the highest bound
+                    return self.bounds[-1] if self.bounds else lower
+                upper = self.bounds[i]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            if i < len(self.bounds):
+                lower = self.bounds[i]
+        return lower
+
+
+class RequestSample(object):
+    """
+    Measures of one attempt of a request, passed to the hooks
+    """
+
+    __slots__ = ('method', 'url', 'endpoint', 'phases', 'status', 'error',
+                 'bytes_sent', 'bytes_received', 'started', '_last')
+
+    def __init__(self, method, url, endpoint):
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint
+        self.phases = {}
+        self.status = None
+        self.error = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.started = self._last = perf_counter()
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def lap(self, phase=None):
+        """
+        Record the time since the previous lap as phase and return it
+        """
+        now = perf_counter()
+        seconds = now - self._last
+        self._last = now
+        if phase is not None:
+            self.add(phase, seconds)
+        return seconds
+
+    def http(self, headers_after: float):
+        """
+        Split the time since the previous lap between server and transfer
+
+        :param headers_after: seconds from sending the request, connecting
+        included, to receiving the response headers
+        """
+        elapsed = self.lap()
+        setup = self.phases.get('dns', 0.0) + self.phases.get('connect', 0.0)
+        self.add('server', max(headers_after - setup, 0.0))
+        self.add('transfer', max(elapsed - headers_after, 0.0))
+
+
+class _EndpointMetrics(object):
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.phases = {}
+        self.requests = {}
+        self.errors = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def record(self, sample: RequestSample):
+        for phase, seconds in sample.phases.items():
+            histogram = self.phases.get(phase)
+            if histogram is None:
+                histogram = self.phases[phase] = Histogram(self.buckets)
+            histogram.observe(seconds)
+        key = (sample.method.upper(),
+               'none' if sample.status is None else str(sample.status))
+        self.requests[key] = self.requests.get(key, 0) + 1
+        if sample.error is not None:
+            name = type(sample.error).__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+        self.bytes_sent += sample.bytes_sent
+        self.bytes_received += sample.bytes_received
+
+
+class RequestMetrics(object):
+    """
+    Thread-safe latency histograms, status and error counters and byte
+    counts of the requests of one or several clients, per endpoint.
+
+    Hooks registered with before_request and after_request are called with
+    the RequestSample of every attempt, before it is sent and once it is
+    done.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, base_url=None):
+        """
+        :param buckets: upper bounds in seconds of the latency histograms
+        :param base_url: prefix removed from the urls to name the
+        endpoints, by default the whole path is kept
+        """
+        self.buckets = tuple(buckets)
+        self.base_url = base_url
+        self._endpoints = {}
+        self._names = {}
+        self._before = []
+        self._after = []
+        self._lock = Lock()
+
+    def before_request(self, callback):
+        """
+        Call callback(sample) before every attempt
+        """
+        self._before.append(callback)
+        return callback
+
+    def after_request(self, callback):
+        """
+        Call callback(sample) after every attempt, sample.error is set when
+        it failed
+        """
+        self._after.append(callback)
+        return callback
+
+    def _endpoint(self, url):
+        name = self._names.get(url)
+        if name is None:
+            if self.base_url and url.startswith(self.base_url):
+                name = url[len(self.base_url):]
+            else:
+                name = urlsplit(url).path
+            self._names[url] = name
+        return name
+
+    def start(self, method, url) -> RequestSample:
+        sample = RequestSample(method, url, self._endpoint(url))
+        for callback in self._before:
+            callback(sample)
+        return sample
+
+    def finish(self, sample: RequestSample, error=None):
+        sample.add('total', perf_counter() - sample.started)
+        if error is not None:
+            sample.error = error
+            if sample.status is None:
+                sample.status = getattr(error, 'status_code', None)
+        with self._lock:
+            endpoint = self._endpoints.get(sample.endpoint)
+            if endpoint is None:
+                endpoint = self._endpoints[sample.endpoint] = \
+                    _EndpointMetrics(self.buckets)
+            endpoint.record(sample)
+        for callback in self._after:
+            callback(sample)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+    def as_dict(self):
+        """
+        Snapshot of the metrics.
+
+        :return: dict object
+        {
+            "depth": {
+                "requests": {"GET 200": 10, "GET 429": 1},
+                "errors": {"CurrencyComRateLimitException": 1},
+                "bytes_sent": 1230,
+                "bytes_received": 45100,
+                "phases": {
+                    "total": {
+                        "count": 11,
+                        "sum": 0.421,
+                        "p50": 0.031,
+                        "p99": 0.097,
+                        "buckets": [[0.0005, 0], ..., [Infinity, 11]]
+                    },
+                    ...
+                }
+            }
+        }
+        """
+        with self._lock:
+            return {
+                name: {
+                    'requests': {'{} {}'.format(*key): count
+                                 for key, count in endpoint.requests.items()},
+                    'errors': dict(endpoint.errors),
+                    'bytes_sent': endpoint.bytes_sent,
+                    'bytes_received': endpoint.bytes_received,
+                    'phases': {
+                        phase: {
+                            'count': histogram.count,
+                            'sum': histogram.sum,
+                            'p50': histogram.quantile(0.5),
+                            'p99': histogram.quantile(0.99),
+                            'buckets': [list(pair) for pair
+                                        in histogram.cumulative()],
+                        }
+                        for phase, histogram in endpoint.phases.items()
+                    },
+                }
+                for name, endpoint in self._endpoints.items()
+            }
+
+    def prometheus(self, prefix: str = 'currencycom') -> str:
+        """
+        The metrics in the Prometheus text exposition format
+        """
+        duration = prefix + '_request_duration_seconds'
+        requests = prefix + '_requests_total'
+        errors = prefix + '_request_errors_total'
+        sent = prefix + '_request_bytes_sent_total'
+        received = prefix + '_request_bytes_received_total'
+        lines = {
+            duration: ['# HELP {} Duration of the request phases'.format(
+                duration), '# TYPE {} histogram'.format(duration)],
+            requests: ['# HELP {} Requests by status'.format(requests),
+                       '# TYPE {} counter'.format(requests)],
+            errors: ['# HELP {} Failed requests by error'.format(errors),
+                     '# TYPE {} counter'.format(errors)],
+            sent: ['# HELP {} Bytes sent'.format(sent),
+                   '# TYPE {} counter'.format(sent)],
+            received: ['# HELP {} Bytes received'.format(received),
+                       '# TYPE {} counter'.format(received)],
+        }
+        with self._lock:
+            for name, endpoint in sorted(self._endpoints.items()):
+                label = 'endpoint="{}"'.format(_escape(name))
+                for phase, histogram in sorted(endpoint.phases.items()):
+                    labels = '{},phase="{}"'.format(label, phase)
+                    for bound, count in histogram.cumulative():
+                        lines[duration].append(
+                            '{}_bucket{{{},le="{}"}} {}'.format(
+                                duration, labels, _format_bound(bound),
+                                count))
+                    lines[duration].append('{}_sum{{{}}} {!r}'.format(
+                        duration, labels, histogram.sum))
+                    lines[duration].append('{}_count{{{}}} {}'.format(
+                        duration, labels, histogram.count))
+                for (method, status), count in sorted(
+                        endpoint.requests.items()):
+                    lines[requests].append(
+                        '{}{{{},method="{}",status="{}"}} {}'.format(
+                            requests, label, method, status, count))
+                for error, count in sorted(endpoint.errors.items()):
+                    lines[errors].append('{}{{{},error="{}"}} {}'.format(
+                        errors, label, error, count))
+                lines[sent].append('{}{{{}}} {}'.format(
+                    sent, label, endpoint.bytes_sent))
+                lines[received].append('{}{{{}}} {}'.format(
+                    received, label, endpoint.bytes_received))
+        return '\n'.join(line for group in lines.values()
+                         for line in group) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(bound)
@@ -0,0 +1,266 @@
+"""
+Typed models of the responses.
+
+Models keep the raw values of a response in __slots__, which takes several
+times less memory than the decoded dicts, and parse numeric values on their
+first access only:
+
+    fills = Order(client.new_order(...)).fills
+    klines = Kline.many(client.get_klines(...))
+
+raw gives back the response the model was built from, the keys no field
+is defined for included.
+"""
+
+_MISSING = object()
+
+
+def _slot(attr):
+    return '_' + attr
+
+
+def _parsed_slot(attr):
+    return '_' + attr + '_parsed'
+
+
+class _Model(object):
+    """
+    Base of the models. Subclasses list their fields in _fields as
+    (attribute, response key, cast) triples, cast is None for the values
+    kept as they are, and set __slots__ = _slots(_fields).
+    Keys are indexes for the models of list responses. The keys of the
+    response without a field are kept as they are in _extra.
+    """
+
+    __slots__ = ('_extra',)
+    _fields = ()
+    _setters = ()
+    _keys = frozenset()
+    _size = 0
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for attr, _, cast in cls._fields:
+            setattr(cls, attr, cls._field(attr, cast))
+        cls._setters = tuple((getattr(cls, _slot(attr)).__set__, key)
+                             for attr, key, _ in cls._fields)
+        cls._keys = frozenset(key for _, key, _ in cls._fields)
+        cls._size = len(cls._fields)
+
+    @classmethod
+    def _field(cls, attr, cast):
+        raw = getattr(cls, _slot(attr))
+        if cast is None:
+            def get(self):
+                value = raw.__get__(self)
+                return None if value is _MISSING else value
+            return property(get)
+
+        parsed = getattr(cls, _parsed_slot(attr))
+
+        def get_parsed(self):
+            try:
+                return parsed.__get__(self)
+            except AttributeError:
+                pass
+            value = raw.__get__(self)
+            if value is _MISSING or value is None:
+                value = None
+            else:
+                value = cast(value)
+            parsed.__set__(self, value)
+            return value
+        return property(get_parsed)
+
+    def __init__(self, raw):
+        if type(raw) is list:
+            size = len(raw)
+            for set_raw, key in self._setters:
+                set_raw(self, raw[key] if key < size else _MISSING)
+            self._extra = raw[self._size:] if size > self._size else None
+        else:
+            get = raw.get
+            for set_raw, key in self._setters:
+                set_raw(self, get(key, _MISSING))
+            extra = raw.keys() - self._keys
+            self._extra = {key: raw[key] for key in raw if key in extra} \
+                if extra else None
+
+    @classmethod
+    def many(cls, items):
+        """
+        Models of a list of raw items
+        """
+        return [cls(item) for item in items]
+
+    @property
+    def raw(self):
+        """
+        The response the model was built from, as received
+        """
+        values = [(key, getattr(self, _slot(attr)))
+                  for attr, key, _ in self._fields]
+        if self._fields and type(self._fields[0][1]) is int:
+            raw = [value for _, value in values if value is not _MISSING]
+            if self._extra:
+                raw.extend(self._extra)
+            return raw
+        raw = {key: value for key, value in values if value is not _MISSING}
+        if self._extra:
+            raw.update(self._extra)
+        return raw
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.raw == other.raw
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(
+            '{}={!r}'.format(attr, getattr(self, attr))
+            for attr, _, _ in self._fields))
+
+
+def _slots(fields):
+    slots = []
+    for attr, _, cast in fields:
+        slots.append(_slot(attr))
+        if cast is not None:
+            slots.append(_parsed_slot(attr))
+    return tuple(slots)
+
+
+class Kline(_Model):
+    """
+    One row of get_klines
+    """
+    _fields = (
+        ('open_time', 0, None),
+        ('open', 1, float),
+        ('high', 2, float),
+        ('low', 3, float),
+        ('close', 4, float),
+        ('volume', 5, float),
+    )
+    __slots__ = _slots(_fields)
+
+
+class AggTrade(_Model):
+    """
+    One item of get_agg_trades
+    """
+    _fields = (
+        ('id', 'a', None),
+        ('price', 'p', float),
+        ('quantity', 'q', float),
+        ('timestamp', 'T', None),
+        ('buyer_maker', 'm', None),
+    )
+    __slots__ = _slots(_fields)
+
+
+class Fill(_Model):
+    """
+    One fill of a FULL new_order response
+    """
+    _fields = (
+        ('price', 'price', float),
+        ('quantity', 'qty', float),
+        ('commission', 'commission', float),
+        ('commission_asset', 'commissionAsset', None),
+    )
+    __slots__ = _slots(_fields)
+
+
+class Order(_Model):
+    """
+    new_order, cancel_order or get_open_orders order
+    """
+    _fields = (
+        ('symbol', 'symbol', None),
+        ('order_id', 'orderId', None),
+        ('order_list_id', 'orderListId', None),
+        ('client_order_id', 'clientOrderId', None),
+        ('price', 'price', float),
+        ('orig_qty', 'origQty', float),
+        ('executed_qty', 'executedQty', float),
+        ('cummulative_quote_qty', 'cummulativeQuoteQty', float),
+        ('orig_quote_order_qty', 'origQuoteOrderQty', float),
+        ('stop_price', 'stopPrice', float),
+        ('status', 'status', None),
+        ('time_in_force', 'timeInForce', None),
+        ('type', 'type', None),
+        ('side', 'side', None),
+        ('time', 'time', None),
+        ('update_time', 'updateTime', None),
+        ('transact_time', 'transactTime', None),
+        ('working', 'isWorking', None),
+        ('fills', 'fills', Fill.many),
+    )
+    __slots__ = _slots(_fields)
+
+
+class Trade(_Model):
+    """
+    One row of get_account_trade_list
+    """
+    _fields = (
+        ('symbol', 'symbol', None),
+        ('order_id', 'orderId', None),
+        ('order_list_id', 'orderListId', None),
+        ('price', 'price', float),
+        ('quantity', 'qty', float),
+        ('quote_quantity', 'quoteQty', float),
+        ('commission', 'commission', float),
+        ('commission_asset', 'commissionAsset', None),
+        ('time', 'time', None),
+        ('buyer', 'isBuyer', None),
+        ('maker', 'isMaker', None),
+    )
+    __slots__ = _slots(_fields)
+
+
+class Position(_Model):
+    """
+    One of the positions of list_leverage_trades
+    """
+    _fields = (
+        ('id', 'id', None),
+        ('account_id', 'accountId', None),
+        ('instrument_id', 'instrumentId', None),
+        ('order_id', 'orderId', None),
+        ('symbol', 'symbol', None),
+        ('state', 'state', None),
+        ('currency', 'currency', None),
+        ('open_quantity', 'openQuantity', float),
+        ('open_price', 'openPrice', float),
+        ('close_quantity', 'closeQuantity', float),
+        ('close_price', 'closePrice', float),
+        ('take_profit', 'takeProfit', float),
+        ('stop_loss', 'stopLoss', float),
+        ('guaranteed_stop_loss', 'guaranteedStopLoss', None),
+        ('rpl', 'rpl', float),
+        ('rpl_converted', 'rplConverted', float),
+        ('swap', 'swap', float),
+        ('swap_converted', 'swapConverted', float),
+        ('fee', 'fee', float),
+        ('dividend', 'dividend', float),
+        ('margin', 'margin', float),
+        ('cost', 'cost', float),
+        ('created_timestamp', 'createdTimestamp', None),
+        ('open_timestamp', 'openTimestamp', None),
+    )
+    __slots__ = _slots(_fields)
+
+
+class Balance(_Model):
+    """
+    One of the balances of get_account_info
+    """
+    _fields = (
+        ('account_id', 'accountId', None),
+        ('asset', 'asset', None),
+        ('free', 'free', float),
+        ('locked', 'locked', float),
+        ('collateral_currency', 'collateralCurrency', None),
+        ('default', 'default', None),
+    )
+    __slots__ = _slots(_fields)
@@ -0,0 +1,219 @@
+from typing import NamedTuple
+
+from .client import OrderSide
+from .columnar import _require_numpy, np
+
+
+class BookLevels(NamedTuple):
+    """
+    Price levels of one side, best first. Both arrays are views of the
+    book and change with it, copy them to keep a snapshot.
+    """
+    prices: 'np.ndarray'  # float64
+    quantities: 'np.ndarray'  # float64
+
+
+class _BookSide(object):
+    """
+    Price levels sorted in contiguous arrays, the best level last.
+
+    Keeping the best level last makes top of book access O(1) and keeps
+    the updates, which mostly hit the top levels, from moving the rest of
+    the array. Levels are searched on sign * price, which is ascending on
+    both sides.
+    """
+
+    def __init__(self, sign, capacity):
+        self.sign = sign
+        self.size = 0
+        self._keys = np.empty(capacity)
+        self._prices = np.empty(capacity)
+        self._quantities = np.empty(capacity)
+
+    def load(self, prices, quantities):
+        order = np.argsort(self.sign * prices, kind='stable')
+        prices, quantities = prices[order], quantities[order]
+        keep = quantities > 0
+        prices, quantities = prices[keep], quantities[keep]
+        self.size = 0
+        self._reserve(len(prices))
+        self.size = len(prices)
+        self._keys[:self.size] = self.sign * prices
+        self._prices[:self.size] = prices
+        self._quantities[:self.size] = quantities
+
+    def _reserve(self, size):
+        if size <= len(self._keys):
+            return
+        capacity = max(size, 2 * len(self._keys))
+        for name in ('_keys', '_prices', '_quantities'):
+            array = np.empty(capacity)
+            array[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, array)
+
+    def _index(self, price):
+        key = self.sign * price
+        i = int(self._keys[:self.size].searchsorted(key))
+        return i, i < self.size and self._keys[i] == key
+
+    def set(self, price, quantity):
+        """
+        Set the quantity of a level, 0 removes it
+        """
+        i, found = self._index(price)
+        n = self.size
+        if found:
+            if quantity > 0:
+                self._quantities[i] = quantity
+                return
+            for array in (self._keys, self._prices, self._quantities):
+                array[i:n - 1] = array[i + 1:n]
+            self.size -= 1
+        elif quantity > 0:
+            self._reserve(n + 1)
+            for array in (self._keys, self._prices, self._quantities):
+                array[i + 1:n + 1] = array[i:n]
+            self._keys[i] = self.sign * price
+            self._prices[i] = price
+            self._quantities[i] = quantity
+            self.size += 1
+
+    def quantity(self, price):
+        i, found = self._index(price)
+        return float(self._quantities[i]) if found else 0.0
+
+    def best(self):
+        if not self.size:
+            return None
+        return (float(self._prices[self.size - 1]),
+                float(self._quantities[self.size - 1]))
+
+    def levels(self, depth=None):
+        start = 0 if depth is None else max(0, self.size - depth)
+        return BookLevels(self._prices[start:self.size][::-1],
+                          self._quantities[start:self.size][::-1])
+
+
+def _pairs(levels):
+    """
+    (price, quantity) pairs from a list of pairs or a price to quantity
+    mapping, values may be strings
+    """
+    if hasattr(levels, 'items'):
+        levels = levels.items()
+    return [(float(price), float(quantity)) for price, quantity in levels]
+
+
+class LocalOrderBook(object):
+    """
+    Order book of one symbol kept up to date from a get_order_book
+    snapshot and incremental updates:
+
+        book = LocalOrderBook.from_snapshot(
+            'BTC/USD', client.get_order_book('BTC/USD', limit=1000))
+        book.apply(bids=[('9000.5', '0')], asks=[('9001', '1.5')],
+                   update_id=book.last_update_id + 1)
+        book.best_bid(), book.best_ask(), book.bids(10)
+
+    A quantity of 0 removes the level. Updates are O(log n) to find the
+    level plus a move of the levels above it, best bid and ask are O(1).
+    """
+
+    def __init__(self, symbol, capacity: int = 128):
+        """
+        :param symbol:
+        :param capacity: initial number of levels of every side, the
+        arrays grow when needed
+        """
+        _require_numpy()
+        self.symbol = symbol
+        self.last_update_id = None
+        self._bids = _BookSide(1, capacity)
+        self._asks = _BookSide(-1, capacity)
+
+    @classmethod
+    def from_snapshot(cls, symbol, snapshot: dict):
+        book = cls(symbol, max(len(snapshot['bids']),
+                               len(snapshot['asks']), 1))
+        book.load(snapshot)
+        return book
+
+    def load(self, snapshot: dict):
+        """
+        Replace the whole book with a get_order_book response
+        """
+        for side, levels in ((self._bids, snapshot['bids']),
+                             (self._asks, snapshot['asks'])):
+            pairs = np.array(_pairs(levels), dtype=float).reshape(-1, 2)
+            side.load(pairs[:, 0], pairs[:, 1])
+        self.last_update_id = snapshot.get('lastUpdateId')
+
+    def apply(self, bids=(), asks=(), update_id=None):
+        """
+        Apply changed levels.
+
+        :param bids: changed bid levels, (price, quantity) pairs or a
+        price to quantity mapping
+        :param asks: changed ask levels, same format
+        :param update_id: id of the update. Updates not newer than
+        last_update_id are ignored.
+        :return: False when the update was ignored
+        """
+        if update_id is not None:
+            if self.last_update_id is not None \
+                    and update_id <= self.last_update_id:
+                return False
+            self.last_update_id = update_id
+        for price, quantity in _pairs(bids):
+            self._bids.set(price, quantity)
+        for price, quantity in _pairs(asks):
+            self._asks.set(price, quantity)
+        return True
+
+    def _side(self, side: OrderSide):
+        return self._bids if side == OrderSide.BUY else self._asks
+
+    def best_bid(self):
+        """
+        (price, quantity) of the best bid or None
+        """
+        return self._bids.best()
+
+    def best_ask(self):
+        """
+        (price, quantity) of the best ask or None
+        """
+        return self._asks.best()
+
+    def mid_price(self):
+        bid, ask = self._bids.best(), self._asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def spread(self):
+        bid, ask = self._bids.best(), self._asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def bids(self, depth: int = None) -> BookLevels:
+        """
+        Views of the best depth bid levels, all of them by default
+        """
+        return self._bids.levels(depth)
+
+    def asks(self, depth: int = None) -> BookLevels:
+        """
+        Views of the best depth ask levels, all of them by default
+        """
+        return self._asks.levels(depth)
+
+    def quantity(self, side: OrderSide, price):
+        """
+        Quantity at price, BUY for the bids and SELL for the asks
+        """
+        return self._side(side).quantity(float(price))
+
+    def depth(self, side: OrderSide):
+        return self._side(side).size
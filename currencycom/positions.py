@@ -0,0 +1,233 @@
+from threading import Lock
+from typing import List, NamedTuple
+
+from .columnar import _require_numpy, np
+from .flatten import Flattener
+
+# Numeric fields of the list_leverage_trades positions kept as columns
+POSITION_FIELDS = ('openQuantity', 'openPrice', 'margin', 'swap', 'fee')
+
+_QUANTITY, _OPEN_PRICE, _MARGIN, _SWAP, _FEE = range(len(POSITION_FIELDS))
+
+
+def _pnl(table, price):
+    return (table[_QUANTITY] * (price - table[_OPEN_PRICE])
+            + table[_SWAP] + table[_FEE])
+
+
+class PositionDelta(NamedTuple):
+    """
+    Changes between two snapshots: the positions opened, the positions
+    one of the POSITION_FIELDS of which changed, and the ids of the
+    positions closed
+    """
+    opened: List[dict]
+    changed: List[dict]
+    closed: List[str]
+
+
+class PositionBook(object):
+    """
+    Leverage positions of list_leverage_trades kept as columns, one row
+    per position:
+
+        book = PositionBook(client)
+        delta = book.poll()
+        prices = book.prices({'BTC/USD_LEVERAGE': 9000.0})
+        book.exposure(prices), book.pnl(prices)
+
+    Only the positions in the ACTIVE state are kept, like Flattener does, a
+    position leaving it is reported as closed. Every snapshot is diffed by
+    position id against the previous one in a single vectorized pass. The
+    per symbol figures are arrays aligned with book.symbols, which only
+    grows, so a price vector built once stays valid until a position on a
+    new symbol is opened.
+    """
+
+    def __init__(self, client=None):
+        """
+        :param client: Client or AsyncClient polled by poll and async_poll
+        """
+        _require_numpy()
+        self.client = client
+        self.symbols = []
+        self.ids = []
+        self._symbol_index = {}
+        self._rows = {}
+        self._positions = []
+        self._table = np.empty((len(POSITION_FIELDS), 0))
+        self._codes = np.empty(0, dtype=np.intp)
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, position_id):
+        return position_id in self._rows
+
+    def __getitem__(self, position_id) -> dict:
+        """
+        Last snapshot of a position
+        """
+        return self._positions[self._rows[position_id]]
+
+    @property
+    def quantity(self) -> 'np.ndarray':
+        """
+        openQuantity of every position, negative when short
+        """
+        return self._table[_QUANTITY]
+
+    @property
+    def open_price(self) -> 'np.ndarray':
+        return self._table[_OPEN_PRICE]
+
+    @property
+    def margin(self) -> 'np.ndarray':
+        return self._table[_MARGIN]
+
+    @property
+    def swap(self) -> 'np.ndarray':
+        return self._table[_SWAP]
+
+    @property
+    def fee(self) -> 'np.ndarray':
+        return self._table[_FEE]
+
+    @property
+    def symbol_codes(self) -> 'np.ndarray':
+        """
+        Index in symbols of the symbol of every position
+        """
+        return self._codes
+
+    def _code(self, symbol):
+        code = self._symbol_index.get(symbol)
+        if code is None:
+            code = self._symbol_index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return code
+
+    def update(self, snapshot) -> PositionDelta:
+        """
+        Replace the positions by the active ones of a list_leverage_trades
+        response
+
+        :param snapshot: response, or its list of positions
+        """
+        positions = snapshot['positions'] \
+            if hasattr(snapshot, 'keys') else snapshot
+        active = Flattener.ACTIVE_POSITION_STATE
+        positions = [position for position in positions
+                     if position.get('state') == active]
+        ids = [position['id'] for position in positions]
+        table = np.fromiter(
+            (np.nan if value is None else value
+             for position in positions
+             for value in map(position.get, POSITION_FIELDS)),
+            dtype=float, count=len(positions) * len(POSITION_FIELDS))
+        table = table.reshape(len(positions), len(POSITION_FIELDS)).T.copy()
+        with self._lock:
+            closed = []
+            if ids == self.ids:
+                previous = self._table
+                opened = np.zeros(len(ids), dtype=bool)
+                codes = self._codes
+            else:
+                rows = np.fromiter((self._rows.get(i, -1) for i in ids),
+                                   dtype=np.intp, count=len(ids))
+                opened = rows < 0
+                previous = np.full_like(table, np.nan)
+                previous[:, ~opened] = self._table[:, rows[~opened]]
+                current = set(ids)
+                closed = [i for i in self.ids if i not in current]
+                codes = np.fromiter(
+                    (self._code(position['symbol'])
+                     for position in positions),
+                    dtype=np.intp, count=len(positions))
+                self.ids = ids
+                self._rows = {i: row for row, i in enumerate(ids)}
+            unchanged = (table == previous) \
+                | (np.isnan(table) & np.isnan(previous))
+            changed = ~opened & ~unchanged.all(axis=0)
+            self._table = table
+            self._codes = codes
+            self._positions = positions
+        return PositionDelta([positions[i] for i in np.flatnonzero(opened)],
+                             [positions[i] for i in np.flatnonzero(changed)],
+                             closed)
+
+    def poll(self) -> PositionDelta:
+        """
+        Update from the client
+        """
+        return self.update(self.client.list_leverage_trades())
+
+    async def async_poll(self) -> PositionDelta:
+        """
+        poll with an AsyncClient
+        """
+        return self.update(await self.client.list_leverage_trades())
+
+    def prices(self, prices) -> 'np.ndarray':
+        """
+        Price vector aligned with symbols, NaN for the missing symbols
+
+        :param prices: mapping of symbol to price
+        """
+        return np.fromiter((prices.get(symbol, np.nan)
+                            for symbol in self.symbols),
+                           dtype=float, count=len(self.symbols))
+
+    def _columns(self, prices):
+        with self._lock:
+            table, codes = self._table, self._codes
+        if hasattr(prices, 'keys'):
+            prices = self.prices(prices)
+        prices = np.asarray(prices, dtype=float)
+        if len(prices) < len(self.symbols):
+            raise ValueError('Expected a price for each of the {} symbols. '
+                             'Got {}'.format(len(self.symbols), len(prices)))
+        return table, codes, prices[codes]
+
+    def _by_symbol(self, codes, values):
+        return np.bincount(codes, weights=values,
+                           minlength=len(self.symbols))
+
+    def position_pnl(self, prices) -> 'np.ndarray':
+        """
+        Unrealized profit and loss of every position, swap and fee
+        included
+
+        :param prices: price vector aligned with symbols or mapping of
+        symbol to price
+        """
+        table, codes, price = self._columns(prices)
+        return _pnl(table, price)
+
+    def pnl(self, prices) -> 'np.ndarray':
+        """
+        Unrealized profit and loss by symbol, aligned with symbols, see
+        position_pnl
+        """
+        table, codes, price = self._columns(prices)
+        return self._by_symbol(codes, _pnl(table, price))
+
+    def exposure(self, prices, gross: bool = False) -> 'np.ndarray':
+        """
+        Notional by symbol, aligned with symbols: negative when the
+        symbol is sold short, or the sum of the absolute notionals when
+        gross
+        """
+        table, codes, price = self._columns(prices)
+        notional = table[_QUANTITY] * price
+        return self._by_symbol(codes, np.abs(notional) if gross
+                               else notional)
+
+    def margin_by_symbol(self) -> 'np.ndarray':
+        """
+        Margin by symbol, aligned with symbols
+        """
+        with self._lock:
+            table, codes = self._table, self._codes
+        return self._by_symbol(codes, table[_MARGIN])
@@ -0,0 +1,182 @@
+import asyncio
+import time
+from enum import Enum
+from threading import Lock
+
+
+class RateLimitType(Enum):
+    REQUEST_WEIGHT = 'REQUEST_WEIGHT'
+    ORDERS = 'ORDERS'
+    RAW_REQUESTS = 'RAW_REQUESTS'
+
+
+_INTERVAL_SECONDS = {
+    'SECOND': 1,
+    'MINUTE': 60,
+    'HOUR': 3600,
+    'DAY': 86400,
+}
+
+# Request weight by the last part of the endpoint path, default 1
+_ENDPOINT_WEIGHTS = {
+    'account': 5,
+    'myTrades': 5,
+}
+
+# Weight of a depth request by its limit
+_DEPTH_WEIGHTS = ((100, 1), (500, 5), (1000, 10))
+_DEPTH_MAX_WEIGHT = 50
+
+# Endpoints returning every symbol when no symbol is sent
+_ALL_SYMBOLS_WEIGHT = 40
+_ALL_SYMBOLS_ENDPOINTS = ('24hr', 'openOrders')
+
+
+def request_weight(url, params):
+    """
+    REQUEST_WEIGHT of a request, following the exchange documentation
+
+    :param url: endpoint url
+    :param params: dict of request parameters or None
+    """
+    endpoint = url.rsplit('/', 1)[-1]
+    params = params or {}
+    if endpoint == 'depth':
+        limit = params.get('limit', 100)
+        for max_limit, weight in _DEPTH_WEIGHTS:
+            if limit <= max_limit:
+                return weight
+        return _DEPTH_MAX_WEIGHT
+    if endpoint in _ALL_SYMBOLS_ENDPOINTS and params.get('symbol') is None:
+        return _ALL_SYMBOLS_WEIGHT
+    return _ENDPOINT_WEIGHTS.get(endpoint, 1)
+
+
+class TokenBucket(object):
+    """
+    Token bucket with reservations.
+
+    Tokens may be reserved in advance: the bucket goes into debt and the
+    caller is told how long to wait, so nobody holds a lock while waiting.
+    """
+
+    def __init__(self, capacity: float, rate: float, now: float = None):
+        """
+        :param capacity: max number of tokens, i.e. the max burst
+        :param rate: tokens added per second
+        :param now: time.monotonic() of the creation
+        """
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self._updated = time.monotonic() if now is None else now
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, cost: float, now: float):
+        """
+        Take cost tokens and return the seconds to wait before using them
+        """
+        self._refill(now)
+        if not cost:
+            return 0.0
+        self.tokens -= cost
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def pause(self, seconds: float, now: float):
+        """
+        Take all the tokens the bucket would get in the next seconds
+        """
+        self._refill(now)
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+class RateLimiter(object):
+    """
+    Client-side limiter keeping the request rate just under the limits
+    published in exchangeInfo rateLimits.
+
+    Every limit of L per interval T becomes a token bucket refilled with
+    headroom * L / T tokens per second and holding up to
+    (1 - headroom) * L tokens, so no window of T ever sees more than L.
+    The limiter is thread-safe and can be used from asyncio code, see
+    acquire and async_acquire.
+    """
+
+    _shared = {}
+    _shared_lock = Lock()
+
+    def __init__(self, rate_limits, headroom: float = 0.9):
+        """
+        :param rate_limits: rateLimits list of exchangeInfo
+        :param headroom: share of every limit the limiter aims at
+        """
+        self.headroom = headroom
+        self._lock = Lock()
+        self._buckets = []
+        known_types = {t.value for t in RateLimitType}
+        for limit in rate_limits:
+            if limit.get('rateLimitType') not in known_types:
+                continue
+            seconds = _INTERVAL_SECONDS[limit['interval']] \
+                * limit.get('intervalNum', 1)
+            capacity = max(1.0, limit['limit'] * (1 - headroom))
+            self._buckets.append((
+                RateLimitType(limit['rateLimitType']),
+                TokenBucket(capacity, limit['limit'] * headroom / seconds)))
+
+    @classmethod
+    def shared(cls, api_key, rate_limits, headroom: float = 0.9):
+        """
+        Limiter shared by every client using api_key. Created from
+        rate_limits on the first call.
+        """
+        with cls._shared_lock:
+            if api_key not in cls._shared:
+                cls._shared[api_key] = cls(rate_limits, headroom)
+            return cls._shared[api_key]
+
+    @staticmethod
+    def costs(method, url, params=None):
+        """
+        Cost of a request for every rate limit type
+        """
+        is_order = method.lower() == 'post' and url.endswith('/order')
+        return {
+            RateLimitType.REQUEST_WEIGHT: request_weight(url, params),
+            RateLimitType.RAW_REQUESTS: 1,
+            RateLimitType.ORDERS: 1 if is_order else 0,
+        }
+
+    def reserve(self, costs):
+        """
+        Reserve costs in every bucket and return the seconds to wait
+        """
+        now = time.monotonic()
+        with self._lock:
+            return max([bucket.reserve(costs.get(limit_type, 0), now)
+                        for limit_type, bucket in self._buckets] or [0.0])
+
+    def pause(self, seconds: float):
+        """
+        Hold every request for seconds, e.g. after a 429 response
+        """
+        now = time.monotonic()
+        with self._lock:
+            for _, bucket in self._buckets:
+                bucket.pause(seconds, now)
+
+    def acquire(self, costs):
+        delay = self.reserve(costs)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def async_acquire(self, costs):
+        delay = self.reserve(costs)
+        if delay > 0:
+            await asyncio.sleep(delay)
@@ -0,0 +1,211 @@
+import math
+import time
+from decimal import Decimal
+from threading import Event, Lock, Thread
+from typing import FrozenSet, NamedTuple, Optional
+
+from .client import Client, CurrencyComConstants
+
+
+def _decimals(step):
+    """
+    Digits after the point of step, 2 for 0.25 and 3 for 0.025
+    """
+    if not step:
+        return None
+    return max(0, -Decimal(str(step)).normalize().as_tuple().exponent)
+
+
+class SymbolInfo(NamedTuple):
+    """
+    Trading rules of one symbol precomputed from exchangeInfo
+    """
+    symbol: str
+    name: str
+    status: str
+    base_asset: str
+    quote_asset: str
+    base_asset_precision: int
+    quote_precision: int
+    order_types: FrozenSet[str]
+    tick_size: Optional[float]
+    price_decimals: Optional[int]
+    min_price: Optional[float]
+    max_price: Optional[float]
+    step_size: Optional[float]
+    quantity_decimals: Optional[int]
+    min_qty: Optional[float]
+    max_qty: Optional[float]
+    is_leverage: bool
+    raw: dict
+
+    @classmethod
+    def from_exchange_info(cls, symbol: dict):
+        filters = {f.get('filterType'): f for f in symbol.get('filters', [])}
+        price_filter = filters.get('PRICE_FILTER', {})
+        lot_size = filters.get('LOT_SIZE', {})
+
+        def number(value):
+            return float(value) if value not in (None, '') else None
+
+        tick_size = number(price_filter.get('tickSize',
+                                            symbol.get('tickSize')))
+        step_size = number(lot_size.get('stepSize'))
+        return cls(
+            symbol=symbol['symbol'],
+            name=symbol.get('name'),
+            status=symbol.get('status'),
+            base_asset=symbol.get('baseAsset'),
+            quote_asset=symbol.get('quoteAsset'),
+            base_asset_precision=symbol.get('baseAssetPrecision'),
+            quote_precision=symbol.get('quotePrecision'),
+            order_types=frozenset(symbol.get('orderTypes', ())),
+            tick_size=tick_size,
+            price_decimals=_decimals(tick_size),
+            min_price=number(price_filter.get('minPrice')),
+            max_price=number(price_filter.get('maxPrice')),
+            step_size=step_size,
+            quantity_decimals=_decimals(step_size),
+            min_qty=number(lot_size.get('minQty')),
+            max_qty=number(lot_size.get('maxQty')),
+            is_leverage=symbol['symbol'].endswith(
+                CurrencyComConstants.LEVERAGE_SYMBOL_SUFFIX),
+            raw=symbol,
+        )
+
+    def round_price(self, price: float):
+        """
+        Round price down to the tick size
+        """
+        if not self.tick_size:
+            return price
+        return round(math.floor(price / self.tick_size + 1e-9)
+                     * self.tick_size, self.price_decimals)
+
+    def round_quantity(self, quantity: float):
+        """
+        Round quantity down to the step size
+        """
+        if not self.step_size:
+            return quantity
+        return round(math.floor(quantity / self.step_size + 1e-9)
+                     * self.step_size, self.quantity_decimals)
+
+
+class _Indexes(object):
+    def __init__(self, exchange_info: dict):
+        self.exchange_info = exchange_info
+        self.symbols = {}
+        self.base_assets = {}
+        self.quote_assets = {}
+        self.leverage = {}
+        suffix = CurrencyComConstants.LEVERAGE_SYMBOL_SUFFIX
+        for raw in exchange_info.get('symbols', []):
+            info = SymbolInfo.from_exchange_info(raw)
+            self.symbols[info.symbol] = info
+            self.base_assets.setdefault(info.base_asset, []).append(info)
+            self.quote_assets.setdefault(info.quote_asset, []).append(info)
+            if info.is_leverage:
+                self.leverage[info.symbol[:-len(suffix)]] = info
+
+
+class SymbolRegistry(object):
+    """
+    Cached and indexed exchangeInfo.
+
+    Lookups are dict reads. Without background refresh the data is
+    downloaded again by the first lookup after ttl seconds, with it a
+    daemon thread refreshes the data every ttl seconds and lookups never
+    touch the network:
+
+        registry = SymbolRegistry(client, ttl=300)
+        registry.start()
+        registry['BTC/USD'].round_price(7183.38812)
+    """
+
+    def __init__(self, client: Client, ttl: float = 300):
+        self.client = client
+        self.ttl = ttl
+        self._indexes = None
+        self._updated = 0
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+
+    def refresh(self):
+        """
+        Download exchangeInfo and rebuild the indexes
+        """
+        indexes = _Indexes(self.client.get_exchange_info())
+        # Readers see either the old or the new indexes, never a mix
+        self._indexes = indexes
+        self._updated = time.monotonic()
+
+    def _get_indexes(self):
+        indexes = self._indexes
+        if indexes is not None and (
+                self._thread is not None
+                or time.monotonic() - self._updated < self.ttl):
+            return indexes
+        with self._lock:
+            if self._indexes is None \
+                    or time.monotonic() - self._updated >= self.ttl:
+                self.refresh()
+            return self._indexes
+
+    def _run(self):
+        while not self._stop.wait(self.ttl):
+            try:
+                self.refresh()
+            except Exception:
+                # Keep serving the last known data, try again next time
+                pass
+
+    def start(self):
+        """
+        Load the data and start refreshing it in a background thread
+        """
+        if self._thread is None:
+            if self._indexes is None:
+                self.refresh()
+            self._stop.clear()
+            self._thread = Thread(target=self._run, daemon=True,
+                                  name='currencycom-symbol-registry')
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def exchange_info(self):
+        return self._get_indexes().exchange_info
+
+    def __getitem__(self, symbol) -> SymbolInfo:
+        return self._get_indexes().symbols[symbol]
+
+    def __contains__(self, symbol):
+        return symbol in self._get_indexes().symbols
+
+    def __iter__(self):
+        return iter(self._get_indexes().symbols.values())
+
+    def __len__(self):
+        return len(self._get_indexes().symbols)
+
+    def get(self, symbol, default=None) -> Optional[SymbolInfo]:
+        return self._get_indexes().symbols.get(symbol, default)
+
+    def by_base_asset(self, asset):
+        return list(self._get_indexes().base_assets.get(asset, ()))
+
+    def by_quote_asset(self, asset):
+        return list(self._get_indexes().quote_assets.get(asset, ()))
+
+    def leverage(self, symbol) -> Optional[SymbolInfo]:
+        """
+        Leverage variant of a symbol, e.g. BTC/USD_LEVERAGE for BTC/USD
+        """
+        return self._get_indexes().leverage.get(symbol)
@@ -0,0 +1,132 @@
+import random
+import time
+from threading import Lock
+
+from .exceptions import (CurrencyComCircuitOpenException,
+                         CurrencyComInvalidResponseException,
+                         CurrencyComRateLimitException,
+                         CurrencyComRequestException,
+                         CurrencyComServerException)
+
+IDEMPOTENT_METHODS = frozenset(['get', 'head', 'options'])
+
+
+def is_failure(error):
+    """
+    Whether the error tells the endpoint is unhealthy, as opposed to a bad
+    request or a rate limit
+    """
+    return isinstance(error, (CurrencyComRequestException,
+                              CurrencyComServerException,
+                              CurrencyComInvalidResponseException))
+
+
+class RetryPolicy(object):
+    """
+    Retries of idempotent requests with exponential backoff and full
+    jitter. Requests changing the account state (new order, cancel...) are
+    never retried, their errors always reach the caller.
+    """
+
+    def __init__(self, max_retries: int = 3,
+                 backoff: float = 0.1,
+                 max_backoff: float = 10.0):
+        """
+        :param max_retries: max number of retries of one request
+        :param backoff: seconds, the upper bound of the first delay
+        :param max_backoff: seconds, the upper bound of any delay except
+        the ones asked by Retry-After
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def should_retry(self, method, error, attempt):
+        if method.lower() not in IDEMPOTENT_METHODS \
+                or attempt >= self.max_retries:
+            return False
+        return is_failure(error) \
+            or isinstance(error, CurrencyComRateLimitException)
+
+    def delay(self, error, attempt):
+        delay = random.uniform(
+            0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class CircuitBreaker(object):
+    """
+    Stops sending requests to an endpoint after failure_threshold failures
+    in a row. After reset_timeout seconds one trial request is let
+    through, its success closes the circuit, its failure opens it again.
+    """
+
+    CLOSED = 'CLOSED'
+    OPEN = 'OPEN'
+    HALF_OPEN = 'HALF_OPEN'
+
+    def __init__(self, endpoint,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened = 0.0
+        self._lock = Lock()
+
+    def before_request(self):
+        """
+        Raise CurrencyComCircuitOpenException when the request must not be
+        sent
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            retry_in = self._opened + self.reset_timeout - time.monotonic()
+            if self.state == self.OPEN and retry_in <= 0:
+                self.state = self.HALF_OPEN
+                return
+            # Open, or half open with the trial request in flight
+            raise CurrencyComCircuitOpenException(self.endpoint,
+                                                  max(0.0, retry_in))
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN \
+                    or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened = time.monotonic()
+
+
+class CircuitBreakers(object):
+    """
+    One CircuitBreaker per endpoint
+    """
+
+    def __init__(self, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = Lock()
+
+    def __getitem__(self, endpoint) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    endpoint,
+                    CircuitBreaker(endpoint, self.failure_threshold,
+                                   self.reset_timeout))
+        return breaker
@@ -0,0 +1,157 @@
+from functools import partial
+from threading import Lock, local
+from time import perf_counter
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class PoolStats(object):
+    """
+    Thread-safe counters of connection reuse in the HTTP pool.
+
+    A hit is a request served over an already open keep-alive connection,
+    a miss is a request that had to open a new one (DNS + TCP + TLS).
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, reused: bool):
+        with self._lock:
+            if reused:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def as_dict(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'requests': total,
+                'hit_ratio': self.hits / total if total else 0.0,
+            }
+
+
+# Seconds the current thread spent opening connections, see
+# take_connect_time
+_connecting = local()
+
+
+def take_connect_time() -> float:
+    """
+    Seconds the current thread spent opening connections (DNS + TCP + TLS)
+    since the previous call
+    """
+    seconds = getattr(_connecting, 'seconds', 0.0)
+    _connecting.seconds = 0.0
+    return seconds
+
+
+class _StatsPoolMixin(object):
+    def __init__(self, *args, stats: PoolStats = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats = stats
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout=timeout)
+        if self._stats is not None:
+            # Fresh connections and the ones dropped by the server have no
+            # socket yet and will connect on the first request.
+            self._stats.record(getattr(conn, 'sock', None) is not None)
+        return conn
+
+    def _validate_conn(self, conn):
+        # Connect here rather than lazily on the first request to time it,
+        # like HTTPSConnectionPool does for every new connection
+        if getattr(conn, 'sock', True) is None:
+            start = perf_counter()
+            conn.connect()
+            _connecting.seconds = getattr(_connecting, 'seconds', 0.0) \
+                + perf_counter() - start
+        super()._validate_conn(conn)
+
+
+class _StatsHTTPConnectionPool(_StatsPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _StatsHTTPSConnectionPool(_StatsPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with a default timeout and connection reuse statistics.
+    """
+
+    def __init__(self, timeout=None, stats: PoolStats = None, **kwargs):
+        self.timeout = timeout
+        self.stats = stats if stats is not None else PoolStats()
+        super().__init__(**kwargs)
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['stats'] = self.stats
+        state['timeout'] = self.timeout
+        return state
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': partial(_StatsHTTPConnectionPool, stats=self.stats),
+            'https': partial(_StatsHTTPSConnectionPool, stats=self.stats),
+        }
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.timeout
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session sharing one keep-alive connection pool between all
+    the calls of a Client.
+
+    :param pool_connections: number of per-host pools to keep
+    :param pool_maxsize: max number of connections kept open per host
+    :param pool_block: block when all the connections of a host are busy
+    instead of opening (and then discarding) an extra one
+    :param timeout: default timeout in seconds, either a single value or a
+    (connect, read) tuple
+    :param keep_alive: reuse connections between requests
+    """
+
+    def __init__(self,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 timeout=None,
+                 keep_alive: bool = True,
+                 max_retries: int = 0):
+        super().__init__()
+        self.stats = PoolStats()
+        adapter = PooledHTTPAdapter(timeout=timeout,
+                                    stats=self.stats,
+                                    pool_connections=pool_connections,
+                                    pool_maxsize=pool_maxsize,
+                                    pool_block=pool_block,
+                                    max_retries=max_retries)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+        if not keep_alive:
+            self.headers['Connection'] = 'close'
+
+    def pool_stats(self):
+        return self.stats.as_dict()
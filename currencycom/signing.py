@@ -0,0 +1,60 @@
+import hashlib
+import hmac
+from functools import lru_cache
+from urllib.parse import quote_plus
+
+from requests.models import RequestEncodingMixin
+
+# Symbols and enum values repeat from request to request
+_quote = lru_cache(maxsize=4096)(quote_plus)
+
+
+class Signer(object):
+    """
+    Signs private requests with a pre-keyed HMAC-SHA256.
+
+    The HMAC key schedule is computed once and copied for every request
+    and parameters are encoded into the query string in a single pass.
+    """
+
+    def __init__(self, api_secret: bytes):
+        self._hmac = hmac.new(api_secret, digestmod=hashlib.sha256)
+
+    @staticmethod
+    def encode(params: dict):
+        """
+        Encode params into a query string exactly as requests does: None
+        values are skipped, the rest is quoted with quote_plus.
+        Keys are API parameter names and are not quoted.
+        """
+        parts = []
+        append = parts.append
+        for key, value in params.items():
+            if value is None:
+                continue
+            cls = type(value)
+            if cls is str:
+                append(key + '=' + _quote(value))
+            elif cls is int or cls is bool:
+                append(key + '=' + str(value))
+            elif cls is float:
+                # '+' of the exponent is the only character to quote
+                append(key + '=' + repr(value).replace('+', '%2B'))
+            else:
+                # pylint: disable=no-member
+                encoded = RequestEncodingMixin._encode_params({key: value})
+                if encoded:
+                    append(encoded)
+        return '&'.join(parts)
+
+    def sign(self, query: str):
+        mac = self._hmac.copy()
+        mac.update(query.encode())
+        return mac.hexdigest()
+
+    def signed_query(self, params: dict):
+        """
+        Query string with the signature appended
+        """
+        query = self.encode(params)
+        return query + '&signature=' + self.sign(query)
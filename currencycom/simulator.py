@@ -0,0 +1,1233 @@
+"""
+Local stand-in of the exchange answering every REST endpoint of
+CurrencyComConstants, to test clients and strategies offline:
+
+    with SimulatorServer(SimulatedExchange(accounts={'KEY': 'SECRET'})) \\
+            as base_url, redirect_endpoints(base_url):
+        client = Client('KEY', 'SECRET')
+        client.new_order('BTC/USD', OrderSide.BUY, OrderType.MARKET, 0.1)
+
+or from the command line:
+
+    python -m currencycom.simulator --port 8080 --account KEY:SECRET
+
+SimulatedExchange keeps one order book per instrument, matched price-time,
+and the balances, orders, trades and leverage positions of its accounts.
+Signed requests are checked like the exchange does: API key, HMAC-SHA256
+of the query string and body, timestamp within recvWindow. Market makers
+keep a fixed number of levels on both sides of every book, so that market
+orders always fill. Klines are synthetic and the same on every call.
+
+SimulatorServer serves it with aiohttp, with optional Faults adding
+latency and error responses.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import time
+import zlib
+from bisect import insort
+from collections import deque
+from contextlib import contextmanager
+from threading import Event, Lock, Thread
+from typing import NamedTuple
+from urllib.parse import parse_qsl, urlsplit
+
+import aiohttp.web
+
+from .client import CandlesticksChartInervals, CurrencyComConstants
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+BASE_PATH = urlsplit(CurrencyComConstants.BASE_URL).path
+LEVERAGE_SUFFIX = CurrencyComConstants.LEVERAGE_SYMBOL_SUFFIX
+
+LEVERAGE_VALUES = (2, 5, 10, 20, 50, 100)
+DEFAULT_LEVERAGE = 10
+
+# Quantities below are considered filled
+_EPSILON = 1e-12
+
+_OPEN = ('NEW', 'PARTIALLY_FILLED')
+
+
+def _dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode()
+
+
+def _decimal(value):
+    """
+    Decimal string of a quantity or price, as the exchange sends them
+    """
+    text = '{:.8f}'.format(value).rstrip('0')
+    return text + '0' if text.endswith('.') else text
+
+
+class SymbolSpec(NamedTuple):
+    """
+    Instrument of the simulator, traded as symbol and, with leverage, as
+    symbol + '_LEVERAGE'
+
+    :param price: initial price
+    :param tick_size: price step between the market maker levels
+    :param level_quantity: quantity of every market maker level
+    """
+    symbol: str
+    base_asset: str
+    quote_asset: str
+    price: float
+    tick_size: float
+    level_quantity: float
+    step_size: float = 0.001
+
+
+DEFAULT_SYMBOLS = (
+    SymbolSpec('BTC/USD', 'BTC', 'USD', 7000.0, 0.5, 1.0),
+    SymbolSpec('ETH/USD', 'ETH', 'USD', 200.0, 0.05, 10.0),
+    SymbolSpec('LTC/USD', 'LTC', 'USD', 60.0, 0.01, 50.0),
+    SymbolSpec('XRP/USD', 'XRP', 'USD', 0.2, 0.0001, 10000.0, 1.0),
+)
+
+DEFAULT_BALANCES = {'USD': 100000.0, 'BTC': 10.0, 'ETH': 100.0,
+                    'LTC': 1000.0, 'XRP': 100000.0}
+
+
+class _Rejected(Exception):
+    """
+    Error response of the simulator
+    """
+
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def _missing(name):
+    return _Rejected(400, -1102, "Mandatory parameter '{}' was not sent, was "
+                                 "empty/null, or malformed.".format(name))
+
+
+def _required(params, name):
+    value = params.get(name)
+    if not value:
+        raise _missing(name)
+    return value
+
+
+def _number(params, name, default=None, cast=float):
+    value = params.get(name)
+    if not value:
+        if default is None:
+            raise _missing(name)
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        raise _Rejected(400, -1100, "Illegal characters found in parameter "
+                                    "'{}'; legal range is '{}'.".format(
+                                        name, value)) from None
+
+
+def _flag(params, name):
+    return params.get(name, 'false').lower() == 'true'
+
+
+class _Order(object):
+    __slots__ = ('order_id', 'account', 'symbol', 'side', 'type', 'price',
+                 'quantity', 'executed', 'quote', 'status', 'time',
+                 'update_time', 'leverage', 'locked', 'stop_loss',
+                 'take_profit', 'guaranteed_stop_loss', 'fills', 'position')
+
+    def __init__(self, order_id, account, symbol, side, order_type, price,
+                 quantity, now, leverage=None):
+        self.order_id = order_id
+        self.account = account
+        self.symbol = symbol
+        self.side = side
+        self.type = order_type
+        self.price = price
+        self.quantity = quantity
+        self.executed = 0.0
+        self.quote = 0.0
+        self.status = 'NEW'
+        self.time = self.update_time = now
+        self.leverage = leverage
+        self.locked = 0.0
+        self.stop_loss = None
+        self.take_profit = None
+        self.guaranteed_stop_loss = False
+        self.fills = []
+        self.position = None
+
+    @property
+    def remaining(self):
+        return self.quantity - self.executed
+
+    def as_dict(self, full=False):
+        average = self.quote / self.executed if self.executed else None
+        order = {
+            'symbol': self.symbol,
+            'orderId': self.order_id,
+            'orderListId': -1,
+            'clientOrderId': self.order_id,
+            'transactTime': self.time,
+            'price': _decimal(self.price if self.price is not None
+                              else average or 0.0),
+            'origQty': _decimal(self.quantity),
+            'executedQty': _decimal(self.executed),
+            'cummulativeQuoteQty': _decimal(self.quote),
+            'status': self.status,
+            'timeInForce': 'GTC' if self.type == 'LIMIT' else 'FOK',
+            'type': self.type,
+            'side': self.side,
+        }
+        if full:
+            order['fills'] = [{'price': _decimal(price),
+                               'qty': _decimal(quantity),
+                               'commission': '0',
+                               'commissionAsset': 'USD'}
+                              for price, quantity in self.fills]
+        return order
+
+    def as_open_order(self):
+        order = self.as_dict()
+        del order['transactTime']
+        order.update({
+            'stopPrice': '0.0',
+            'time': self.time,
+            'updateTime': self.update_time,
+            'isWorking': True,
+            'origQuoteOrderQty': '0.000000',
+        })
+        return order
+
+
+class _BookSide(object):
+    """
+    Price levels of one side, FIFO queues of orders by key = sign * price
+    with the best key last in keys
+    """
+
+    def __init__(self, sign):
+        self.sign = sign
+        self.keys = []
+        self.levels = {}
+
+    def add(self, order):
+        key = self.sign * order.price
+        queue = self.levels.get(key)
+        if queue is None:
+            queue = self.levels[key] = deque()
+            insort(self.keys, key)
+        queue.append(order)
+
+    def remove(self, order):
+        key = self.sign * order.price
+        queue = self.levels.get(key)
+        if queue is None or order not in queue:
+            return
+        queue.remove(order)
+        if not queue:
+            del self.levels[key]
+            self.keys.remove(key)
+
+    def best_price(self):
+        return self.sign * self.keys[-1] if self.keys else None
+
+    def depth(self, limit):
+        return [[_decimal(self.sign * key),
+                 _decimal(sum(order.remaining
+                              for order in self.levels[key]))]
+                for key in self.keys[:-limit - 1:-1]]
+
+
+class _Book(object):
+    """
+    Order book of one instrument, refilled with market maker orders up to
+    levels price levels per side
+    """
+
+    def __init__(self, spec: SymbolSpec, levels, next_id):
+        self.spec = spec
+        self.levels = levels
+        self.bids = _BookSide(1)
+        self.asks = _BookSide(-1)
+        self.last_price = spec.price
+        self.update_id = 0
+        self._next_id = next_id
+        self._snapshots = {}
+        self.replenish()
+
+    def _maker(self, side, price):
+        return _Order(self._next_id(), None, self.spec.symbol, side, 'LIMIT',
+                      round(price, 10), self.spec.level_quantity, 0)
+
+    def replenish(self):
+        tick = self.spec.tick_size
+        for book_side, side in ((self.bids, 'BUY'), (self.asks, 'SELL')):
+            while len(book_side.keys) < self.levels:
+                if book_side.keys:
+                    price = book_side.sign * book_side.keys[0] \
+                        - book_side.sign * tick
+                else:
+                    price = self.last_price - book_side.sign * tick
+                if price <= 0:
+                    break
+                book_side.add(self._maker(side, price))
+
+    def match(self, order):
+        """
+        Fill order against the opposite side as far as its price allows
+
+        :return: list of (maker order, price, quantity)
+        """
+        opposite = self.asks if order.side == 'BUY' else self.bids
+        limit = order.price
+        fills = []
+        while order.remaining > _EPSILON:
+            if not opposite.keys:
+                self.replenish()
+                if not opposite.keys:
+                    break
+            key = opposite.keys[-1]
+            price = opposite.sign * key
+            if limit is not None and (price > limit if order.side == 'BUY'
+                                      else price < limit):
+                break
+            queue = opposite.levels[key]
+            maker = queue[0]
+            quantity = min(order.remaining, maker.remaining)
+            maker.executed += quantity
+            maker.quote += quantity * price
+            order.executed += quantity
+            order.quote += quantity * price
+            if maker.remaining <= _EPSILON:
+                queue.popleft()
+                if not queue:
+                    del opposite.levels[key]
+                    opposite.keys.pop()
+            fills.append((maker, price, quantity))
+            self.last_price = price
+        if fills:
+            self.update_id += 1
+            self.replenish()
+        return fills
+
+    def snapshot(self, limit):
+        """
+        depth response, cached until the book changes
+        """
+        key = (self.update_id, limit)
+        snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            if len(self._snapshots) > 16:
+                self._snapshots.clear()
+            snapshot = self._snapshots[key] = {
+                'lastUpdateId': self.update_id,
+                'asks': self.asks.depth(limit),
+                'bids': self.bids.depth(limit),
+            }
+        return snapshot
+
+    def rest(self, order):
+        (self.bids if order.side == 'BUY' else self.asks).add(order)
+        self.update_id += 1
+
+    def cancel(self, order):
+        (self.bids if order.side == 'BUY' else self.asks).remove(order)
+        self.update_id += 1
+
+    def estimate(self, side, quantity):
+        """
+        Quote amount a market order of quantity would trade
+        """
+        opposite = self.asks if side == 'BUY' else self.bids
+        total = 0.0
+        price = self.last_price
+        for key in reversed(opposite.keys):
+            price = opposite.sign * key
+            for order in opposite.levels[key]:
+                take = min(quantity, order.remaining)
+                total += take * price
+                quantity -= take
+                if quantity <= _EPSILON:
+                    return total
+        # Beyond the visible levels the market makers quote further away
+        return total + quantity * (price + (1 if side == 'BUY' else -1)
+                                   * self.spec.tick_size * self.levels)
+
+
+class _Account(object):
+    def __init__(self, account_id, api_key, api_secret, balances):
+        self.account_id = account_id
+        self.api_key = api_key
+        self.hmac = hmac.new(api_secret.encode(), digestmod=hashlib.sha256)
+        self.balances = {asset: [float(amount), 0.0]
+                         for asset, amount in balances.items()}
+        self.orders = {}
+        # Enough for the 1000 trades myTrades returns at most
+        self.trades = deque(maxlen=10000)
+        self.positions = {}
+
+    def balance(self, asset):
+        balance = self.balances.get(asset)
+        if balance is None:
+            balance = self.balances[asset] = [0.0, 0.0]
+        return balance
+
+    def lock(self, asset, amount):
+        balance = self.balance(asset)
+        if balance[0] + _EPSILON < amount:
+            raise _Rejected(400, -2010, 'Account has insufficient balance '
+                                        'for requested action.')
+        balance[0] -= amount
+        balance[1] += amount
+
+    def release(self, asset, amount):
+        balance = self.balance(asset)
+        balance[0] += amount
+        balance[1] -= amount
+
+
+class SimulatedExchange(object):
+    """
+    In-memory exchange state and request handling, without any I/O.
+    handle() answers a request the way the REST API does, it can be called
+    from several threads.
+    """
+
+    def __init__(self, symbols=DEFAULT_SYMBOLS, accounts=None,
+                 balances=None, levels: int = 50, clock=time.time):
+        """
+        :param symbols: SymbolSpec of the instruments
+        :param accounts: {api_key: api_secret} of the accounts to create,
+        see also add_account
+        :param balances: initial balances of the accounts, by default
+        DEFAULT_BALANCES
+        :param levels: price levels kept by the market makers on each side
+        of every book
+        :param clock: time source, seconds
+        """
+        self.clock = clock
+        self.balances = dict(DEFAULT_BALANCES if balances is None
+                             else balances)
+        self._ids = 0
+        self.specs = {spec.symbol: spec for spec in symbols}
+        self.books = {symbol: _Book(spec, levels, self._next_id)
+                      for symbol, spec in self.specs.items()}
+        self._tape = {symbol: deque(maxlen=10000) for symbol in self.specs}
+        self._trade_ids = {symbol: itertools.count(1)
+                           for symbol in self.specs}
+        self._stats = {symbol: [spec.price, spec.price, spec.price, 0.0, 0.0]
+                       for symbol, spec in self.specs.items()}
+        self._accounts = {}
+        self._positions = {}
+        self._lock = Lock()
+        for api_key, api_secret in (accounts or {}).items():
+            self.add_account(api_key, api_secret)
+        self._routes = {
+            ('GET', 'time'): (self.server_time, False),
+            ('GET', 'exchangeInfo'): (self.exchange_info, False),
+            ('GET', 'depth'): (self.depth, False),
+            ('GET', 'aggTrades'): (self.agg_trades, False),
+            ('GET', 'klines'): (self.klines, False),
+            ('GET', 'ticker/24hr'): (self.ticker_24h, False),
+            ('GET', 'account'): (self.account, True),
+            ('GET', 'myTrades'): (self.my_trades, True),
+            ('POST', 'order'): (self.new_order, True),
+            ('DELETE', 'order'): (self.cancel_order, True),
+            ('GET', 'openOrders'): (self.open_orders, True),
+            ('GET', 'tradingPositions'): (self.trading_positions, True),
+            ('POST', 'closeTradingPosition'): (self.close_position, True),
+            ('POST', 'updateTradingPosition'): (self.update_position, True),
+            ('POST', 'updateTradingOrder'): (self.update_order, True),
+            ('GET', 'leverageSettings'): (self.leverage_settings, True),
+        }
+
+    def _now(self):
+        return int(self.clock() * 1000)
+
+    def _next_id(self):
+        self._ids += 1
+        return '00000000-0000-0000-0000-{:012x}'.format(self._ids)
+
+    def add_account(self, api_key, api_secret, balances=None):
+        """
+        Create the account signing with api_secret, funded with balances
+        """
+        with self._lock:
+            self._accounts[api_key] = _Account(
+                2376109060084932 + len(self._accounts), api_key, api_secret,
+                self.balances if balances is None else balances)
+
+    # Requests
+
+    def handle(self, method, path, query='', api_key=None, body=b''):
+        """
+        Answer a request
+
+        :param method: HTTP method
+        :param path: path of the url, e.g. /api/v1/depth
+        :param query: query string as sent, not decoded
+        :param api_key: value of the X-MBX-APIKEY header
+        :param body: request body, form encoded parameters
+        :return: (status, JSON-serializable payload)
+        """
+        endpoint = self._routes.get((method.upper(),
+                                     path[len(BASE_PATH):]))
+        if endpoint is None or not path.startswith(BASE_PATH):
+            return 404, {'code': -1, 'msg': 'Unknown endpoint'}
+        handler, signed = endpoint
+        params = dict(parse_qsl(query))
+        if body:
+            params.update(parse_qsl(body.decode()))
+        with self._lock:
+            try:
+                if signed:
+                    return 200, handler(
+                        self._authenticate(query, body, api_key, params),
+                        params)
+                return 200, handler(params)
+            except _Rejected as e:
+                return e.status, {'code': e.code, 'msg': e.message}
+
+    def _authenticate(self, query, body, api_key, params) -> _Account:
+        account = self._accounts.get(api_key)
+        if account is None:
+            raise _Rejected(401, -2015,
+                            'Invalid API-key, IP, or permissions for action.')
+        signature = None
+        parts = []
+        for part in query.split('&'):
+            if part.startswith('signature='):
+                signature = part[len('signature='):]
+            elif part:
+                parts.append(part)
+        if signature is None:
+            raise _missing('signature')
+        mac = account.hmac.copy()
+        mac.update('&'.join(parts).encode())
+        if body:
+            mac.update(body)
+        if not hmac.compare_digest(mac.hexdigest(), signature):
+            raise _Rejected(400, -1022,
+                            'Signature for this request is not valid.')
+        timestamp = _number(params, 'timestamp', cast=int)
+        recv_window = _number(params, 'recvWindow', 5000, int)
+        if recv_window > CurrencyComConstants.RECV_WINDOW_MAX_LIMIT:
+            raise _Rejected(400, -1131,
+                            'recvWindow must be less than 60000')
+        now = self._now()
+        if timestamp > now + 1000 or now - timestamp > recv_window:
+            raise _Rejected(400, -1021, 'Timestamp for this request is '
+                                        'outside of the recvWindow.')
+        return account
+
+    def _book(self, symbol):
+        book = self.books.get(symbol)
+        if book is None and symbol.endswith(LEVERAGE_SUFFIX):
+            book = self.books.get(symbol[:-len(LEVERAGE_SUFFIX)])
+        if book is None:
+            raise _Rejected(400, -1121, 'Invalid symbol.')
+        return book
+
+    # Market data
+
+    def server_time(self, params):
+        return {'serverTime': self._now()}
+
+    def exchange_info(self, params):
+        symbols = []
+        for spec in self.specs.values():
+            for leverage in (False, True):
+                symbols.append({
+                    'symbol': spec.symbol
+                    + (LEVERAGE_SUFFIX if leverage else ''),
+                    'name': spec.symbol,
+                    'status': 'TRADING',
+                    'baseAsset': spec.base_asset,
+                    'baseAssetPrecision': 8,
+                    'quoteAsset': spec.quote_asset,
+                    'quoteAssetId': spec.quote_asset,
+                    'quotePrecision': 8,
+                    'orderTypes': ['LIMIT', 'MARKET'],
+                    'icebergAllowed': False,
+                    'filters': [
+                        {'filterType': 'PRICE_FILTER',
+                         'minPrice': _decimal(spec.tick_size),
+                         'maxPrice': '1000000',
+                         'tickSize': _decimal(spec.tick_size)},
+                        {'filterType': 'LOT_SIZE',
+                         'minQty': _decimal(spec.step_size),
+                         'maxQty': '1000000',
+                         'stepSize': _decimal(spec.step_size)},
+                    ],
+                    'marginTradingAllowed': leverage,
+                    'spotTradingAllowed': not leverage,
+                    'exchangeFee': 0.0,
+                    'tradingFee': 0.0,
+                    'makerFee': 0.0,
+                    'takerFee': 0.0,
+                })
+        return {
+            'timezone': 'UTC',
+            'serverTime': self._now(),
+            'rateLimits': [
+                {'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE',
+                 'intervalNum': 1, 'limit': 1200},
+                {'rateLimitType': 'ORDERS', 'interval': 'SECOND',
+                 'intervalNum': 1, 'limit': 10},
+                {'rateLimitType': 'ORDERS', 'interval': 'DAY',
+                 'intervalNum': 1, 'limit': 864000},
+            ],
+            'exchangeFilters': [],
+            'symbols': symbols,
+        }
+
+    def depth(self, params):
+        return self._book(_required(params, 'symbol')).snapshot(
+            _number(params, 'limit', 100, int))
+
+    def agg_trades(self, params):
+        symbol = self._book(_required(params, 'symbol')).spec.symbol
+        limit = _number(params, 'limit', 500, int)
+        start = _number(params, 'startTime', -1, int)
+        end = _number(params, 'endTime', -1, int)
+        trades = [trade for trade in self._tape[symbol]
+                  if (start < 0 or trade['T'] >= start)
+                  and (end < 0 or trade['T'] <= end)]
+        return trades[:limit] if start >= 0 else trades[-limit:]
+
+    def klines(self, params):
+        spec = self._book(_required(params, 'symbol')).spec
+        try:
+            interval = CandlesticksChartInervals(
+                _required(params, 'interval')).to_milliseconds()
+        except ValueError:
+            raise _Rejected(400, -1120, 'Invalid interval.') from None
+        limit = min(_number(params, 'limit', 500, int),
+                    CurrencyComConstants.KLINES_MAX_LIMIT)
+        start = _number(params, 'startTime', -1, int)
+        end = _number(params, 'endTime', self._now(), int)
+        last = end - end % interval
+        if start >= 0:
+            first = start + (-start) % interval
+        else:
+            first = last - (limit - 1) * interval
+        bars = []
+        open_time = first
+        while open_time <= last and len(bars) < limit:
+            bars.append(self._bar(spec, interval, open_time))
+            open_time += interval
+        return bars
+
+    @staticmethod
+    def _bar(spec, interval, open_time):
+        rng = random.Random(zlib.crc32('{}:{}:{}'.format(
+            spec.symbol, interval, open_time).encode()))
+        open_ = spec.price * (1 + rng.uniform(-0.02, 0.02))
+        close = open_ * (1 + rng.gauss(0, 0.003))
+        high = max(open_, close) * (1 + rng.random() * 0.002)
+        low = min(open_, close) * (1 - rng.random() * 0.002)
+        return [open_time, _decimal(open_), _decimal(high), _decimal(low),
+                _decimal(close), _decimal(rng.random() * 100)]
+
+    def ticker_24h(self, params):
+        symbol = params.get('symbol')
+        if symbol:
+            return self._ticker(self._book(symbol))
+        return [self._ticker(book) for book in self.books.values()]
+
+    def _ticker(self, book):
+        open_, high, low, volume, quote_volume = self._stats[book.spec.symbol]
+        last = book.last_price
+        now = self._now()
+        return {
+            'symbol': book.spec.symbol,
+            'priceChange': _decimal(last - open_),
+            'priceChangePercent': _decimal((last - open_) / open_ * 100),
+            'weightedAvgPrice': _decimal(quote_volume / volume
+                                         if volume else last),
+            'prevClosePrice': _decimal(open_),
+            'lastPrice': _decimal(last),
+            'lastQty': '0.0',
+            'bidPrice': _decimal(book.bids.best_price() or 0.0),
+            'askPrice': _decimal(book.asks.best_price() or 0.0),
+            'openPrice': _decimal(open_),
+            'highPrice': _decimal(high),
+            'lowPrice': _decimal(low),
+            'volume': _decimal(volume),
+            'quoteVolume': _decimal(quote_volume),
+            'openTime': now - 86400000,
+            'closeTime': now,
+            'firstId': 0,
+            'lastId': 0,
+            'count': 0,
+        }
+
+    # Account
+
+    def account(self, account, params):
+        show_zero = _flag(params, 'showZeroBalance')
+        return {
+            'makerCommission': 0.0,
+            'takerCommission': 0.0,
+            'buyerCommission': 0.0,
+            'sellerCommission': 0.0,
+            'canTrade': True,
+            'canWithdraw': True,
+            'canDeposit': True,
+            'updateTime': self._now(),
+            'balances': [{'accountId': str(account.account_id),
+                          'collateralCurrency': asset == 'USD',
+                          'asset': asset,
+                          'free': free,
+                          'locked': locked,
+                          'default': asset == 'USD'}
+                         for asset, (free, locked) in account.balances.items()
+                         if show_zero or free or locked],
+        }
+
+    def my_trades(self, account, params):
+        symbol = _required(params, 'symbol')
+        limit = _number(params, 'limit', 500, int)
+        start = _number(params, 'startTime', -1, int)
+        end = _number(params, 'endTime', -1, int)
+        trades = [trade for trade in account.trades
+                  if trade['symbol'] == symbol
+                  and (start < 0 or trade['time'] >= start)
+                  and (end < 0 or trade['time'] <= end)]
+        return trades[-limit:]
+
+    def leverage_settings(self, account, params):
+        symbol = _required(params, 'symbol')
+        if not symbol.endswith(LEVERAGE_SUFFIX):
+            raise _Rejected(400, -1121, 'Invalid symbol.')
+        self._book(symbol)
+        return {'values': list(LEVERAGE_VALUES), 'value': DEFAULT_LEVERAGE}
+
+    # Orders
+
+    def new_order(self, account, params):
+        symbol = _required(params, 'symbol')
+        book = self._book(symbol)
+        side = _required(params, 'side')
+        if side not in ('BUY', 'SELL'):
+            raise _Rejected(400, -1100, "Illegal characters found in "
+                                        "parameter 'side'.")
+        order_type = _required(params, 'type')
+        if order_type not in ('LIMIT', 'MARKET'):
+            raise _Rejected(400, -1116, 'Invalid orderType.')
+        quantity = _number(params, 'quantity')
+        if quantity <= 0:
+            raise _Rejected(400, -1013, 'Invalid quantity.')
+        price = None
+        if order_type == 'LIMIT':
+            price = _number(params, 'price')
+            if price <= 0:
+                raise _Rejected(400, -1013, 'Invalid price.')
+        leverage = None
+        if symbol.endswith(LEVERAGE_SUFFIX):
+            leverage = _number(params, 'leverage', DEFAULT_LEVERAGE, int)
+            if leverage not in LEVERAGE_VALUES:
+                raise _Rejected(400, -1013, 'Invalid leverage.')
+
+        order = _Order(self._next_id(), account, symbol, side, order_type,
+                       price, quantity, self._now(), leverage)
+        order.stop_loss = _number(params, 'stopLoss', -1.0)
+        order.take_profit = _number(params, 'takeProfit', -1.0)
+        order.guaranteed_stop_loss = _flag(params, 'guaranteedStopLoss')
+        spec = book.spec
+        if leverage is not None:
+            reference = price if price is not None \
+                else book.estimate(side, quantity) / quantity
+            order.locked = quantity * reference / leverage
+            account.lock(spec.quote_asset, order.locked)
+        elif side == 'BUY':
+            order.locked = quantity * price if price is not None \
+                else book.estimate(side, quantity) * 1.01
+            account.lock(spec.quote_asset, order.locked)
+        else:
+            order.locked = quantity
+            account.lock(spec.base_asset, quantity)
+
+        self._settle(book, order, book.match(order))
+        if order.remaining > _EPSILON and order_type == 'LIMIT':
+            book.rest(order)
+            account.orders[order.order_id] = order
+        else:
+            self._finish(order)
+        self._check_triggers(book)
+
+        response_type = params.get('newOrderRespType', 'FULL')
+        if response_type == 'ACK':
+            return {'symbol': symbol, 'orderId': order.order_id,
+                    'clientOrderId': order.order_id,
+                    'transactTime': order.time}
+        return order.as_dict(full=response_type == 'FULL'
+                             and leverage is None)
+
+    def _settle(self, book, taker, fills):
+        now = self._now()
+        for maker, price, quantity in fills:
+            self._fill(book, taker, price, quantity, now, maker=False)
+            self._fill(book, maker, price, quantity, now, maker=True)
+            self._tape[book.spec.symbol].append({
+                'a': next(self._trade_ids[book.spec.symbol]),
+                'p': _decimal(price),
+                'q': _decimal(quantity),
+                'T': now,
+                'm': taker.side == 'SELL',
+            })
+            stats = self._stats[book.spec.symbol]
+            stats[1] = max(stats[1], price)
+            stats[2] = min(stats[2], price)
+            stats[3] += quantity
+            stats[4] += quantity * price
+
+    def _fill(self, book, order, price, quantity, now, maker):
+        order.update_time = now
+        order.fills.append((price, quantity))
+        if order.remaining <= _EPSILON:
+            order.status = 'FILLED'
+        else:
+            order.status = 'PARTIALLY_FILLED'
+        account = order.account
+        if account is None:
+            return
+        if order.status == 'FILLED':
+            account.orders.pop(order.order_id, None)
+        spec = book.spec
+        account.trades.append({
+            'symbol': order.symbol,
+            'orderId': order.order_id,
+            'orderListId': -1,
+            'price': _decimal(price),
+            'qty': _decimal(quantity),
+            'quoteQty': _decimal(price * quantity),
+            'commission': '0',
+            'commissionAsset': spec.quote_asset,
+            'time': now,
+            'isBuyer': order.side == 'BUY',
+            'isMaker': maker,
+        })
+        if order.leverage is not None:
+            margin = min(order.locked, quantity * price / order.leverage)
+            order.locked -= margin
+            self._open_position(order, price, quantity, margin, now)
+        else:
+            self._exchange_assets(account, book.spec, order, price,
+                                  quantity)
+        if maker and order.status == 'FILLED':
+            # Takers are finished by new_order once all their fills are in
+            self._finish(order)
+
+    @staticmethod
+    def _exchange_assets(account, spec, order, price, quantity):
+        base = account.balance(spec.base_asset)
+        quote = account.balance(spec.quote_asset)
+        if order.side == 'BUY':
+            cost = quantity * price
+            taken = min(order.locked, cost)
+            order.locked -= taken
+            quote[1] -= taken
+            quote[0] -= cost - taken
+            base[0] += quantity
+        else:
+            order.locked -= quantity
+            base[1] -= quantity
+            quote[0] += quantity * price
+
+    def _finish(self, order):
+        """
+        Give back what an order no longer filling still holds
+        """
+        if order.status in _OPEN:
+            order.status = 'CANCELED' if order.type == 'LIMIT' else 'EXPIRED'
+        if order.locked and order.account is not None:
+            spec = self._book(order.symbol).spec
+            asset = spec.base_asset if order.side == 'SELL' \
+                and order.leverage is None else spec.quote_asset
+            order.account.release(asset, order.locked)
+            order.locked = 0.0
+
+    def cancel_order(self, account, params):
+        symbol = _required(params, 'symbol')
+        order = account.orders.get(_required(params, 'orderId'))
+        if order is None or order.symbol != symbol:
+            raise _Rejected(400, -2011, 'Unknown order sent.')
+        self._book(symbol).cancel(order)
+        del account.orders[order.order_id]
+        order.status = 'CANCELED'
+        order.update_time = self._now()
+        self._finish(order)
+        response = order.as_dict()
+        response['origClientOrderId'] = order.order_id
+        del response['transactTime']
+        return response
+
+    def open_orders(self, account, params):
+        symbol = params.get('symbol')
+        return [order.as_open_order() for order in account.orders.values()
+                if not symbol or order.symbol == symbol]
+
+    def update_order(self, account, params):
+        order = account.orders.get(_required(params, 'orderId'))
+        if order is None or order.leverage is None:
+            raise _Rejected(400, -2013, 'Order does not exist.')
+        if 'stopLoss' in params:
+            order.stop_loss = _number(params, 'stopLoss', -1.0)
+        if 'takeProfit' in params:
+            order.take_profit = _number(params, 'takeProfit', -1.0)
+        if 'guaranteedStopLoss' in params:
+            order.guaranteed_stop_loss = _flag(params, 'guaranteedStopLoss')
+        return {'requestId': self._request_id(), 'state': 'PROCESSED'}
+
+    # Leverage positions
+
+    def _request_id(self):
+        self._ids += 1
+        return self._ids
+
+    def _open_position(self, order, price, quantity, margin, now):
+        signed = quantity if order.side == 'BUY' else -quantity
+        position = order.position
+        if position is None:
+            position = order.position = {
+                'accountId': order.account.account_id,
+                'id': self._next_id(),
+                'instrumentId': str(zlib.crc32(order.symbol.encode())),
+                'orderId': order.order_id,
+                'openQuantity': signed,
+                'openPrice': price,
+                'closeQuantity': 0.0,
+                'closePrice': 0,
+                'takeProfit': order.take_profit if order.take_profit > 0
+                else None,
+                'stopLoss': order.stop_loss if order.stop_loss > 0
+                else None,
+                'guaranteedStopLoss': order.guaranteed_stop_loss,
+                'rpl': 0,
+                'rplConverted': 0,
+                'swap': 0,
+                'swapConverted': 0,
+                'fee': 0,
+                'dividend': 0,
+                'margin': margin,
+                'state': 'ACTIVE',
+                'currency': self._book(order.symbol).spec.quote_asset,
+                'createdTimestamp': now,
+                'openTimestamp': now,
+                'cost': margin,
+                'symbol': order.symbol,
+            }
+            order.account.positions[position['id']] = position
+            self._positions[position['id']] = (order.account, position)
+        else:
+            total = position['openQuantity'] + signed
+            position['openPrice'] = (position['openPrice']
+                                     * position['openQuantity']
+                                     + price * signed) / total
+            position['openQuantity'] = total
+            position['margin'] += margin
+            position['cost'] += margin
+
+    def trading_positions(self, account, params):
+        return {'positions': [dict(position) for position
+                              in account.positions.values()]}
+
+    def _position(self, account, params):
+        position = account.positions.get(_required(params, 'positionId'))
+        if position is None or position['state'] != 'ACTIVE':
+            raise _Rejected(400, -2013, 'Position does not exist.')
+        return position
+
+    def close_position(self, account, params):
+        position = self._position(account, params)
+        self._close(account, position)
+        self._check_triggers(self._book(position['symbol']))
+        return {'request': [{
+            'id': self._request_id(),
+            'accountId': account.account_id,
+            'instrumentId': position['instrumentId'],
+            'rqType': 'ORDER_NEW',
+            'state': 'PROCESSED',
+            'createdTimestamp': self._now(),
+        }]}
+
+    def _close(self, account, position):
+        book = self._book(position['symbol'])
+        quantity = position['openQuantity']
+        order = _Order(self._next_id(), None, position['symbol'],
+                       'SELL' if quantity > 0 else 'BUY', 'MARKET', None,
+                       abs(quantity), self._now())
+        fills = book.match(order)
+        self._settle(book, order, fills)
+        price = order.quote / order.executed if order.executed \
+            else book.last_price
+        pnl = (price - position['openPrice']) * quantity
+        position.update({
+            'state': 'CLOSED',
+            'closeQuantity': -quantity,
+            'closePrice': price,
+            'rpl': pnl,
+            'rplConverted': pnl,
+        })
+        del account.positions[position['id']]
+        self._positions.pop(position['id'], None)
+        balance = account.balance(book.spec.quote_asset)
+        balance[1] -= position['margin']
+        balance[0] += position['margin'] + pnl
+
+    def update_position(self, account, params):
+        position = self._position(account, params)
+        if 'stopLoss' in params:
+            position['stopLoss'] = _number(params, 'stopLoss', -1.0)
+        if 'takeProfit' in params:
+            position['takeProfit'] = _number(params, 'takeProfit', -1.0)
+        position['guaranteedStopLoss'] = _flag(params, 'guaranteedStopLoss')
+        for key in ('stopLoss', 'takeProfit'):
+            if position[key] is not None and position[key] <= 0:
+                position[key] = None
+        return {'requestId': self._request_id(), 'state': 'PROCESSED'}
+
+    def _check_triggers(self, book):
+        """
+        Close the positions the stop loss or take profit of which the last
+        price reached
+        """
+        while True:
+            price = book.last_price
+            for account, position in self._positions.values():
+                if position['symbol'][:-len(LEVERAGE_SUFFIX)] \
+                        != book.spec.symbol:
+                    continue
+                long = position['openQuantity'] > 0
+                stop, take = position['stopLoss'], position['takeProfit']
+                if (stop is not None and (price <= stop if long
+                                          else price >= stop)) \
+                        or (take is not None and (price >= take if long
+                                                  else price <= take)):
+                    self._close(account, position)
+                    break
+            else:
+                return
+
+
+class Faults(object):
+    """
+    Latency and errors added to the responses of a SimulatorServer
+
+    :param latency: seconds added to every response
+    :param jitter: up to jitter more seconds, uniformly distributed
+    :param error_rate: share of the requests answered with error_status
+    :param error_status: status of these errors, 5xx by default
+    :param rate_limit_rate: share of the requests answered with 429
+    :param retry_after: Retry-After seconds of the 429 responses
+    :param seed: seed of the random draws, for reproducible runs
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503,
+                 rate_limit_rate: float = 0.0, retry_after: int = 1,
+                 seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed).random
+
+    def delay(self):
+        if self.jitter:
+            return self.latency + self._random() * self.jitter
+        return self.latency
+
+    def fault(self):
+        """
+        (status, payload, headers) of an injected error, or None
+        """
+        if self.error_rate and self._random() < self.error_rate:
+            return self.error_status, {
+                'code': -1001,
+                'msg': 'Internal error; unable to process your request. '
+                       'Please try again.'}, None
+        if self.rate_limit_rate and self._random() < self.rate_limit_rate:
+            return 429, {'code': -1003, 'msg': 'Too many requests.'}, \
+                {'Retry-After': str(self.retry_after)}
+        return None
+
+
+class SimulatorServer(object):
+    """
+    HTTP server of a SimulatedExchange. As a context manager it runs in a
+    background thread and returns the base url of the API, to pass to
+    redirect_endpoints. start_async serves from the running event loop.
+    """
+
+    def __init__(self, exchange: SimulatedExchange = None,
+                 host: str = '127.0.0.1', port: int = 0,
+                 faults: Faults = None):
+        """
+        :param exchange: SimulatedExchange(), without accounts, by default
+        :param port: 0 to pick a free port
+        :param faults: latency and errors to inject
+        """
+        self.exchange = exchange if exchange is not None \
+            else SimulatedExchange()
+        self.host = host
+        self.port = port
+        self.faults = faults
+        self._runner = None
+        self._loop = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://{}:{}{}'.format(self.host, self.port, BASE_PATH)
+
+    async def _handle(self, request):
+        faults = self.faults
+        if faults is not None:
+            delay = faults.delay()
+            if delay:
+                await asyncio.sleep(delay)
+            fault = faults.fault()
+            if fault is not None:
+                status, payload, headers = fault
+                return aiohttp.web.Response(
+                    status=status, body=_dumps(payload), headers=headers,
+                    content_type='application/json')
+        body = await request.read() if request.body_exists else b''
+        path, _, query = request.raw_path.partition('?')
+        status, payload = self.exchange.handle(
+            request.method, path, query,
+            request.headers.get(CurrencyComConstants.HEADER_API_KEY_NAME),
+            body)
+        return aiohttp.web.Response(status=status, body=_dumps(payload),
+                                    content_type='application/json')
+
+    async def start_async(self):
+        """
+        Start serving from the running event loop and return the url
+        """
+        self._runner = aiohttp.web.ServerRunner(
+            aiohttp.web.Server(self._handle), access_log=None)
+        await self._runner.setup()
+        site = aiohttp.web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self.url
+
+    async def stop_async(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def start(self):
+        """
+        Serve from a background thread and return the url. Raises the
+        error of the server when it cannot start, e.g. port in use.
+        """
+        started = Event()
+        error = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.start_async())
+            except BaseException as e:
+                error.append(e)
+                self._loop.run_until_complete(self.stop_async())
+                self._loop.close()
+                started.set()
+                return
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop_async())
+            self._loop.close()
+
+        self._thread = Thread(target=run, daemon=True,
+                              name='currencycom-simulator')
+        self._thread.start()
+        started.wait()
+        if error:
+            self._thread.join()
+            self._thread = None
+            raise error[0]
+        return self.url
+
+    def stop(self):
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+@contextmanager
+def redirect_endpoints(base_url):
+    """
+    Send the requests of every Client to base_url, e.g. the url of a
+    SimulatorServer, instead of the exchange
+    """
+    base = CurrencyComConstants.BASE_URL
+    saved = {name: value for name, value in vars(CurrencyComConstants).items()
+             if name.endswith('_ENDPOINT') and value.startswith(base)}
+    for name, value in saved.items():
+        setattr(CurrencyComConstants, name, base_url + value[len(base):])
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(CurrencyComConstants, name, value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Local simulator of the currency.com REST API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--account', action='append', default=[],
+                        metavar='KEY:SECRET')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    exchange = SimulatedExchange(accounts=dict(
+        account.split(':', 1) for account in args.account))
+    faults = Faults(args.latency, args.jitter, args.error_rate,
+                    rate_limit_rate=args.rate_limit_rate)
+    server = SimulatorServer(exchange, args.host, args.port, faults)
+
+    async def serve():
+        print('Serving on', await server.start_async())
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
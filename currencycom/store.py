@@ -0,0 +1,186 @@
+import os
+import shutil
+import time
+from threading import Lock
+from urllib.parse import quote
+
+from .client import CandlesticksChartInervals, Client
+from .columnar import KlineColumns, klines_to_columns, np, _require_numpy
+
+
+class KlineStore(object):
+    """
+    On-disk append-only store of closed klines.
+
+    Every (symbol, interval) pair is kept in its own directory with one
+    raw little-endian file per KlineColumns field, so ranges are served
+    straight from memory-mapped files:
+
+        store = KlineStore('/data/klines', client)
+        store.sync('BTC/USD', CandlesticksChartInervals.MINUTE,
+                   start_time=datetime(2020, 1, 1))
+        bars = store.klines('BTC/USD', CandlesticksChartInervals.MINUTE,
+                            start_time=datetime(2020, 6, 1))
+
+    Only closed bars are stored, the bar still in progress is downloaded
+    again by the next sync. Requires numpy.
+    """
+
+    COLUMNS = (('open_time', '<i8'),
+               ('open', '<f8'),
+               ('high', '<f8'),
+               ('low', '<f8'),
+               ('close', '<f8'),
+               ('volume', '<f8'))
+
+    FLUSH_SIZE = 10000
+
+    def __init__(self, path, client: Client = None):
+        _require_numpy()
+        self.path = path
+        self.client = client
+        self._lock = Lock()
+
+    def _directory(self, symbol, interval: CandlesticksChartInervals):
+        return os.path.join(self.path, quote(symbol, safe=''),
+                            interval.value)
+
+    def _column_path(self, directory, name):
+        return os.path.join(directory, name + '.bin')
+
+    def _size(self, directory):
+        # Columns are appended one after another, an interrupted append
+        # leaves some of them longer. Only complete bars count.
+        sizes = []
+        for name, dtype in self.COLUMNS:
+            path = self._column_path(directory, name)
+            if not os.path.exists(path):
+                return 0
+            sizes.append(os.path.getsize(path) // np.dtype(dtype).itemsize)
+        return min(sizes)
+
+    def _read(self, directory, size):
+        if size == 0:
+            return KlineColumns(*(np.empty(0, dtype)
+                                  for _, dtype in self.COLUMNS))
+        return KlineColumns(*(
+            np.memmap(self._column_path(directory, name), dtype=dtype,
+                      mode='r', shape=(size,))
+            for name, dtype in self.COLUMNS))
+
+    def _append(self, directory, columns: KlineColumns):
+        os.makedirs(directory, exist_ok=True)
+        size = self._size(directory)
+        for (name, dtype), column in zip(self.COLUMNS, columns):
+            with open(self._column_path(directory, name), 'ab') as f:
+                f.truncate(size * np.dtype(dtype).itemsize)
+                f.write(np.ascontiguousarray(column, dtype).tobytes())
+
+    def count(self, symbol, interval: CandlesticksChartInervals):
+        """
+        Number of stored bars
+        """
+        return self._size(self._directory(symbol, interval))
+
+    def klines(self, symbol,
+               interval: CandlesticksChartInervals,
+               start_time=None,
+               end_time=None) -> KlineColumns:
+        """
+        Stored bars with open time in [start_time, end_time], without any
+        network call.
+
+        :param symbol:
+        :param interval:
+        :param start_time: datetime or epoch milliseconds, inclusive
+        :param end_time: datetime or epoch milliseconds, inclusive
+        :return: KlineColumns of read-only memory-mapped arrays
+        """
+        directory = self._directory(symbol, interval)
+        columns = self._read(directory, self._size(directory))
+        lo, hi = 0, len(columns.open_time)
+        if start_time is not None:
+            lo = np.searchsorted(columns.open_time,
+                                 Client._to_epoch_miliseconds(start_time),
+                                 side='left')
+        if end_time is not None:
+            hi = np.searchsorted(columns.open_time,
+                                 Client._to_epoch_miliseconds(end_time),
+                                 side='right')
+        return KlineColumns(*(c[lo:hi] for c in columns))
+
+    def _download(self, symbol, interval, start, end, directory):
+        """
+        Append closed bars with open time in [start, end] to directory
+        """
+        added = 0
+        chunk = []
+        for bar in self.client.iter_klines(symbol, interval, start, end):
+            chunk.append(bar)
+            if len(chunk) >= self.FLUSH_SIZE:
+                self._append(directory, klines_to_columns(chunk))
+                added += len(chunk)
+                chunk = []
+        if chunk:
+            self._append(directory, klines_to_columns(chunk))
+            added += len(chunk)
+        return added
+
+    def sync(self, symbol,
+             interval: CandlesticksChartInervals,
+             start_time=None):
+        """
+        Download the bars missing in the store.
+
+        Bars after the last stored one are appended up to the last closed
+        bar. When start_time is before the first stored bar, the missing
+        head is downloaded as well.
+
+        :param symbol:
+        :param interval:
+        :param start_time: datetime or epoch milliseconds. Required for an
+        empty store
+        :return: number of bars added
+        """
+        duration = interval.to_milliseconds()
+        start = Client._to_epoch_miliseconds(start_time)
+        # open time of the most recent bar which can be already closed
+        last_closed = int(time.time() * 1000) - duration
+        directory = self._directory(symbol, interval)
+
+        with self._lock:
+            stored = self._read(directory, self._size(directory))
+            added = 0
+            if len(stored.open_time) == 0:
+                if start is None:
+                    raise ValueError(
+                        'start_time is required to sync an empty store')
+                return self._download(symbol, interval, start, last_closed,
+                                      directory)
+
+            first = int(stored.open_time[0])
+            last = int(stored.open_time[-1])
+            if start is not None and start < first:
+                added += self._prepend(symbol, interval, start, first - 1,
+                                       directory)
+            if last + duration <= last_closed:
+                added += self._download(symbol, interval, last + duration,
+                                        last_closed, directory)
+            return added
+
+    def _prepend(self, symbol, interval, start, end, directory):
+        head = directory + '.head'
+        shutil.rmtree(head, ignore_errors=True)
+        added = self._download(symbol, interval, start, end, head)
+        if added:
+            stored = self._read(directory, self._size(directory))
+            for i in range(0, len(stored.open_time), self.FLUSH_SIZE):
+                self._append(head, KlineColumns(
+                    *(c[i:i + self.FLUSH_SIZE] for c in stored)))
+            del stored
+            old = directory + '.old'
+            os.replace(directory, old)
+            os.replace(head, directory)
+            shutil.rmtree(old)
+        shutil.rmtree(head, ignore_errors=True)
+        return added
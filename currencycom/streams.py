@@ -0,0 +1,419 @@
+import asyncio
+import inspect
+import itertools
+import json
+from enum import Enum
+from typing import NamedTuple
+
+import aiohttp
+
+from .client import CandlesticksChartInervals
+from .exceptions import (CurrencyComStreamException,
+                         CurrencyComStreamTimeoutException)
+
+
+class StreamType(Enum):
+    DEPTH = 'depthMarketData'
+    TRADES = 'trades'
+    KLINES = 'OHLCMarketData'
+    TICKER = 'marketData'
+
+
+# Destination of the events of every stream
+EVENT_DESTINATIONS = {
+    'depthMarketData.update': StreamType.DEPTH,
+    'internal.trade': StreamType.TRADES,
+    'ohlc.event': StreamType.KLINES,
+    'internal.quote': StreamType.TICKER,
+}
+
+
+class Overflow(Enum):
+    """
+    What a subscription does with a new event when its queue is full
+    """
+    DROP_OLDEST = 'DROP_OLDEST'
+    DROP_NEWEST = 'DROP_NEWEST'
+    # Stop reading the socket until the consumer catches up, or until the
+    # subscription ends
+    BLOCK = 'BLOCK'
+
+
+class StreamEvent(NamedTuple):
+    stream: StreamType
+    symbol: str
+    payload: dict
+
+
+_END = object()
+
+
+class Subscription(object):
+    """
+    Events of one subscribe call.
+
+    Events are passed to the callback when there is one, otherwise they
+    are queued and the subscription is consumed as an async iterator:
+
+        async for event in subscription:
+            ...
+
+    The iteration stops after unsubscribe or StreamClient.close.
+    """
+
+    def __init__(self, client, stream: StreamType, symbols, interval,
+                 callback, maxsize: int, overflow: Overflow):
+        self.client = client
+        self.stream = stream
+        self.symbols = frozenset(symbols)
+        self.interval = interval
+        self.callback = callback
+        self.overflow = overflow
+        self.dropped = 0
+        self.closed = False
+        self._queue = asyncio.Queue(maxsize)
+        self._ended = asyncio.Event()
+
+    @property
+    def key(self):
+        return self.stream, self.interval
+
+    def matches(self, symbol, payload):
+        return symbol in self.symbols and (
+            self.interval is None or payload.get('interval') == self.interval)
+
+    async def _deliver(self, event: StreamEvent):
+        if self.callback is not None:
+            result = self.callback(event)
+            if inspect.isawaitable(result):
+                await result
+            return
+        if self.overflow is Overflow.BLOCK:
+            await self._put_or_end(event)
+            return
+        if self._queue.full():
+            self.dropped += 1
+            if self.overflow is Overflow.DROP_NEWEST:
+                return
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    async def _put_or_end(self, event):
+        """
+        Wait for room in the queue, events arriving after the end of the
+        subscription are dropped so that the reader is never blocked by a
+        consumer that stopped
+        """
+        if self.closed:
+            return
+        if not self._queue.full():
+            self._queue.put_nowait(event)
+            return
+        put = asyncio.ensure_future(self._queue.put(event))
+        ended = asyncio.ensure_future(self._ended.wait())
+        try:
+            await asyncio.wait((put, ended),
+                               return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            put.cancel()
+            ended.cancel()
+        if not put.done() or put.cancelled():
+            self.dropped += 1
+
+    def _end(self):
+        self.closed = True
+        self._ended.set()
+        # A full queue means the consumer is not waiting, it stops once
+        # the queue is drained
+        if not self._queue.full():
+            self._queue.put_nowait(_END)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> StreamEvent:
+        if self.closed and self._queue.empty():
+            raise StopAsyncIteration
+        event = await self._queue.get()
+        if event is _END:
+            raise StopAsyncIteration
+        return event
+
+    async def unsubscribe(self):
+        await self.client.unsubscribe(self)
+
+
+class StreamClient(object):
+    """
+    WebSocket market data client.
+
+    Subscriptions survive disconnections: the client reconnects with
+    exponential backoff and subscribes again to every symbol.
+
+        async with StreamClient() as streams:
+            depth = await streams.subscribe_depth(['BTC/USD'])
+            async for event in depth:
+                print(event.symbol, event.payload)
+    """
+
+    WSS_URL = 'wss://api-adapter.backend.currency.com/connect'
+
+    def __init__(self, url: str = None,
+                 session: aiohttp.ClientSession = None,
+                 ping_interval: float = 25.0,
+                 reconnect_delay: float = 0.5,
+                 max_reconnect_delay: float = 30.0,
+                 ack_timeout: float = 10.0,
+                 queue_size: int = 1000):
+        """
+        :param url: WebSocket url, WSS_URL by default
+        :param session: aiohttp session to share with other clients
+        :param ping_interval: seconds between pings keeping the connection
+        open
+        :param reconnect_delay: seconds before the first reconnection
+        attempt, doubled after every failed attempt
+        :param max_reconnect_delay: max seconds between reconnection
+        attempts
+        :param ack_timeout: seconds to wait for the answer to a subscribe
+        or unsubscribe request
+        :param queue_size: default max number of queued events of a
+        subscription
+        """
+        self.url = url or self.WSS_URL
+        self.ping_interval = ping_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ack_timeout = ack_timeout
+        self.queue_size = queue_size
+        self.reconnects = 0
+        self._session = session
+        self._own_session = session is None
+        self._ws = None
+        self._subscriptions = []
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._tasks = []
+        self._closed = True
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    @property
+    def connected(self):
+        return self._ws is not None and not self._ws.closed
+
+    async def connect(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        self._closed = False
+        await self._open()
+        self._tasks = [asyncio.ensure_future(self._run()),
+                       asyncio.ensure_future(self._ping())]
+
+    async def close(self):
+        self._closed = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._ws is not None:
+            await self._ws.close()
+        self._release_pending()
+        for subscription in self._subscriptions:
+            subscription._end()
+        self._subscriptions = []
+        if self._own_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _subscribed(self):
+        """
+        Symbols subscribed to by (stream, interval)
+        """
+        symbols = {}
+        for subscription in self._subscriptions:
+            symbols.setdefault(subscription.key, set()).update(
+                subscription.symbols)
+        return symbols
+
+    @staticmethod
+    def _payload(symbols, interval):
+        payload = {'symbols': sorted(symbols)}
+        if interval is not None:
+            payload['intervals'] = [interval]
+        return payload
+
+    async def _open(self):
+        self._ws = await self._session.ws_connect(self.url)
+        for (stream, interval), symbols in self._subscribed().items():
+            await self._send(stream.value + '.subscribe',
+                             self._payload(symbols, interval),
+                             next(self._ids))
+
+    async def _send(self, destination, payload, correlation_id):
+        await self._ws.send_json({'destination': destination,
+                                  'correlationId': correlation_id,
+                                  'payload': payload})
+
+    async def _request(self, destination, payload):
+        """
+        Send a request and wait for its answer. Nothing is sent while
+        disconnected, the subscriptions are sent again on reconnection.
+        """
+        if not self.connected:
+            return None
+        correlation_id = str(next(self._ids))
+        future = asyncio.get_running_loop().create_future()
+        self._pending[correlation_id] = future
+        try:
+            await self._send(destination, payload, correlation_id)
+            response = await asyncio.wait_for(future, self.ack_timeout)
+        except (aiohttp.ClientError, ConnectionError):
+            return None
+        except asyncio.TimeoutError:
+            raise CurrencyComStreamTimeoutException(
+                destination, self.ack_timeout) from None
+        finally:
+            self._pending.pop(correlation_id, None)
+        if response is not None and response.get('status') != 'OK':
+            raise CurrencyComStreamException(
+                destination, response.get('status'), response.get('payload'))
+        return response
+
+    def _release_pending(self):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result(None)
+
+    async def subscribe(self, stream: StreamType, symbols,
+                        interval: CandlesticksChartInervals = None,
+                        callback=None,
+                        maxsize: int = None,
+                        overflow: Overflow = Overflow.DROP_OLDEST):
+        """
+        Subscribe to the events of stream for symbols.
+
+        :param stream: StreamType
+        :param symbols: symbol or list of symbols
+        :param interval: interval of KLINES, required for them only
+        :param callback: function or coroutine function called with every
+        StreamEvent. The socket is not read while it runs.
+        :param maxsize: max number of queued events when there is no
+        callback, queue_size of the client by default
+        :param overflow: what to do with new events when the queue is full
+        :return: Subscription
+        """
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        if (stream is StreamType.KLINES) != (interval is not None):
+            raise ValueError('interval is required for KLINES and only '
+                             'for them')
+        interval = interval.value if interval is not None else None
+        subscription = Subscription(
+            self, stream, symbols, interval, callback,
+            self.queue_size if maxsize is None else maxsize, overflow)
+        self._subscriptions.append(subscription)
+        try:
+            await self._request(
+                stream.value + '.subscribe',
+                self._payload(self._subscribed()[subscription.key],
+                              interval))
+        except BaseException:
+            self._subscriptions.remove(subscription)
+            raise
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription):
+        """
+        Stop the subscription and unsubscribe from the symbols no other
+        subscription needs
+        """
+        if subscription not in self._subscriptions:
+            return
+        self._subscriptions.remove(subscription)
+        subscription._end()
+        removed = subscription.symbols.difference(
+            self._subscribed().get(subscription.key, ()))
+        if removed:
+            await self._request(
+                subscription.stream.value + '.unsubscribe',
+                self._payload(removed, subscription.interval))
+
+    async def subscribe_depth(self, symbols, **kwargs):
+        return await self.subscribe(StreamType.DEPTH, symbols, **kwargs)
+
+    async def subscribe_trades(self, symbols, **kwargs):
+        return await self.subscribe(StreamType.TRADES, symbols, **kwargs)
+
+    async def subscribe_klines(self, symbols,
+                               interval: CandlesticksChartInervals,
+                               **kwargs):
+        return await self.subscribe(StreamType.KLINES, symbols,
+                                    interval=interval, **kwargs)
+
+    async def subscribe_ticker(self, symbols, **kwargs):
+        return await self.subscribe(StreamType.TICKER, symbols, **kwargs)
+
+    async def _handle(self, message):
+        future = self._pending.get(str(message.get('correlationId')))
+        if future is not None:
+            if not future.done():
+                future.set_result(message)
+            return
+        stream = EVENT_DESTINATIONS.get(message.get('destination'))
+        if stream is None:
+            # pongs and answers to resubscriptions
+            return
+        payload = message.get('payload') or {}
+        symbol = payload.get('symbol', payload.get('symbolName'))
+        event = StreamEvent(stream, symbol, payload)
+        for subscription in list(self._subscriptions):
+            if subscription.stream is stream \
+                    and subscription.matches(symbol, payload):
+                await subscription._deliver(event)
+
+    async def _read(self):
+        try:
+            async for message in self._ws:
+                if message.type == aiohttp.WSMsgType.ERROR:
+                    return
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                try:
+                    data = json.loads(message.data)
+                except ValueError:
+                    continue
+                await self._handle(data)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError):
+            pass
+
+    async def _reconnect(self):
+        delay = self.reconnect_delay
+        while not self._closed:
+            await asyncio.sleep(delay)
+            try:
+                await self._open()
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+                delay = min(delay * 2, self.max_reconnect_delay)
+            else:
+                self.reconnects += 1
+                return
+
+    async def _run(self):
+        while not self._closed:
+            await self._read()
+            self._release_pending()
+            await self._reconnect()
+
+    async def _ping(self):
+        while not self._closed:
+            await asyncio.sleep(self.ping_interval)
+            if self.connected:
+                try:
+                    await self._send('ping', {}, next(self._ids))
+                except (aiohttp.ClientError, ConnectionError):
+                    pass
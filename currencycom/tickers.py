@@ -0,0 +1,171 @@
+import asyncio
+from threading import Event, Lock, Thread
+from typing import List, NamedTuple
+
+from .columnar import _require_numpy, np
+
+# Fields of get_24h_price_change compared between polls. openTime and
+# closeTime move with the rolling window on every poll and are left out.
+TICKER_FIELDS = (
+    'lastPrice',
+    'lastQty',
+    'bidPrice',
+    'askPrice',
+    'openPrice',
+    'highPrice',
+    'lowPrice',
+    'prevClosePrice',
+    'priceChange',
+    'priceChangePercent',
+    'weightedAvgPrice',
+    'volume',
+    'quoteVolume',
+)
+
+
+class TickerDelta(NamedTuple):
+    """
+    Changes between two polls: the tickers of the symbols that moved or
+    were listed, and the symbols no longer listed
+    """
+    changed: List[dict]
+    removed: List[str]
+
+
+class TickerPoller(object):
+    """
+    Polls get_24h_price_change for all symbols and publishes only the
+    tickers that changed since the previous poll:
+
+        poller = TickerPoller(client)
+        poller.subscribe(lambda delta: print(delta.changed))
+        poller.start()
+
+    The previous poll is kept as a float64 table, one row per symbol, and
+    compared to the new one in a single vectorized pass.
+    """
+
+    def __init__(self, client, interval: float = 1.0,
+                 fields=TICKER_FIELDS):
+        """
+        :param client: Client or AsyncClient
+        :param interval: seconds between polls of the background thread
+        :param fields: ticker fields a change of which is published
+        """
+        _require_numpy()
+        self.client = client
+        self.interval = interval
+        self.fields = tuple(fields)
+        self.symbols = []
+        self.values = np.empty((0, len(self.fields)))
+        self._index = {}
+        self._tickers = []
+        self._subscribers = []
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+
+    def subscribe(self, callback):
+        """
+        Call callback with every non empty TickerDelta
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def __getitem__(self, symbol) -> dict:
+        """
+        Last ticker of symbol
+        """
+        return self._tickers[self._index[symbol]]
+
+    def _table(self, tickers):
+        table = np.array([[ticker.get(field) for field in self.fields]
+                          for ticker in tickers], dtype=object)
+        table = table.reshape(len(tickers), len(self.fields))
+        table[np.equal(table, None)] = np.nan
+        return table.astype(float)
+
+    def _diff(self, tickers) -> TickerDelta:
+        symbols = [ticker['symbol'] for ticker in tickers]
+        values = self._table(tickers)
+        with self._lock:
+            removed = []
+            if symbols == self.symbols:
+                previous = self.values
+                listed = np.zeros(len(symbols), dtype=bool)
+            else:
+                rows = np.fromiter((self._index.get(s, -1) for s in symbols),
+                                   dtype=np.intp, count=len(symbols))
+                listed = rows < 0
+                previous = np.full_like(values, np.nan)
+                previous[~listed] = self.values[rows[~listed]]
+                current = set(symbols)
+                removed = [s for s in self.symbols if s not in current]
+            unchanged = (values == previous) \
+                | (np.isnan(values) & np.isnan(previous))
+            changed = listed | ~unchanged.all(axis=1)
+            if symbols != self.symbols:
+                self.symbols = symbols
+                self._index = {s: i for i, s in enumerate(symbols)}
+            self.values = values
+            self._tickers = tickers
+        return TickerDelta([tickers[i] for i in np.flatnonzero(changed)],
+                           removed)
+
+    def _publish(self, delta: TickerDelta):
+        if delta.changed or delta.removed:
+            for callback in list(self._subscribers):
+                callback(delta)
+        return delta
+
+    def poll(self) -> TickerDelta:
+        """
+        Poll once and publish the changes
+        """
+        return self._publish(self._diff(self.client.get_24h_price_change()))
+
+    async def async_poll(self) -> TickerDelta:
+        """
+        poll with an AsyncClient
+        """
+        return self._publish(
+            self._diff(await self.client.get_24h_price_change()))
+
+    async def async_run(self):
+        """
+        Poll with an AsyncClient every interval seconds until cancelled
+        """
+        while True:
+            try:
+                await self.async_poll()
+            except Exception:
+                # Keep the last snapshot, try again next time
+                pass
+            await asyncio.sleep(self.interval)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                # Keep the last snapshot, try again next time
+                pass
+
+    def start(self):
+        """
+        Poll once and keep polling in a background thread
+        """
+        if self._thread is None:
+            self.poll()
+            self._stop.clear()
+            self._thread = Thread(target=self._run, daemon=True,
+                                  name='currencycom-ticker-poller')
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
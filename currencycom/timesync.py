@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from threading import Event, Lock, Thread
+
+from .client import CurrencyComConstants
+
+logger = logging.getLogger(__name__)
+
+
+class TimeSync(object):
+    """
+    Tracks the offset between the local and the exchange clocks.
+
+    get_server_time is sampled every interval seconds, the offset is taken
+    from the sample with the lowest round trip among the last samples,
+    which is the least affected by network delays. Clients created with
+    time_sync use it to stamp signed requests, without extra requests:
+
+        time_sync = TimeSync(Client('', ''))
+        time_sync.start()
+        client = Client('API_KEY', 'SECRET_KEY', time_sync=time_sync)
+
+    With an AsyncClient, sample from the event loop instead of a thread:
+
+        task = asyncio.ensure_future(TimeSync(async_client).async_run())
+    """
+
+    # Default recvWindow of the exchange
+    DEFAULT_RECV_WINDOW = 5000
+
+    def __init__(self, client, interval: float = 60, samples: int = 8):
+        """
+        :param client: Client or AsyncClient used to get the server time
+        :param interval: seconds between samples of the background thread
+        or of async_run
+        :param samples: number of last samples the min round trip filter
+        is applied to
+        """
+        self.client = client
+        self.interval = interval
+        self._samples = deque(maxlen=samples)
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+        self.offset = 0
+        self.rtt = None
+
+    def _record(self, sent, rtt, server_time):
+        # The server stamped its time roughly in the middle of the round trip
+        offset = server_time - (sent + rtt / 2)
+        with self._lock:
+            self._samples.append((rtt, offset))
+            self.rtt, self.offset = min(self._samples)
+
+    def sample(self):
+        """
+        Take one sample of the server time
+        """
+        sent = time.time() * 1000
+        start = time.perf_counter()
+        server_time = self.client.get_server_time()['serverTime']
+        rtt = (time.perf_counter() - start) * 1000
+        self._record(sent, rtt, server_time)
+
+    async def async_sample(self):
+        """
+        Take one sample of the server time with an AsyncClient
+        """
+        sent = time.time() * 1000
+        start = time.perf_counter()
+        server_time = (await self.client.get_server_time())['serverTime']
+        rtt = (time.perf_counter() - start) * 1000
+        self._record(sent, rtt, server_time)
+
+    def timestamp(self):
+        """
+        Current server time estimate in epoch milliseconds
+        """
+        return int(time.time() * 1000 + self.offset)
+
+    def recv_window(self):
+        """
+        recvWindow suggested for the observed network conditions: the
+        exchange default, widened when round trips or the clock error are
+        large. None until the first sample.
+        """
+        with self._lock:
+            if not self._samples:
+                return None
+            worst_rtt = max(rtt for rtt, _ in self._samples)
+            # Offsets of the other samples show how much the estimate moves
+            spread = max(abs(offset - self.offset)
+                         for _, offset in self._samples)
+        return int(min(CurrencyComConstants.RECV_WINDOW_MAX_LIMIT,
+                       max(self.DEFAULT_RECV_WINDOW,
+                           3 * worst_rtt + 2 * spread)))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                # Keep the last estimate, try again next time
+                logger.warning('Server time sample failed', exc_info=True)
+
+    async def async_run(self, samples: int = 3):
+        """
+        Take the first samples, then one every interval seconds with an
+        AsyncClient until cancelled
+
+        :param samples: number of samples taken immediately
+        """
+        for _ in range(samples):
+            await self.async_sample()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.async_sample()
+            except Exception:
+                # Keep the last estimate, try again next time
+                logger.warning('Server time sample failed', exc_info=True)
+
+    def start(self, samples: int = 3):
+        """
+        Take the first samples and keep sampling in a background thread
+
+        :param samples: number of samples taken immediately
+        """
+        if asyncio.iscoroutinefunction(self.client.get_server_time):
+            raise TypeError('The client is asynchronous, run async_run in '
+                            'its event loop instead')
+        for _ in range(samples):
+            self.sample()
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = Thread(target=self._run, daemon=True,
+                                  name='currencycom-time-sync')
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
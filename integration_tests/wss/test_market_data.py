@@ -0,0 +1,21 @@
+import asyncio
+
+from currencycom.streams import StreamClient
+
+
+async def first_event(subscribe):
+    async with StreamClient() as client:
+        subscription = await subscribe(client)
+        return await asyncio.wait_for(subscription.__anext__(), 30)
+
+
+class TestMarketData:
+    def test_ticker(self):
+        event = asyncio.run(first_event(
+            lambda client: client.subscribe_ticker('BTC/USD')))
+        assert event.symbol == 'BTC/USD'
+
+    def test_depth(self):
+        event = asyncio.run(first_event(
+            lambda client: client.subscribe_depth('BTC/USD')))
+        assert event.symbol == 'BTC/USD'
@@ -16,6 +16,11 @@ setup(
     license='MIT',
     author_email='',
     install_requires=['requests', ],
+    extras_require={
+        'async': ['aiohttp'],
+        'numpy': ['numpy'],
+        'orjson': ['orjson'],
+    },
     keywords="currencycom exchange rest wss websocket api bitcoin ethereum "
              "btc eth",
     classifiers=[
@@ -23,12 +28,10 @@ setup(
         'License :: OSI Approved :: MIT License',
         'Operating System :: OS Independent',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python',
         'Topic :: Software Development :: Libraries :: Python Modules',
     ],
-    python_requires='>=3.5',
+    python_requires='>=3.7',
 )
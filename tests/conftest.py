@@ -1,4 +1,8 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
 from unittest.mock import MagicMock
+from urllib.parse import urlparse
 
 import pytest
 
@@ -6,5 +10,44 @@ import pytest
 @pytest.fixture(scope='function')
 def mock_requests(monkeypatch):
     mock = MagicMock()
-    monkeypatch.setattr('requests.get', mock)
+    mock.return_value.content = b'{}'
+    monkeypatch.setattr('requests.Session.get', mock)
     return mock
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self):
+        path = urlparse(self.path).path
+        body = json.dumps(self.server.responses.get(path, {})).encode()
+        self.server.requests.append((self.command, self.path))
+        self.send_response(self.server.statuses.get(path, 200))
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_DELETE = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='function')
+def local_server():
+    """
+    Keep-alive HTTP server answering with server.responses[path] as JSON
+    and server.statuses[path] as status
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _JsonHandler)
+    server.daemon_threads = True
+    server.responses = {}
+    server.statuses = {}
+    server.requests = []
+    server.url = 'http://127.0.0.1:{}'.format(server.server_port)
+    thread = Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import hmac
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from currencycom.async_client import AsyncClient
+from currencycom.client import *
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestAsyncClient(object):
+    @pytest.fixture(autouse=True)
+    def set_server(self, local_server, monkeypatch):
+        self.server = local_server
+        for name in ('SERVER_TIME_ENDPOINT', 'KLINES_DATA_ENDPOINT',
+                     'ORDER_ENDPOINT', 'TRADING_POSITIONS_ENDPOINT',
+                     'EXCHANGE_INFORMATION_ENDPOINT'):
+            path = urlparse(getattr(CurrencyComConstants, name)).path
+            monkeypatch.setattr(CurrencyComConstants, name,
+                                local_server.url + path)
+        self.path = '/api/{}/'.format(CurrencyComConstants.API_VERSION)
+
+    def test_get_server_time(self):
+        self.server.responses[self.path + 'time'] = {'serverTime': 1}
+
+        async def main():
+            async with AsyncClient('', '') as client:
+                return await client.get_server_time()
+
+        assert run(main()) == {'serverTime': 1}
+
+    def test_get_klines_params(self):
+        self.server.responses[self.path + 'klines'] = [[1, '1', '1']]
+
+        async def main():
+            async with AsyncClient('', '') as client:
+                return await client.get_klines(
+                    'BTC/USD', CandlesticksChartInervals.DAY, limit=10)
+
+        assert run(main()) == [[1, '1', '1']]
+        _, path = self.server.requests[0]
+        assert parse_qs(urlparse(path).query) == {
+            'symbol': ['BTC/USD'], 'interval': ['1d'], 'limit': ['10']}
+
+    def test_signed_request(self):
+        async def main():
+            async with AsyncClient('key', 'secret') as client:
+                return await client.new_order(
+                    'TEST', OrderSide.BUY, OrderType.MARKET, 1)
+
+        run(main())
+        method, path = self.server.requests[0]
+        assert method == 'POST'
+        query = urlparse(path).query
+        params = parse_qs(query)
+        signature = params.pop('signature')[0]
+        unsigned = '&'.join(
+            part for part in query.split('&')
+            if not part.startswith('signature='))
+        assert hmac.new(b'secret', unsigned.encode(),
+                        hashlib.sha256).hexdigest() == signature
+        assert params['side'] == ['BUY']
+        assert params['guaranteedStopLoss'] == ['False']
+        assert 'accountId' not in params
+
+    def test_new_orders(self):
+        async def main():
+            async with AsyncClient('key', 'secret') as client:
+                return await client.new_orders(
+                    [dict(symbol=symbol, side=OrderSide.SELL,
+                          order_type=OrderType.MARKET, quantity=1)
+                     for symbol in ('A', 'B', 'C')])
+
+        assert run(main()) == [{}] * 3
+        symbols = sorted(parse_qs(urlparse(path).query)['symbol'][0]
+                         for _, path in self.server.requests)
+        assert symbols == ['A', 'B', 'C']
+
+    def test_fan_out(self):
+        self.server.responses[self.path + 'klines'] = [[1, '1']]
+
+        async def main():
+            async with AsyncClient('', '') as client:
+                klines = await client.get_klines_multi(
+                    ['A', 'B'], CandlesticksChartInervals.DAY, limit=10)
+                completed = [symbol async for symbol, _ in
+                             client.iter_fan_out(
+                                 client.get_klines, ['C', 'D'],
+                                 CandlesticksChartInervals.DAY)]
+                return klines, completed
+
+        klines, completed = run(main())
+        assert klines == {'A': [[1, '1']], 'B': [[1, '1']]}
+        assert sorted(completed) == ['C', 'D']
+
+    def test_enable_rate_limiter(self):
+        self.server.responses[self.path + 'exchangeInfo'] = {'rateLimits': [
+            {'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE',
+             'intervalNum': 1, 'limit': 1200}]}
+
+        async def main():
+            async with AsyncClient('async-enable-key', '') as client:
+                limiter = await client.enable_rate_limiter()
+                assert client.rate_limiter is limiter
+                assert await client.get_server_time() == {}
+                return limiter
+
+        assert run(main()) is not None
+
+    def test_sync_context_manager(self):
+        with pytest.raises(TypeError):
+            with AsyncClient('', ''):
+                pass
+
+    def test_validation_before_await(self):
+        client = AsyncClient('', '')
+        with pytest.raises(ValueError):
+            client.get_klines('TEST', CandlesticksChartInervals.DAY,
+                              limit=CurrencyComConstants.KLINES_MAX_LIMIT + 1)
+        assert self.server.requests == []
+
+    def test_concurrent_requests_share_pool(self):
+        self.server.responses[self.path + 'tradingPositions'] = {
+            'positions': []}
+
+        async def main():
+            async with AsyncClient('key', 'secret') as client:
+                result = await asyncio.gather(
+                    *[client.list_leverage_trades() for _ in range(50)])
+                await client.list_leverage_trades()
+                return result, client.pool_stats()
+
+        result, stats = run(main())
+        assert result == [{'positions': []}] * 50
+        assert stats['requests'] == 51
+        assert stats['hits'] >= 1
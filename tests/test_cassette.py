@@ -0,0 +1,155 @@
+import asyncio
+from urllib.parse import urlparse
+
+import pytest
+
+from currencycom.async_client import AsyncClient
+from currencycom.cassette import Cassette
+from currencycom.client import (Client, CurrencyComConstants, OrderSide,
+                                OrderType)
+from currencycom.exceptions import (CurrencyComAPIException,
+                                    CurrencyComCassetteMissException)
+from currencycom.resilience import RetryPolicy
+from currencycom.simulator import (SimulatedExchange, SimulatorServer,
+                                   redirect_endpoints)
+
+
+class TestCassetteKey(object):
+    def test_volatile_params(self):
+        key = Cassette.key('get', 'https://host/api/v1/account',
+                           {'timestamp': 1, 'recvWindow': 5000,
+                            'showZeroBalance': 'false', 'signature': 'ab'})
+        assert key == 'GET /api/v1/account?showZeroBalance=false'
+        assert Cassette.key('GET', 'http://other/api/v1/account',
+                            'signature=cd&showZeroBalance=false'
+                            '&timestamp=2') == key
+
+    def test_sorted(self):
+        assert Cassette.key('GET', '/api/v1/klines', {'b': 1, 'a': 'x/y'}) \
+            == Cassette.key('GET', '/api/v1/klines', 'a=x%2Fy&b=1') \
+            == 'GET /api/v1/klines?a=x%2Fy&b=1'
+        assert Cassette.key('POST', '/api/v1/order') == 'POST /api/v1/order?'
+
+    def test_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            Cassette(str(tmp_path / 'c'), mode='play')
+
+
+class TestClientCassette(object):
+    @pytest.fixture(autouse=True)
+    def set_server(self, local_server, monkeypatch, tmp_path):
+        self.server = local_server
+        for name in ('SERVER_TIME_ENDPOINT', 'ACCOUNT_INFORMATION_ENDPOINT'):
+            path = urlparse(getattr(CurrencyComConstants, name)).path
+            monkeypatch.setattr(CurrencyComConstants, name,
+                                local_server.url + path)
+        self.path = '/api/{}/'.format(CurrencyComConstants.API_VERSION)
+        self.server.responses[self.path + 'time'] = {'serverTime': 1}
+        self.server.responses[self.path + 'account'] = {'balances': []}
+        self.file = str(tmp_path / 'responses.cassette')
+
+    def test_replay(self):
+        client = Client('key', 'secret', cassette=Cassette(self.file))
+        assert client.get_server_time() == {'serverTime': 1}
+        assert client.get_account_info() == {'balances': []}
+        self.server.responses[self.path + 'time'] = {'serverTime': 2}
+        assert client.get_server_time() == {'serverTime': 1}
+        # Signed again with another timestamp
+        assert client.get_account_info() == {'balances': []}
+        assert len(self.server.requests) == 2
+        # Other parameters are another request
+        client.get_account_info(show_zero_balance=True)
+        assert len(self.server.requests) == 3
+
+        cassette = Cassette(self.file, mode='strict')
+        assert len(cassette) == 3
+        client = Client('key', 'secret', cassette=cassette)
+        assert client.get_server_time() == {'serverTime': 1}
+        assert client.get_account_info() == {'balances': []}
+        assert len(self.server.requests) == 3
+
+    def test_strict(self):
+        client = Client('', '', cassette=Cassette(self.file, mode='strict'))
+        with pytest.raises(CurrencyComCassetteMissException) as e:
+            client.get_server_time()
+        assert e.value.key == 'GET {}time?'.format(self.path)
+        assert self.server.requests == []
+
+    def test_strict_blocks_orders(self):
+        exchange = SimulatedExchange(accounts={'key': 'secret'})
+        with SimulatorServer(exchange) as url, redirect_endpoints(url):
+            client = Client('key', 'secret', cassette=Cassette(
+                self.file, mode='strict'))
+            with pytest.raises(CurrencyComCassetteMissException) as e:
+                client.new_order('BTC/USD', OrderSide.BUY, OrderType.MARKET,
+                                 0.01)
+            assert e.value.key.startswith('POST /api/v1/order?')
+            trades = Client('key', 'secret').get_account_trade_list(
+                'BTC/USD')
+            assert trades == []
+
+    def test_record(self):
+        Client('', '', cassette=Cassette(self.file)).get_server_time()
+        self.server.responses[self.path + 'time'] = {'serverTime': 2}
+        client = Client('', '', cassette=Cassette(self.file, mode='record'))
+        assert client.get_server_time() == {'serverTime': 2}
+        # The last recording wins
+        client = Client('', '', cassette=Cassette(self.file))
+        assert client.get_server_time() == {'serverTime': 2}
+        assert len(self.server.requests) == 2
+
+    def test_errors(self):
+        self.server.statuses[self.path + 'time'] = 503
+        client = Client('', '', cassette=Cassette(self.file),
+                        retry_policy=RetryPolicy(max_retries=0))
+        with pytest.raises(CurrencyComAPIException):
+            client.get_server_time()
+        assert len(Cassette(self.file)) == 0
+        self.server.statuses[self.path + 'time'] = 400
+        self.server.responses[self.path + 'time'] = {'code': -1100,
+                                                     'msg': 'Bad'}
+        for _ in range(2):
+            with pytest.raises(CurrencyComAPIException) as e:
+                client.get_server_time()
+            assert e.value.code == -1100
+        assert len(self.server.requests) == 3
+        assert len(Cassette(self.file)) == 0
+
+    def test_orders_sent(self):
+        exchange = SimulatedExchange(accounts={'key': 'secret'})
+        with SimulatorServer(exchange) as url, redirect_endpoints(url):
+            client = Client('key', 'secret', cassette=Cassette(self.file))
+            first = client.new_order('BTC/USD', OrderSide.BUY,
+                                     OrderType.MARKET, 0.01)
+            second = client.new_order('BTC/USD', OrderSide.BUY,
+                                      OrderType.MARKET, 0.01)
+            assert first['orderId'] != second['orderId']
+            assert len(client.get_account_trade_list('BTC/USD')) == 2
+        assert list(Cassette(self.file)._index) == [
+            'GET /api/v1/myTrades?limit=500&symbol=BTC%2FUSD']
+
+    def test_raw(self):
+        client = Client('', '', raw=True, cassette=Cassette(self.file))
+        first = client.get_server_time()
+        second = client.get_server_time()
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert second.headers['Content-Type'] == 'application/json'
+        assert 'Content-Length' not in second.headers
+
+    def test_async(self):
+        Client('', '', cassette=Cassette(self.file)).get_server_time()
+
+        async def main():
+            async with AsyncClient('', '', cassette=Cassette(
+                    self.file, mode='strict')) as client:
+                assert await client.get_server_time() == {'serverTime': 1}
+                with pytest.raises(CurrencyComCassetteMissException):
+                    await client.get_account_info()
+            async with AsyncClient('key', 'secret', cassette=Cassette(
+                    self.file)) as client:
+                await client.get_account_info()
+                await client.get_account_info()
+
+        asyncio.run(main())
+        assert len(self.server.requests) == 2
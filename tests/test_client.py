@@ -4,6 +4,7 @@ from unittest.mock import MagicMock
 import pytest
 
 from currencycom.client import *
+from currencycom.exceptions import CurrencyComAPIException
 
 
 class TestClient(object):
@@ -127,6 +128,51 @@ class TestClient(object):
                                        end_time=end_time)
         self.mock_requests.assert_not_called()
 
+    def test_get_agg_trades_epoch_milliseconds(self):
+        symbol = 'TEST'
+        self.client.get_agg_trades(symbol,
+                                   start_time=0,
+                                   end_time=3600000)
+        self.mock_requests.assert_called_once_with(
+            CurrencyComConstants.AGGREGATE_TRADE_LIST_ENDPOINT,
+            params={'symbol': symbol, 'limit': 500,
+                    'startTime': 0, 'endTime': 3600000}
+        )
+
+    def test_get_agg_trades_epoch_milliseconds_exceed_max_range(self):
+        with pytest.raises(ValueError):
+            self.client.get_agg_trades('TEST',
+                                       start_time=1,
+                                       end_time=3600002)
+        self.mock_requests.assert_not_called()
+
+    def test_iter_agg_trades_hour_windows(self, monkeypatch):
+        get_agg_trades_mock = MagicMock(return_value=[])
+        monkeypatch.setattr(self.client, 'get_agg_trades',
+                            get_agg_trades_mock)
+        hour = 3600000
+        assert list(self.client.iter_agg_trades('TEST', 0, 24 * hour)) == []
+        windows = sorted((c.kwargs['start_time'], c.kwargs['end_time'])
+                         for c in get_agg_trades_mock.call_args_list)
+        assert windows == [(i * hour, (i + 1) * hour - 1)
+                           for i in range(24)] + [(24 * hour, 24 * hour)]
+
+    def test_iter_agg_trades_saturated_window_split(self, monkeypatch):
+        # one trade per millisecond, 4000 trades in [0, 4000)
+        calls = []
+
+        def get_agg_trades(symbol, start_time, end_time, limit):
+            calls.append((start_time, end_time))
+            stop = min(end_time + 1, 4000)
+            return [{'a': t, 'T': t}
+                    for t in range(start_time, stop)][:limit]
+
+        monkeypatch.setattr(self.client, 'get_agg_trades', get_agg_trades)
+        trades = list(self.client.iter_agg_trades('TEST', 0, 3999))
+        assert [t['a'] for t in trades] == list(range(4000))
+        assert calls[0] == (0, 3999)
+        assert (0, 1999) in calls and (2000, 3999) in calls
+
     def test_get_klines_default(self):
         symbol = 'TEST'
         self.client.get_klines(symbol, CandlesticksChartInervals.DAY)
@@ -197,6 +243,20 @@ class TestClient(object):
                     'limit': 500}
         )
 
+    def test_get_klines_epoch_milliseconds(self):
+        symbol = 'TEST'
+        self.client.get_klines(symbol,
+                               CandlesticksChartInervals.HOUR,
+                               start_time=0,
+                               end_time=3600000)
+        self.mock_requests.assert_called_once_with(
+            CurrencyComConstants.KLINES_DATA_ENDPOINT,
+            params={'symbol': symbol,
+                    'interval': CandlesticksChartInervals.HOUR.value,
+                    'startTime': 0, 'endTime': 3600000,
+                    'limit': 500}
+        )
+
     def test_get_klines_with_startTime_and_endTime(self):
         symbol = 'TEST'
         start_time = datetime(2020, 1, 1)
@@ -352,6 +412,64 @@ class TestClient(object):
                                   quantity=amount)
         post_mock.assert_not_called()
 
+    def test_new_orders(self, monkeypatch):
+        def post(url, **kwargs):
+            if kwargs['symbol'] == 'BAD':
+                raise CurrencyComAPIException(400, -1121, 'Invalid symbol.')
+            return {'symbol': kwargs['symbol']}
+
+        monkeypatch.setattr(self.client, '_post', post)
+        orders = [dict(symbol=symbol, side=OrderSide.BUY,
+                       order_type=OrderType.MARKET, quantity=1)
+                  for symbol in ('A', 'BAD', 'C')]
+        result = self.client.new_orders(orders, max_workers=2)
+        assert result[0] == {'symbol': 'A'}
+        assert isinstance(result[1], CurrencyComAPIException)
+        assert result[1].code == -1121
+        assert result[2] == {'symbol': 'C'}
+
+    def test_new_orders_validated_before_sending(self, monkeypatch):
+        post_mock = MagicMock()
+        monkeypatch.setattr(self.client, '_post', post_mock)
+        orders = [dict(symbol='A', side=OrderSide.BUY,
+                       order_type=OrderType.MARKET, quantity=1),
+                  dict(symbol='B', side=OrderSide.BUY,
+                       order_type=OrderType.LIMIT, quantity=1)]
+        with pytest.raises(ValueError, match='Order 1'):
+            self.client.new_orders(orders)
+        post_mock.assert_not_called()
+
+    def test_fan_out(self, monkeypatch):
+        def get_order_book(symbol, limit=100):
+            if symbol == 'BAD':
+                raise CurrencyComAPIException(400, -1121, 'Invalid symbol.')
+            return {'symbol': symbol, 'limit': limit}
+
+        monkeypatch.setattr(self.client, 'get_order_book', get_order_book)
+        books = self.client.get_order_book_multi(['A', 'BAD', 'C'],
+                                                 limit=5, max_workers=2)
+        assert list(books) == ['A', 'BAD', 'C']
+        assert books['A'] == {'symbol': 'A', 'limit': 5}
+        assert isinstance(books['BAD'], CurrencyComAPIException)
+        assert books['C'] == {'symbol': 'C', 'limit': 5}
+
+    def test_fan_out_validation(self):
+        with pytest.raises(ValueError):
+            self.client.get_order_book_multi(['A'], limit=7)
+        with pytest.raises(ValueError):
+            self.client.get_klines_multi(
+                ['A', 'B'], CandlesticksChartInervals.DAY,
+                limit=CurrencyComConstants.KLINES_MAX_LIMIT + 1)
+        self.mock_requests.assert_not_called()
+
+    def test_iter_fan_out(self, monkeypatch):
+        get_klines = MagicMock(side_effect=lambda symbol, interval: [symbol])
+        monkeypatch.setattr(self.client, 'get_klines', get_klines)
+        results = dict(self.client.iter_fan_out(
+            self.client.get_klines, ['A', 'B', 'C'],
+            CandlesticksChartInervals.DAY))
+        assert results == {'A': ['A'], 'B': ['B'], 'C': ['C']}
+
     def test_cancel_order_default_order_id(self, monkeypatch):
         delete_mock = MagicMock()
         monkeypatch.setattr(self.client, '_delete', delete_mock)
@@ -516,3 +634,43 @@ class TestClient(object):
         dttm = datetime(1999, 1, 1, 1, 1, 1)
         assert self.client._to_epoch_miliseconds(dttm) \
                == int(dttm.timestamp() * 1000)
+
+    def test__to_epoch_miliseconds_int(self):
+        assert self.client._to_epoch_miliseconds(1577836800000) \
+               == 1577836800000
+
+    def test_interval_to_milliseconds(self):
+        assert CandlesticksChartInervals.MINUTE.to_milliseconds() == 60000
+        assert CandlesticksChartInervals.FOUR_HOURS.to_milliseconds() \
+               == 4 * 3600000
+        assert CandlesticksChartInervals.WEEK.to_milliseconds() \
+               == 7 * 86400000
+
+    def test_iter_klines_windows(self, monkeypatch):
+        get_klines_mock = MagicMock(return_value=[])
+        monkeypatch.setattr(self.client, 'get_klines', get_klines_mock)
+        interval = CandlesticksChartInervals.MINUTE
+        step = 60000 * CurrencyComConstants.KLINES_MAX_LIMIT
+        assert list(self.client.iter_klines('TEST', interval,
+                                            0, 2 * step + 10)) == []
+        windows = sorted(c.kwargs['start_time']
+                         for c in get_klines_mock.call_args_list)
+        assert windows == [0, step, 2 * step]
+        for c in get_klines_mock.call_args_list:
+            assert c.kwargs['limit'] == CurrencyComConstants.KLINES_MAX_LIMIT
+            assert c.kwargs['end_time'] \
+                == min(c.kwargs['start_time'] + step - 1, 2 * step + 10)
+
+    def test_iter_klines_ordered_and_deduplicated(self, monkeypatch):
+        step = 60000 * CurrencyComConstants.KLINES_MAX_LIMIT
+
+        def get_klines(symbol, interval, start_time, end_time, limit):
+            return [[t, '1', '1', '1', '1', '1']
+                    for t in range(start_time, end_time + 60000, step // 2)]
+
+        monkeypatch.setattr(self.client, 'get_klines', get_klines)
+        bars = list(self.client.iter_klines(
+            'TEST', CandlesticksChartInervals.MINUTE, 0, 3 * step - 1))
+        open_times = [b[0] for b in bars]
+        assert open_times == sorted(set(open_times))
+        assert open_times == [i * step // 2 for i in range(7)]
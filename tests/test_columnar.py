@@ -0,0 +1,69 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from currencycom.client import CandlesticksChartInervals, Client
+from currencycom.columnar import agg_trades_to_columns, klines_to_columns
+
+np = pytest.importorskip('numpy')
+
+KLINES = [
+    [1499040000000, '0.01634790', '0.80000000', '0.01575800', '0.01577100',
+     '148976.11427815'],
+    [1499040060000, '0.01577100', '0.9', '0.015', '0.02', '10'],
+]
+
+AGG_TRADES = [
+    {'a': 1582595833, 'p': '8980.4', 'q': '0.5', 'T': 1580204505793,
+     'm': False},
+    {'a': 1582595834, 'p': '8981', 'q': '1.0', 'T': 1580204505794,
+     'm': True},
+]
+
+
+class TestColumnar(object):
+    def test_klines(self):
+        columns = klines_to_columns(KLINES)
+        assert columns.open_time.dtype == np.int64
+        assert columns.open_time.tolist() == [1499040000000, 1499040060000]
+        assert columns.open.tolist() == [0.0163479, 0.015771]
+        assert columns.high.tolist() == [0.8, 0.9]
+        assert columns.low.tolist() == [0.015758, 0.015]
+        assert columns.close.tolist() == [0.015771, 0.02]
+        assert columns.volume.tolist() == [148976.11427815, 10.0]
+        for column in columns:
+            assert column.flags['C_CONTIGUOUS']
+
+    def test_klines_empty(self):
+        columns = klines_to_columns([])
+        assert all(len(c) == 0 for c in columns)
+        assert columns.open_time.dtype == np.int64
+        assert columns.close.dtype == np.float64
+
+    def test_agg_trades(self):
+        columns = agg_trades_to_columns(AGG_TRADES)
+        assert columns.id.dtype == np.int64
+        assert columns.id.tolist() == [1582595833, 1582595834]
+        assert columns.price.tolist() == [8980.4, 8981.0]
+        assert columns.quantity.tolist() == [0.5, 1.0]
+        assert columns.timestamp.tolist() == [1580204505793, 1580204505794]
+        assert columns.buyer_maker.tolist() == [False, True]
+        for column in columns:
+            assert column.flags['C_CONTIGUOUS']
+
+    def test_agg_trades_empty(self):
+        assert all(len(c) == 0 for c in agg_trades_to_columns([]))
+
+    def test_client_columnar(self, mock_requests):
+        mock_requests.return_value = MagicMock(
+            content=json.dumps(KLINES).encode())
+        columns = Client('', '').get_klines(
+            'TEST', CandlesticksChartInervals.MINUTE, columnar=True)
+        assert columns.close.tolist() == [0.015771, 0.02]
+
+    def test_client_agg_trades_columnar(self, mock_requests):
+        mock_requests.return_value = MagicMock(
+            content=json.dumps(AGG_TRADES).encode())
+        columns = Client('', '').get_agg_trades('TEST', columnar=True)
+        assert columns.id.tolist() == [1582595833, 1582595834]
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from currencycom.concurrency import (aiter_completed, aiter_windows,
+                                    async_gather, gather, iter_completed,
+                                    iter_windows)
+
+
+class TestIterWindows(object):
+    def test_order_kept(self):
+        def fetch(window):
+            time.sleep(0.001 * (10 - window))
+            return window * 10
+
+        assert list(iter_windows(fetch, range(10), max_workers=4)) \
+            == [(w, w * 10) for w in range(10)]
+
+    def test_bounded_in_flight(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'max': 0}
+
+        def fetch(window):
+            with lock:
+                state['running'] += 1
+                state['max'] = max(state['max'], state['running'])
+            time.sleep(0.002)
+            with lock:
+                state['running'] -= 1
+            return window
+
+        assert len(list(iter_windows(fetch, range(30), max_workers=3))) == 30
+        assert state['max'] <= 3
+
+    def test_lazy_windows(self):
+        consumed = []
+
+        def windows():
+            for w in range(1000):
+                consumed.append(w)
+                yield w
+
+        result = iter_windows(lambda w: w, windows(), max_workers=2)
+        assert next(result) == (0, 0)
+        result.close()
+        assert len(consumed) <= 4
+
+    def test_split(self):
+        def split(window, result):
+            start, end = window
+            if end - start > 1:
+                middle = (start + end) // 2
+                return [(start, middle), (middle + 1, end)]
+
+        result = list(iter_windows(lambda w: w, [(0, 3), (4, 5)],
+                                   split=split))
+        assert [w for w, _ in result] == [(0, 1), (2, 3), (4, 5)]
+
+    def test_error_propagated(self):
+        def fetch(window):
+            if window == 2:
+                raise RuntimeError('boom')
+            return window
+
+        with pytest.raises(RuntimeError):
+            list(iter_windows(fetch, range(5)))
+
+
+class TestAsyncIterWindows(object):
+    def test_order_kept(self):
+        async def fetch(window):
+            await asyncio.sleep(0.001 * (10 - window))
+            return window * 10
+
+        async def main():
+            return [r async for r in aiter_windows(fetch, range(10))]
+
+        assert asyncio.run(main()) == [(w, w * 10) for w in range(10)]
+
+
+class TestGather(object):
+    def test_order_kept_and_errors_returned(self):
+        def fn(item):
+            time.sleep(0.001 * (5 - item))
+            if item == 3:
+                raise RuntimeError('boom')
+            return item * 10
+
+        result = gather(fn, list(range(5)), max_workers=5)
+        assert result[:3] == [0, 10, 20]
+        assert isinstance(result[3], RuntimeError)
+        assert result[4] == 40
+
+    def test_concurrent(self):
+        barrier = threading.Barrier(4, timeout=1)
+        assert gather(lambda item: barrier.wait() is not None,
+                      list(range(4)), max_workers=4) == [True] * 4
+
+    def test_unexpected_error_raised(self):
+        def fn(item):
+            raise KeyError(item)
+
+        with pytest.raises(KeyError):
+            gather(fn, [1], errors=ValueError)
+
+    def test_async(self):
+        in_flight = []
+
+        async def fn(item):
+            in_flight.append(item)
+            assert len(in_flight) <= 2
+            await asyncio.sleep(0.001)
+            in_flight.remove(item)
+            if item == 1:
+                raise RuntimeError('boom')
+            return item
+
+        result = asyncio.run(async_gather(fn, list(range(4)), max_workers=2))
+        assert result[0] == 0 and result[2:] == [2, 3]
+        assert isinstance(result[1], RuntimeError)
+
+
+class TestIterCompleted(object):
+    def test_completion_order(self):
+        def fn(item):
+            time.sleep(0.02 * item)
+            if item == 1:
+                raise RuntimeError('boom')
+            return item * 10
+
+        result = list(iter_completed(fn, [3, 1, 0], max_workers=3))
+        assert [item for item, _ in result] == [0, 1, 3]
+        assert isinstance(result[1][1], RuntimeError)
+        assert result[2] == (3, 30)
+
+    def test_empty(self):
+        assert list(iter_completed(lambda item: item, [])) == []
+
+    def test_async(self):
+        async def fn(item):
+            await asyncio.sleep(0.01 * item)
+            return item
+
+        async def main():
+            return [pair async for pair in
+                    aiter_completed(fn, [2, 0, 1], max_workers=3)]
+
+        assert asyncio.run(main()) == [(0, 0), (1, 1), (2, 2)]
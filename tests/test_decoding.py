@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from currencycom.async_client import AsyncClient
+from currencycom.client import CandlesticksChartInervals, Client
+from currencycom.decoding import JsonDecoder, parse_numbers
+
+BODY = (b'{"orderId": "4", "clientOrderId": "12", "price": "2.00",'
+        b' "origQty": "1", "symbol": "LTC/BTC", "status": "NEW",'
+        b' "time": 1499827319559, "isWorking": true,'
+        b' "fills": [{"price": "-1e-5", "qty": "3"}],'
+        b' "asks": {"9000.5": "0.5"}, "note": "US500", "x": "nan"}')
+
+
+class TestJsonDecoder(object):
+    @pytest.mark.parametrize('backend', ['json', 'orjson'])
+    def test_backends(self, backend):
+        pytest.importorskip(backend)
+        decoder = JsonDecoder(backend)
+        assert decoder.backend == backend
+        assert decoder(BODY)['price'] == '2.00'
+        assert decoder(BODY.decode())['time'] == 1499827319559
+
+    def test_invalid_backend(self):
+        with pytest.raises(ValueError):
+            JsonDecoder('simplejson')
+
+    def test_invalid_json(self):
+        with pytest.raises(ValueError):
+            JsonDecoder()(b'not json')
+
+    @pytest.mark.parametrize('backend', ['json', 'orjson'])
+    def test_parse_numbers(self, backend):
+        pytest.importorskip(backend)
+        order = JsonDecoder(backend, parse_numbers=True)(BODY)
+        assert order['orderId'] == '4'
+        assert order['clientOrderId'] == '12'
+        assert order['price'] == 2.0
+        assert order['origQty'] == 1 and type(order['origQty']) is int
+        assert order['symbol'] == 'LTC/BTC'
+        assert order['isWorking'] is True
+        assert order['fills'] == [{'price': -1e-5, 'qty': 3}]
+        assert order['asks'] == {'9000.5': 0.5}
+        assert order['note'] == 'US500'
+        assert order['x'] == 'nan'
+
+    def test_parse_numbers_lists(self):
+        assert parse_numbers([[1499040000000, '0.0163', '148976.1']]) == \
+            [[1499040000000, 0.0163, 148976.1]]
+
+
+class TestClientDecoder(object):
+    def test_default(self):
+        assert isinstance(Client('', '').json_decoder, JsonDecoder)
+
+    def test_parse_numbers(self, local_server, monkeypatch):
+        monkeypatch.setattr(
+            'currencycom.client.CurrencyComConstants.KLINES_DATA_ENDPOINT',
+            local_server.url + '/klines')
+        local_server.responses['/klines'] = [[1, '0.5', '1', '0.25', '1',
+                                              '10']]
+        client = Client('', '', json_decoder=JsonDecoder(parse_numbers=True))
+        assert client.get_klines('TEST', CandlesticksChartInervals.DAY) == \
+            [[1, 0.5, 1, 0.25, 1, 10]]
+
+    def test_async_parse_numbers(self, local_server, monkeypatch):
+        monkeypatch.setattr(
+            'currencycom.client.CurrencyComConstants.KLINES_DATA_ENDPOINT',
+            local_server.url + '/klines')
+        local_server.responses['/klines'] = [[1, '0.5']]
+
+        async def main():
+            async with AsyncClient(
+                    '', '', json_decoder=JsonDecoder(parse_numbers=True)) \
+                    as client:
+                return await client.get_klines(
+                    'TEST', CandlesticksChartInervals.DAY)
+
+        assert asyncio.run(main()) == [[1, 0.5]]
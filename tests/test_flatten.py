@@ -0,0 +1,158 @@
+import asyncio
+from threading import Lock
+
+import pytest
+
+from currencycom.exceptions import CurrencyComAPIException
+from currencycom.flatten import Flattener
+
+
+class FakeExchange(object):
+    def __init__(self, orders, positions, failures=0):
+        self.orders = {o['orderId']: o for o in orders}
+        self.positions = {p['id']: p for p in positions}
+        self.failures = failures
+        self.lock = Lock()
+
+    def get_open_orders(self, recv_window=None):
+        return list(self.orders.values())
+
+    def list_leverage_trades(self, recv_window=None):
+        return {'positions': list(self.positions.values())}
+
+    def cancel_order(self, symbol, order_id, recv_window=None):
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                raise CurrencyComAPIException(400, -1, 'Busy')
+            return self.orders.pop(order_id)
+
+    def close_trading_position(self, position_id, recv_window=None):
+        self.positions[position_id]['state'] = 'CLOSED'
+        return {'request': []}
+
+
+class AsyncFakeExchange(FakeExchange):
+    async def get_open_orders(self, recv_window=None):
+        return super().get_open_orders(recv_window)
+
+    async def list_leverage_trades(self, recv_window=None):
+        return super().list_leverage_trades(recv_window)
+
+    async def cancel_order(self, symbol, order_id, recv_window=None):
+        return super().cancel_order(symbol, order_id, recv_window)
+
+    async def close_trading_position(self, position_id, recv_window=None):
+        return super().close_trading_position(position_id, recv_window)
+
+
+def orders(n):
+    return [{'symbol': 'TEST', 'orderId': str(i)} for i in range(n)]
+
+
+def positions(n):
+    return [{'id': 'p{}'.format(i), 'state': 'ACTIVE'} for i in range(n)]
+
+
+class TestFlattener(object):
+    def test_flatten(self):
+        exchange = FakeExchange(orders(10), positions(3))
+        report = Flattener(exchange).flatten()
+        assert report.flat
+        assert report.rounds == 1
+        assert sorted(report.cancelled) == sorted(str(i) for i in range(10))
+        assert report.closed == ['p0', 'p1', 'p2']
+        assert report.errors == []
+        assert report.elapsed > 0
+
+    def test_already_flat(self):
+        exchange = FakeExchange([], [{'id': 'p', 'state': 'CLOSED'}])
+        report = Flattener(exchange).flatten()
+        assert report.flat
+        assert report.rounds == 0
+
+    def test_stragglers_retried(self):
+        exchange = FakeExchange(orders(5), [], failures=3)
+        report = Flattener(exchange, retry_delay=0).flatten()
+        assert report.flat
+        assert report.rounds == 2
+        assert len(report.errors) == 3
+        assert report.errors[0][0] == 'cancel'
+        assert isinstance(report.errors[0][2], CurrencyComAPIException)
+        assert len(report.cancelled) == 5
+
+    def test_max_rounds(self):
+        exchange = FakeExchange(orders(1), positions(1), failures=100)
+        report = Flattener(exchange, max_rounds=2, retry_delay=0).flatten()
+        assert not report.flat
+        assert report.rounds == 2
+        assert report.remaining_orders == orders(1)
+        assert report.remaining_positions == []
+
+    def test_snapshot_error_raised(self):
+        exchange = FakeExchange(orders(1), [])
+        exchange.get_open_orders = lambda recv_window=None: 1 / 0
+        with pytest.raises(ZeroDivisionError):
+            Flattener(exchange).flatten()
+
+    def test_failed_snapshot_retried(self):
+        exchange = FakeExchange(orders(3), positions(2))
+        list_leverage_trades = exchange.list_leverage_trades
+        calls = []
+
+        def failing_once(recv_window=None):
+            calls.append(recv_window)
+            if len(calls) == 1:
+                raise CurrencyComAPIException(503, -1, 'Unavailable')
+            return list_leverage_trades(recv_window)
+
+        exchange.list_leverage_trades = failing_once
+        report = Flattener(exchange, retry_delay=0).flatten()
+        assert report.flat
+        assert report.rounds == 2
+        # The orders were cancelled in the round the positions failed
+        assert len(report.cancelled) == 3
+        assert report.closed == ['p0', 'p1']
+        kind, item_id, error = report.errors[0]
+        assert (kind, item_id) == ('positions', None)
+        assert isinstance(error, CurrencyComAPIException)
+
+    def test_snapshot_always_failing(self):
+        exchange = FakeExchange([], positions(1))
+
+        def failing(recv_window=None):
+            raise CurrencyComAPIException(503, -1, 'Unavailable')
+
+        exchange.get_open_orders = failing
+        report = Flattener(exchange, max_rounds=2, retry_delay=0).flatten()
+        assert not report.flat
+        assert report.closed == ['p0']
+        assert report.remaining_orders is None
+        assert report.remaining_positions == []
+        assert [e[0] for e in report.errors] == ['open_orders'] * 3
+
+    def test_async_failed_snapshot(self):
+        exchange = AsyncFakeExchange([], positions(1))
+        calls = []
+
+        async def failing_once(recv_window=None):
+            calls.append(recv_window)
+            if len(calls) == 1:
+                raise CurrencyComAPIException(503, -1, 'Unavailable')
+            return []
+
+        exchange.get_open_orders = failing_once
+        report = asyncio.run(
+            Flattener(exchange, retry_delay=0).async_flatten())
+        assert report.flat
+        assert report.closed == ['p0']
+        assert report.errors[0][0] == 'open_orders'
+
+    def test_async_flatten(self):
+        exchange = AsyncFakeExchange(orders(10), positions(3), failures=2)
+        report = asyncio.run(
+            Flattener(exchange, retry_delay=0).async_flatten())
+        assert report.flat
+        assert report.rounds == 2
+        assert len(report.cancelled) == 10
+        assert len(report.closed) == 3
@@ -0,0 +1,119 @@
+import asyncio
+from urllib.parse import urlparse
+
+import pytest
+
+from currencycom.async_client import AsyncClient
+from currencycom.client import Client, CurrencyComConstants
+from currencycom.exceptions import CurrencyComAPIException
+from currencycom.metrics import Histogram, RequestMetrics
+from currencycom.resilience import RetryPolicy
+
+
+class TestHistogram(object):
+    def test_observe(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        assert histogram.counts == [2, 1, 1]
+        assert histogram.count == 4
+        assert histogram.sum == pytest.approx(2.65)
+        assert histogram.cumulative() == [(0.1, 2), (1.0, 3),
+                                          (float('inf'), 4)]
+
+    def test_quantile(self):
+        histogram = Histogram((1.0, 2.0))
+        assert histogram.quantile(0.5) is None
+        for _ in range(4):
+            histogram.observe(0.5)
+            histogram.observe(1.5)
+        assert histogram.quantile(0.25) == 0.5
+        assert histogram.quantile(0.75) == 1.5
+        histogram.observe(5.0)
+        assert histogram.quantile(1.0) == 2.0
+
+
+class TestRequestMetrics(object):
+    @pytest.fixture(autouse=True)
+    def set_server(self, local_server, monkeypatch):
+        self.server = local_server
+        for name in ('SERVER_TIME_ENDPOINT', 'ACCOUNT_INFORMATION_ENDPOINT'):
+            path = urlparse(getattr(CurrencyComConstants, name)).path
+            monkeypatch.setattr(CurrencyComConstants, name,
+                                local_server.url + path)
+        self.path = '/api/{}/'.format(CurrencyComConstants.API_VERSION)
+        self.server.responses[self.path + 'time'] = {'serverTime': 1}
+        self.metrics = RequestMetrics(base_url=local_server.url + self.path)
+
+    def test_phases(self):
+        client = Client('key', 'secret', metrics=self.metrics)
+        client.get_server_time()
+        client.get_server_time()
+        client.get_account_info()
+        snapshot = self.metrics.as_dict()
+        time = snapshot['time']
+        assert time['requests'] == {'GET 200': 2}
+        assert time['errors'] == {}
+        assert time['bytes_received'] == 2 * len(b'{"serverTime": 1}')
+        assert time['bytes_sent'] > 0
+        phases = time['phases']
+        assert set(phases) == {'connect', 'server', 'transfer', 'decode',
+                               'total'}
+        # The second request reused the connection
+        assert phases['connect']['count'] == 1
+        assert phases['total']['count'] == 2
+        assert phases['total']['buckets'][-1] == [float('inf'), 2]
+        assert phases['total']['sum'] >= phases['server']['sum']
+        assert 'sign' in snapshot['account']['phases']
+
+    def test_errors_and_hooks(self):
+        self.server.statuses[self.path + 'time'] = 503
+        before, after = [], []
+        self.metrics.before_request(before.append)
+        self.metrics.after_request(after.append)
+        client = Client('', '', metrics=self.metrics,
+                        retry_policy=RetryPolicy(max_retries=1,
+                                                 backoff=0.001))
+        with pytest.raises(CurrencyComAPIException):
+            client.get_server_time()
+        assert len(before) == len(after) == 2
+        assert after[0].status == 503
+        assert isinstance(after[0].error, CurrencyComAPIException)
+        time = self.metrics.as_dict()['time']
+        assert time['requests'] == {'GET 503': 2}
+        assert time['errors'] == {'CurrencyComServerException': 2}
+        assert 'decode' not in time['phases']
+
+    def test_prometheus(self):
+        Client('', '', metrics=self.metrics).get_server_time()
+        text = self.metrics.prometheus()
+        assert '# TYPE currencycom_request_duration_seconds histogram' in text
+        assert ('currencycom_request_duration_seconds_count'
+                '{endpoint="time",phase="total"} 1') in text
+        assert ('currencycom_request_duration_seconds_bucket'
+                '{endpoint="time",phase="total",le="+Inf"} 1') in text
+        assert ('currencycom_requests_total'
+                '{endpoint="time",method="GET",status="200"} 1') in text
+        assert text.endswith('\n')
+
+    def test_disabled(self):
+        client = Client('', '')
+        assert client.metrics is None
+        assert client.get_server_time() == {'serverTime': 1}
+
+    def test_async(self):
+        async def main():
+            async with AsyncClient('key', 'secret',
+                                   metrics=self.metrics) as client:
+                await client.get_server_time()
+                await client.get_server_time()
+                await client.get_account_info()
+
+        asyncio.run(main())
+        snapshot = self.metrics.as_dict()
+        time = snapshot['time']
+        assert time['requests'] == {'GET 200': 2}
+        assert time['bytes_received'] == 2 * len(b'{"serverTime": 1}')
+        assert time['phases']['total']['count'] == 2
+        assert time['phases']['connect']['count'] == 1
+        assert 'sign' in snapshot['account']['phases']
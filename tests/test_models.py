@@ -0,0 +1,133 @@
+import sys
+
+import pytest
+
+from currencycom.models import (AggTrade, Balance, Fill, Kline, Order,
+                                Position, Trade)
+
+ORDER = {
+    'orderId': '00000000-0000-0000-0000-00000002ca43',
+    'price': '7183.3881',
+    'clientOrderId': '00000000-0000-0000-0000-00000002ca43',
+    'side': 'BUY',
+    'cummulativeQuoteQty': None,
+    'origQty': '0.001',
+    'transactTime': 1577445603997,
+    'type': 'MARKET',
+    'executedQty': '0.001',
+    'status': 'FILLED',
+    'fills': [{'price': '7169.05', 'qty': '0.001',
+               'commissionAsset': 'dUSD', 'commission': '0'}],
+    'timeInForce': 'FOK',
+    'symbol': 'BTC/USD',
+}
+
+POSITION = {
+    'accountId': 2376109060084932,
+    'id': '00a02503-0079-54c4-0000-00004067006b',
+    'instrumentId': '45076691096786116',
+    'orderId': '00a02503-0079-54c4-0000-00004067006a',
+    'openQuantity': 0.01,
+    'openPrice': 6734.4,
+    'closeQuantity': 0.0,
+    'closePrice': 0,
+    'takeProfit': 7999.15,
+    'stopLoss': 5999.15,
+    'guaranteedStopLoss': False,
+    'rpl': 0,
+    'rplConverted': 0,
+    'swap': -0.00335894,
+    'swapConverted': -0.00335894,
+    'fee': -0.050508,
+    'dividend': 0,
+    'margin': 0.5,
+    'state': 'ACTIVE',
+    'currency': 'USD',
+    'createdTimestamp': 1586953061455,
+    'openTimestamp': 1586953061243,
+    'cost': 33.73775,
+    'symbol': 'BTC/USD_LEVERAGE',
+}
+
+
+class TestModels(object):
+    def test_order(self):
+        order = Order(ORDER)
+        assert order.price == 7183.3881
+        assert order.orig_qty == 0.001
+        assert order.cummulative_quote_qty is None
+        assert order.stop_price is None
+        assert order.side == 'BUY'
+        assert order.transact_time == 1577445603997
+        assert order.fills == [Fill(ORDER['fills'][0])]
+        assert order.fills[0].quantity == 0.001
+        assert order.fills[0].commission == 0.0
+        assert order.raw == ORDER
+
+    def test_lazy_parsing(self):
+        order = Order(ORDER)
+        assert order._price == '7183.3881'
+        assert not hasattr(order, '_price_parsed')
+        assert order.price is order.price
+        assert order._price_parsed == 7183.3881
+
+    def test_slots(self):
+        order = Order(ORDER)
+        with pytest.raises(AttributeError):
+            order.extra = 1
+        with pytest.raises(AttributeError):
+            order.__dict__
+        assert sys.getsizeof(Position(POSITION)) < sys.getsizeof(POSITION)
+
+    def test_position(self):
+        position = Position(POSITION)
+        assert position.close_price == 0.0
+        assert type(position.close_price) is float
+        assert position.account_id == 2376109060084932
+        assert position.symbol == 'BTC/USD_LEVERAGE'
+        assert position.raw == POSITION
+
+    def test_kline(self):
+        row = [1499040000000, '0.01634790', '0.80000000', '0.01575800',
+               '0.01577100', '148976.11427815']
+        klines = Kline.many([row])
+        assert klines[0].open_time == 1499040000000
+        assert klines[0].close == 0.015771
+        assert klines[0].volume == 148976.11427815
+        assert klines[0].raw == row
+
+    def test_agg_trade(self):
+        raw = {'a': 1582595833, 'p': '8980.4', 'q': '0.0',
+               'T': 1580204505793, 'm': False}
+        trade = AggTrade(raw)
+        assert trade.id == 1582595833
+        assert trade.price == 8980.4
+        assert trade.buyer_maker is False
+        assert trade.raw == raw
+
+    def test_unmodeled_keys_kept(self):
+        raw = {'orderId': '1', 'price': '1.5', 'leverage': 20,
+               'accountId': '123'}
+        order = Order(raw)
+        assert order.raw == raw
+        assert order != Order({'orderId': '1', 'price': '1.5'})
+        assert Order({'orderId': '1'})._extra is None
+        row = [1499040000000, '1', '1', '1', '1', '1', 'extra']
+        assert Kline(row).raw == row
+
+    def test_trade_and_balance(self):
+        trade = Trade({'symbol': 'BTC/USD', 'orderId': '100234',
+                       'orderListId': -1, 'price': '4.00000100',
+                       'qty': '12', 'isBuyer': True})
+        assert trade.quantity == 12.0
+        assert trade.buyer is True
+        assert trade.maker is None
+        balance = Balance({'asset': 'USD', 'free': 515.59092523,
+                           'locked': 0.0, 'default': True})
+        assert balance.free == 515.59092523
+        assert balance.default is True
+
+    def test_repr(self):
+        assert repr(Fill({'price': '1', 'qty': '2'})) == (
+            "Fill(price=1.0, quantity=2.0, commission=None, "
+            "commission_asset=None)")
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from currencycom.client import OrderSide
+from currencycom.orderbook import LocalOrderBook
+
+np = pytest.importorskip('numpy')
+
+SNAPSHOT = {
+    'lastUpdateId': 10,
+    'bids': [['99.5', '2'], ['100', '1'], ['98', '5']],
+    'asks': [['101', '3'], ['100.5', '0.5'], ['102', '0']],
+}
+
+
+class TestLocalOrderBook(object):
+    def test_snapshot(self):
+        book = LocalOrderBook.from_snapshot('TEST', SNAPSHOT)
+        assert book.last_update_id == 10
+        assert book.best_bid() == (100.0, 1.0)
+        assert book.best_ask() == (100.5, 0.5)
+        assert book.mid_price() == 100.25
+        assert book.spread() == 0.5
+        assert book.bids().prices.tolist() == [100, 99.5, 98]
+        assert book.asks().prices.tolist() == [100.5, 101]
+        assert book.asks().quantities.tolist() == [0.5, 3]
+
+    def test_depth_slice(self):
+        book = LocalOrderBook.from_snapshot('TEST', SNAPSHOT)
+        levels = book.bids(2)
+        assert levels.prices.tolist() == [100, 99.5]
+        assert levels.quantities.tolist() == [1, 2]
+        assert book.bids(10).prices.tolist() == [100, 99.5, 98]
+
+    def test_apply(self):
+        book = LocalOrderBook.from_snapshot('TEST', SNAPSHOT)
+        assert book.apply(bids=[('100', '0'), ('100.2', '4')],
+                          asks={'100.5': '0', '100.7': '1', '101': '6'},
+                          update_id=11)
+        assert book.last_update_id == 11
+        assert book.best_bid() == (100.2, 4.0)
+        assert book.best_ask() == (100.7, 1.0)
+        assert book.bids().prices.tolist() == [100.2, 99.5, 98]
+        assert book.asks().prices.tolist() == [100.7, 101]
+        assert book.quantity(OrderSide.SELL, '101') == 6
+        assert book.quantity(OrderSide.BUY, 100) == 0
+        assert book.depth(OrderSide.BUY) == 3
+
+    def test_stale_update_ignored(self):
+        book = LocalOrderBook.from_snapshot('TEST', SNAPSHOT)
+        assert not book.apply(bids=[('100', '0')], update_id=10)
+        assert book.best_bid() == (100.0, 1.0)
+
+    def test_empty(self):
+        book = LocalOrderBook('TEST', capacity=1)
+        assert book.best_bid() is None
+        assert book.mid_price() is None
+        assert book.bids().prices.tolist() == []
+        book.apply(bids=[(1, 1), (2, 1), (3, 1)])
+        assert book.bids().prices.tolist() == [3, 2, 1]
+
+    def test_matches_reference(self):
+        random.seed(1)
+        book = LocalOrderBook('TEST', capacity=4)
+        reference = {OrderSide.BUY: {}, OrderSide.SELL: {}}
+        for i in range(2000):
+            side = random.choice([OrderSide.BUY, OrderSide.SELL])
+            price = float(random.randint(1, 200))
+            quantity = float(random.choice([0, 0, 1, 2, 3]))
+            if side == OrderSide.BUY:
+                book.apply(bids=[(price, quantity)], update_id=i)
+            else:
+                book.apply(asks=[(price, quantity)], update_id=i)
+            if quantity:
+                reference[side][price] = quantity
+            else:
+                reference[side].pop(price, None)
+        bids = sorted(reference[OrderSide.BUY].items(), reverse=True)
+        asks = sorted(reference[OrderSide.SELL].items())
+        assert list(zip(*book.bids())) == bids
+        assert list(zip(*book.asks())) == asks
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from currencycom.positions import PositionBook
+
+np = pytest.importorskip('numpy')
+
+
+def position(position_id, symbol, quantity, price, margin=1.0, swap=0.0,
+             fee=0.0):
+    return {'id': position_id, 'symbol': symbol, 'openQuantity': quantity,
+            'openPrice': price, 'margin': margin, 'swap': swap, 'fee': fee,
+            'state': 'ACTIVE'}
+
+
+class TestPositionBook(object):
+    @pytest.fixture(autouse=True)
+    def set_book(self):
+        self.book = PositionBook()
+        self.delta = self.book.update({'positions': [
+            position('a', 'BTC/USD_LEVERAGE', 0.5, 9000.0, 450.0, -1.0,
+                     -2.0),
+            position('b', 'ETH/USD_LEVERAGE', -2.0, 200.0, 40.0),
+            position('c', 'BTC/USD_LEVERAGE', -0.25, 9200.0, 230.0),
+        ]})
+
+    def test_first_snapshot(self):
+        assert [p['id'] for p in self.delta.opened] == ['a', 'b', 'c']
+        assert self.delta.changed == []
+        assert self.delta.closed == []
+        assert self.book.symbols == ['BTC/USD_LEVERAGE', 'ETH/USD_LEVERAGE']
+        assert self.book.symbol_codes.tolist() == [0, 1, 0]
+        assert self.book.quantity.tolist() == [0.5, -2.0, -0.25]
+        assert self.book.open_price.tolist() == [9000.0, 200.0, 9200.0]
+        assert self.book.fee.tolist() == [-2.0, 0.0, 0.0]
+        assert len(self.book) == 3
+        assert 'b' in self.book
+        assert self.book['b']['openQuantity'] == -2.0
+
+    def test_diff(self):
+        assert self.book.update(self.book._positions) == ([], [], [])
+        delta = self.book.update([
+            position('c', 'BTC/USD_LEVERAGE', -0.25, 9200.0, 230.0),
+            position('a', 'BTC/USD_LEVERAGE', 0.5, 9000.0, 450.0, -1.5,
+                     -2.0),
+            position('d', 'XRP/USD_LEVERAGE', 100.0, 0.2, 2.0),
+        ])
+        assert [p['id'] for p in delta.opened] == ['d']
+        assert [p['swap'] for p in delta.changed] == [-1.5]
+        assert delta.closed == ['b']
+        assert self.book.ids == ['c', 'a', 'd']
+        assert self.book.quantity.tolist() == [-0.25, 0.5, 100.0]
+        assert self.book.symbol_codes.tolist() == [0, 0, 2]
+        assert 'b' not in self.book
+        # Symbols are kept so that price vectors stay aligned
+        assert self.book.symbols[1] == 'ETH/USD_LEVERAGE'
+
+    def test_inactive_positions_skipped(self):
+        closed = position('b', 'ETH/USD_LEVERAGE', -2.0, 200.0, 40.0)
+        closed['state'] = 'CLOSED'
+        delta = self.book.update({'positions': [
+            self.book['a'], closed, self.book['c'],
+            dict(position('d', 'XRP/USD_LEVERAGE', 1.0, 0.2), state='NEW'),
+        ]})
+        assert delta == ([], [], ['b'])
+        assert self.book.ids == ['a', 'c']
+        assert self.book.quantity.tolist() == [0.5, -0.25]
+
+    def test_pnl_and_exposure(self):
+        prices = self.book.prices({'BTC/USD_LEVERAGE': 9100.0,
+                                   'ETH/USD_LEVERAGE': 190.0})
+        assert prices.tolist() == [9100.0, 190.0]
+        assert self.book.position_pnl(prices).tolist() == \
+            pytest.approx([50.0 - 3.0, 20.0, 25.0])
+        assert self.book.pnl(prices).tolist() == pytest.approx([72.0, 20.0])
+        assert self.book.exposure(prices).tolist() == \
+            pytest.approx([0.25 * 9100.0, -380.0])
+        assert self.book.exposure(prices, gross=True).tolist() == \
+            pytest.approx([0.75 * 9100.0, 380.0])
+        assert self.book.margin_by_symbol().tolist() == [680.0, 40.0]
+        # Mapping of prices, a missing price only affects its symbol
+        pnl = self.book.pnl({'ETH/USD_LEVERAGE': 190.0})
+        assert np.isnan(pnl[0])
+        assert pnl[1] == pytest.approx(20.0)
+        with pytest.raises(ValueError):
+            self.book.pnl(np.array([9100.0]))
+
+    def test_empty(self):
+        delta = self.book.update({'positions': []})
+        assert sorted(delta.closed) == ['a', 'b', 'c']
+        assert len(self.book) == 0
+        assert self.book.pnl([1.0, 1.0]).tolist() == [0.0, 0.0]
+        assert PositionBook().exposure([]).tolist() == []
+
+    def test_poll(self):
+        class FakeClient(object):
+            def list_leverage_trades(self):
+                return {'positions': [position('a', 'BTC/USD', 1.0, 10.0)]}
+
+        class FakeAsyncClient(object):
+            async def list_leverage_trades(self):
+                return {'positions': []}
+
+        book = PositionBook(FakeClient())
+        assert [p['id'] for p in book.poll().opened] == ['a']
+        book.client = FakeAsyncClient()
+        assert asyncio.run(book.async_poll()).closed == ['a']
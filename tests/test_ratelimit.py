@@ -0,0 +1,120 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from currencycom.client import Client, CurrencyComConstants
+from currencycom.ratelimit import (RateLimiter, RateLimitType, TokenBucket,
+                                   request_weight)
+
+RATE_LIMITS = [
+    {'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE',
+     'intervalNum': 1, 'limit': 1200},
+    {'rateLimitType': 'ORDERS', 'interval': 'SECOND',
+     'intervalNum': 10, 'limit': 100},
+    {'rateLimitType': 'UNKNOWN', 'interval': 'DAY',
+     'intervalNum': 1, 'limit': 1},
+]
+
+
+class TestRequestWeight(object):
+    def test_weights(self):
+        c = CurrencyComConstants
+        assert request_weight(c.KLINES_DATA_ENDPOINT, {}) == 1
+        assert request_weight(c.ORDER_BOOK_ENDPOINT, {'limit': 100}) == 1
+        assert request_weight(c.ORDER_BOOK_ENDPOINT, {'limit': 500}) == 5
+        assert request_weight(c.ORDER_BOOK_ENDPOINT, {'limit': 1000}) == 10
+        assert request_weight(c.ORDER_BOOK_ENDPOINT, {'limit': 5000}) == 50
+        assert request_weight(c.PRICE_CHANGE_24H_ENDPOINT, {}) == 40
+        assert request_weight(c.PRICE_CHANGE_24H_ENDPOINT,
+                              {'symbol': 'TEST'}) == 1
+        assert request_weight(c.CURRENT_OPEN_ORDERS_ENDPOINT,
+                              {'symbol': None}) == 40
+        assert request_weight(c.ACCOUNT_INFORMATION_ENDPOINT, None) == 5
+
+    def test_order_costs(self):
+        costs = RateLimiter.costs('post', CurrencyComConstants.ORDER_ENDPOINT)
+        assert costs[RateLimitType.ORDERS] == 1
+        costs = RateLimiter.costs('delete',
+                                  CurrencyComConstants.ORDER_ENDPOINT)
+        assert costs[RateLimitType.ORDERS] == 0
+
+
+class TestTokenBucket(object):
+    def test_never_exceeds_limit_per_window(self):
+        # limit 100 per 10 seconds at 90% headroom
+        bucket = TokenBucket(capacity=10, rate=9, now=0)
+        now, sent = 0.0, []
+        for _ in range(300):
+            delay = bucket.reserve(1, now)
+            now += delay
+            sent.append(now)
+        assert now == pytest.approx((300 - 10) / 9)
+        for i, t in enumerate(sent):
+            in_window = sum(1 for s in sent[i:] if s < t + 10)
+            assert in_window <= 100
+
+    def test_pause(self):
+        bucket = TokenBucket(capacity=10, rate=10, now=0)
+        bucket.pause(2, 0)
+        assert bucket.reserve(1, 0) == pytest.approx(2.1)
+        assert bucket.reserve(0, 0) == 0
+
+
+class TestRateLimiter(object):
+    def test_buckets_from_rate_limits(self):
+        limiter = RateLimiter(RATE_LIMITS, headroom=0.9)
+        buckets = dict(limiter._buckets)
+        assert set(buckets) == {RateLimitType.REQUEST_WEIGHT,
+                                RateLimitType.ORDERS}
+        assert buckets[RateLimitType.REQUEST_WEIGHT].rate \
+            == pytest.approx(18)
+        assert buckets[RateLimitType.ORDERS].capacity == pytest.approx(10)
+
+    def test_reserve_waits_for_slowest_bucket(self):
+        limiter = RateLimiter(RATE_LIMITS, headroom=0.9)
+        costs = {RateLimitType.REQUEST_WEIGHT: 1, RateLimitType.ORDERS: 1}
+        delays = [limiter.reserve(costs) for _ in range(11)]
+        assert delays[:10] == [0.0] * 10
+        assert delays[10] == pytest.approx(1 / 9, rel=0.01)
+
+    def test_shared_by_api_key(self):
+        first = RateLimiter.shared('shared-key', RATE_LIMITS)
+        assert RateLimiter.shared('shared-key', []) is first
+        assert RateLimiter.shared('other-key', RATE_LIMITS) is not first
+
+    def test_async_acquire(self, monkeypatch):
+        limiter = RateLimiter(RATE_LIMITS)
+        sleep = MagicMock()
+
+        async def fake_sleep(delay):
+            sleep(delay)
+
+        monkeypatch.setattr('currencycom.ratelimit.asyncio.sleep', fake_sleep)
+        costs = {RateLimitType.ORDERS: 11}
+        asyncio.run(limiter.async_acquire(costs))
+        sleep.assert_called_once_with(pytest.approx(1 / 9, rel=0.01))
+
+
+class TestClientRateLimiter(object):
+    def test_requests_acquire(self, mock_requests):
+        limiter = MagicMock()
+        limiter.costs = RateLimiter.costs
+        client = Client('', '', rate_limiter=limiter)
+        client.get_order_book('TEST', limit=500)
+        limiter.acquire.assert_called_once_with(
+            {RateLimitType.REQUEST_WEIGHT: 5,
+             RateLimitType.RAW_REQUESTS: 1,
+             RateLimitType.ORDERS: 0})
+        mock_requests.assert_called_once_with(
+            CurrencyComConstants.ORDER_BOOK_ENDPOINT,
+            params={'symbol': 'TEST', 'limit': 500})
+
+    def test_enable_rate_limiter(self, mock_requests):
+        mock_requests.return_value = MagicMock(
+            content=json.dumps({'rateLimits': RATE_LIMITS}).encode())
+        client = Client('enable-key', '')
+        limiter = client.enable_rate_limiter()
+        assert client.rate_limiter is limiter
+        assert Client('enable-key', '').enable_rate_limiter([]) is limiter
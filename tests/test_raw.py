@@ -0,0 +1,76 @@
+import asyncio
+import json
+from urllib.parse import urlparse
+
+import pytest
+
+from currencycom.async_client import AsyncClient
+from currencycom.client import (CandlesticksChartInervals, Client,
+                                CurrencyComConstants, RawResponse)
+from currencycom.exceptions import CurrencyComAPIException
+
+
+class TestRawResponses(object):
+    @pytest.fixture(autouse=True)
+    def set_server(self, local_server, monkeypatch):
+        self.server = local_server
+        for name in ('SERVER_TIME_ENDPOINT', 'KLINES_DATA_ENDPOINT',
+                     'ACCOUNT_INFORMATION_ENDPOINT'):
+            path = urlparse(getattr(CurrencyComConstants, name)).path
+            monkeypatch.setattr(CurrencyComConstants, name,
+                                local_server.url + path)
+        self.path = '/api/{}/'.format(CurrencyComConstants.API_VERSION)
+        self.server.responses[self.path + 'time'] = {'serverTime': 1}
+
+    def test_per_client(self):
+        client = Client('key', 'secret', raw=True)
+        response = client.get_server_time()
+        assert isinstance(response, RawResponse)
+        assert response.status_code == 200
+        assert response.headers['content-type'] == 'application/json'
+        assert json.loads(response.content) == {'serverTime': 1}
+        assert isinstance(client.get_account_info(), RawResponse)
+
+    def test_per_call(self):
+        client = Client('', '')
+        other = Client('', '')
+        with client.raw_responses():
+            assert isinstance(client.get_server_time(), RawResponse)
+            assert other.get_server_time() == {'serverTime': 1}
+        assert client.get_server_time() == {'serverTime': 1}
+
+    def test_per_call_in_thread_pool(self):
+        client = Client('', '')
+        with client.raw_responses():
+            results = client.fan_out(lambda symbol: client.get_server_time(),
+                                     ['A', 'B'])
+            assert all(isinstance(r, RawResponse) for r in results.values())
+            with pytest.raises(ValueError):
+                next(client.iter_klines('TEST', CandlesticksChartInervals.DAY,
+                                        start_time=0, end_time=1))
+        assert client.fan_out(lambda symbol: client.get_server_time(),
+                              ['A']) == {'A': {'serverTime': 1}}
+
+    def test_columnar_skipped(self):
+        pytest.importorskip('numpy')
+        self.server.responses[self.path + 'klines'] = [[1, '1', '1', '1',
+                                                        '1', '1']]
+        response = Client('', '', raw=True).get_klines(
+            'TEST', CandlesticksChartInervals.DAY, columnar=True)
+        assert isinstance(response, RawResponse)
+
+    def test_errors_raised(self):
+        self.server.statuses[self.path + 'time'] = 400
+        with pytest.raises(CurrencyComAPIException):
+            Client('', '', raw=True).get_server_time()
+
+    def test_async(self):
+        async def main():
+            async with AsyncClient('', '') as client:
+                with client.raw_responses():
+                    raw = await client.get_server_time()
+                return raw, await client.get_server_time()
+
+        raw, decoded = asyncio.run(main())
+        assert isinstance(raw, RawResponse)
+        assert json.loads(raw.content) == decoded == {'serverTime': 1}
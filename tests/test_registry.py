@@ -0,0 +1,133 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from currencycom.registry import SymbolInfo, SymbolRegistry
+
+EXCHANGE_INFO = {
+    'timezone': 'UTC',
+    'serverTime': 1577178958852,
+    'rateLimits': [],
+    'symbols': [
+        {
+            'symbol': 'BTC/USD',
+            'name': 'Bitcoin / USD',
+            'status': 'TRADING',
+            'baseAsset': 'BTC',
+            'baseAssetPrecision': 4,
+            'quoteAsset': 'USD',
+            'quotePrecision': 2,
+            'orderTypes': ['LIMIT', 'MARKET'],
+            'filters': [
+                {'filterType': 'LOT_SIZE', 'minQty': '0.0001',
+                 'maxQty': '100', 'stepSize': '0.0001'},
+                {'filterType': 'PRICE_FILTER', 'minPrice': '0.01',
+                 'maxPrice': '1000000', 'tickSize': '0.01'},
+            ],
+        },
+        {
+            'symbol': 'BTC/USD_LEVERAGE',
+            'name': 'Bitcoin / USD',
+            'status': 'TRADING',
+            'baseAsset': 'BTC',
+            'baseAssetPrecision': 4,
+            'quoteAsset': 'USD',
+            'quotePrecision': 2,
+            'orderTypes': ['LIMIT', 'MARKET', 'STOP'],
+            'filters': [],
+            'tickSize': 0.5,
+        },
+        {
+            'symbol': 'DPW',
+            'name': 'Deutsche Post',
+            'status': 'TRADING',
+            'baseAsset': 'DPW',
+            'baseAssetPrecision': 3,
+            'quoteAsset': 'EUR',
+            'quotePrecision': 3,
+            'orderTypes': ['LIMIT', 'MARKET'],
+            'filters': [],
+        },
+    ],
+}
+
+
+class TestSymbolRegistry(object):
+    @pytest.fixture(autouse=True)
+    def set_registry(self):
+        self.client = MagicMock()
+        self.client.get_exchange_info = MagicMock(
+            return_value=EXCHANGE_INFO)
+        self.registry = SymbolRegistry(self.client, ttl=60)
+
+    def test_lookup(self):
+        info = self.registry['BTC/USD']
+        assert info.quote_precision == 2
+        assert info.order_types == {'LIMIT', 'MARKET'}
+        assert info.tick_size == 0.01
+        assert info.price_decimals == 2
+        assert info.step_size == 0.0001
+        assert info.quantity_decimals == 4
+        assert info.min_qty == 0.0001
+        assert not info.is_leverage
+        assert 'DPW' in self.registry
+        assert 'UNKNOWN' not in self.registry
+        assert self.registry.get('UNKNOWN') is None
+        assert len(self.registry) == 3
+
+    def test_cached(self):
+        for _ in range(10):
+            self.registry['BTC/USD']
+        self.client.get_exchange_info.assert_called_once_with()
+
+    def test_expired(self, monkeypatch):
+        self.registry['BTC/USD']
+        monkeypatch.setattr('currencycom.registry.time.monotonic',
+                            lambda: self.registry._updated + 61)
+        self.registry['BTC/USD']
+        assert self.client.get_exchange_info.call_count == 2
+
+    def test_background_refresh_never_blocks(self, monkeypatch):
+        self.registry.start()
+        try:
+            monkeypatch.setattr('currencycom.registry.time.monotonic',
+                                lambda: self.registry._updated + 61)
+            self.registry['BTC/USD']
+            self.client.get_exchange_info.assert_called_once_with()
+        finally:
+            self.registry.stop()
+
+    def test_asset_indexes(self):
+        assert [i.symbol for i in self.registry.by_base_asset('BTC')] \
+            == ['BTC/USD', 'BTC/USD_LEVERAGE']
+        assert [i.symbol for i in self.registry.by_quote_asset('EUR')] \
+            == ['DPW']
+        assert self.registry.by_quote_asset('GBP') == []
+
+    def test_leverage(self):
+        info = self.registry.leverage('BTC/USD')
+        assert info.symbol == 'BTC/USD_LEVERAGE'
+        assert info.is_leverage
+        assert info.tick_size == 0.5
+        assert self.registry.leverage('DPW') is None
+
+    def test_rounding(self):
+        info = self.registry['BTC/USD']
+        assert info.round_price(7183.38812) == 7183.38
+        assert info.round_price(0.29) == 0.29
+        assert info.round_quantity(0.123456) == 0.1234
+        assert self.registry['DPW'].round_price(1.23456) == 1.23456
+
+    def test_rounding_steps_not_powers_of_ten(self):
+        info = SymbolInfo.from_exchange_info({
+            'symbol': 'BTC/USD',
+            'filters': [
+                {'filterType': 'PRICE_FILTER', 'tickSize': '0.25'},
+                {'filterType': 'LOT_SIZE', 'stepSize': '0.025'},
+            ],
+        })
+        assert (info.price_decimals, info.quantity_decimals) == (2, 3)
+        assert info.round_price(7183.38) == 7183.25
+        assert info.round_price(7183.5) == 7183.5
+        assert info.round_quantity(0.075) == 0.075
+        assert info.round_quantity(0.074) == 0.05
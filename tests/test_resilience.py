@@ -0,0 +1,199 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+from urllib.parse import urlparse
+
+import pytest
+import requests
+
+from currencycom.async_client import AsyncClient
+from currencycom.client import *
+from currencycom.exceptions import *
+from currencycom.resilience import CircuitBreaker, CircuitBreakers, RetryPolicy
+
+
+def response(status_code=200, body='{}', headers=None):
+    r = MagicMock()
+    r.ok = status_code < 400
+    r.status_code = status_code
+    r.text = body
+    r.content = body.encode()
+    r.headers = headers or {}
+    r.json = MagicMock(side_effect=lambda: json.loads(body))
+    return r
+
+
+class TestApiException(object):
+    def test_client_error(self):
+        e = api_exception(400, {}, '{"code": -1121, "msg": "Invalid symbol."}')
+        assert type(e) is CurrencyComAPIException
+        assert (e.status_code, e.code, e.message) \
+            == (400, -1121, 'Invalid symbol.')
+
+    def test_server_error(self):
+        e = api_exception(502, {}, '<html>Bad gateway</html>')
+        assert isinstance(e, CurrencyComServerException)
+        assert e.message == '<html>Bad gateway</html>'
+
+    def test_rate_limit(self):
+        e = api_exception(429, {'Retry-After': '7'}, '{}')
+        assert isinstance(e, CurrencyComRateLimitException)
+        assert e.retry_after == 7
+
+    def test_retry_after_date(self):
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
+        assert parse_retry_after('soon') is None
+
+
+class TestRetryPolicy(object):
+    def test_only_idempotent_retried(self):
+        policy = RetryPolicy(max_retries=2)
+        error = CurrencyComServerException(503)
+        assert policy.should_retry('get', error, 0)
+        assert policy.should_retry('get', error, 1)
+        assert not policy.should_retry('get', error, 2)
+        assert not policy.should_retry('post', error, 0)
+        assert not policy.should_retry('delete', error, 0)
+
+    def test_client_errors_not_retried(self):
+        policy = RetryPolicy()
+        assert not policy.should_retry(
+            'get', CurrencyComAPIException(400), 0)
+        assert policy.should_retry(
+            'get', CurrencyComRequestException('timeout'), 0)
+        assert policy.should_retry(
+            'get', CurrencyComRateLimitException(429), 0)
+
+    def test_delay(self):
+        policy = RetryPolicy(backoff=1, max_backoff=4)
+        for attempt in range(5):
+            assert 0 <= policy.delay(None, attempt) <= min(4, 2 ** attempt)
+        error = CurrencyComRateLimitException(429, retry_after=30)
+        assert policy.delay(error, 0) == 30
+
+
+class TestCircuitBreaker(object):
+    def test_opens_and_recovers(self, monkeypatch):
+        now = {'t': 0}
+        monkeypatch.setattr('currencycom.resilience.time.monotonic',
+                            lambda: now['t'])
+        breaker = CircuitBreaker('depth', failure_threshold=2,
+                                 reset_timeout=10)
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+        with pytest.raises(CurrencyComCircuitOpenException) as e:
+            breaker.before_request()
+        assert e.value.retry_in == 10
+        now['t'] = 10
+        breaker.before_request()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        # only one trial request while half open
+        with pytest.raises(CurrencyComCircuitOpenException):
+            breaker.before_request()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.before_request()
+
+    def test_per_endpoint(self):
+        breakers = CircuitBreakers()
+        assert breakers['a'] is breakers['a']
+        assert breakers['a'] is not breakers['b']
+
+
+class TestClientResilience(object):
+    @pytest.fixture(autouse=True)
+    def set_client(self, monkeypatch):
+        self.sleep = MagicMock()
+        monkeypatch.setattr('currencycom.client.time.sleep', self.sleep)
+        self.client = Client('', '')
+
+    def test_status_raised(self, mock_requests):
+        mock_requests.return_value = response(400, '{"code": -1121}')
+        with pytest.raises(CurrencyComAPIException) as e:
+            self.client.get_order_book('TEST')
+        assert e.value.code == -1121
+        assert mock_requests.call_count == 1
+
+    def test_get_retried(self, mock_requests):
+        mock_requests.side_effect = [
+            requests.exceptions.ConnectTimeout('timeout'),
+            response(503),
+            response(200, '{"serverTime": 1}')]
+        assert self.client.get_server_time() == {'serverTime': 1}
+        assert mock_requests.call_count == 3
+        assert self.sleep.call_count == 2
+
+    def test_get_retries_exhausted(self, mock_requests):
+        mock_requests.side_effect = requests.exceptions.ConnectionError()
+        client = Client('', '', retry_policy=RetryPolicy(max_retries=1))
+        with pytest.raises(CurrencyComRequestException) as e:
+            client.get_server_time()
+        assert isinstance(e.value.__cause__,
+                          requests.exceptions.ConnectionError)
+        assert mock_requests.call_count == 2
+
+    def test_invalid_json(self, mock_requests):
+        mock_requests.return_value = response(200, 'not json')
+        client = Client('', '', retry_policy=RetryPolicy(max_retries=0))
+        with pytest.raises(CurrencyComInvalidResponseException):
+            client.get_server_time()
+
+    def test_signed_get_signed_again(self, mock_requests):
+        mock_requests.side_effect = [response(500), response(200)]
+        self.client._timestamp = MagicMock(side_effect=[1, 2])
+        self.client.get_open_orders()
+        first, second = mock_requests.call_args_list
+        assert 'timestamp=1&' in first.kwargs['params']
+        assert 'timestamp=2&' in second.kwargs['params']
+
+    def test_new_order_never_retried(self, monkeypatch):
+        post = MagicMock(side_effect=requests.exceptions.ReadTimeout())
+        monkeypatch.setattr('requests.Session.post', post)
+        with pytest.raises(CurrencyComRequestException):
+            self.client.new_order('TEST', OrderSide.BUY, OrderType.MARKET, 1)
+        assert post.call_count == 1
+        self.sleep.assert_not_called()
+
+    def test_rate_limit_pauses_limiter(self, mock_requests):
+        mock_requests.side_effect = [
+            response(429, '{}', {'Retry-After': '3'}), response(200)]
+        self.client.rate_limiter = MagicMock()
+        self.client.get_exchange_info()
+        self.client.rate_limiter.pause.assert_called_once_with(3)
+        assert self.sleep.call_args.args[0] >= 3
+
+    def test_circuit_opens(self, mock_requests):
+        mock_requests.return_value = response(500)
+        client = Client('', '',
+                        retry_policy=RetryPolicy(max_retries=0),
+                        circuit_breakers=CircuitBreakers(failure_threshold=2))
+        for _ in range(2):
+            with pytest.raises(CurrencyComServerException):
+                client.get_server_time()
+        with pytest.raises(CurrencyComCircuitOpenException):
+            client.get_server_time()
+        assert mock_requests.call_count == 2
+        # other endpoints are not affected
+        mock_requests.return_value = response(200)
+        client.get_exchange_info()
+
+
+class TestAsyncClientResilience(object):
+    def test_status_raised_and_retried(self, local_server, monkeypatch):
+        path = urlparse(CurrencyComConstants.SERVER_TIME_ENDPOINT).path
+        monkeypatch.setattr(CurrencyComConstants, 'SERVER_TIME_ENDPOINT',
+                            local_server.url + path)
+        local_server.statuses[path] = 503
+        local_server.responses[path] = {'code': -1, 'msg': 'down'}
+
+        async def main():
+            async with AsyncClient(
+                    '', '', retry_policy=RetryPolicy(max_retries=2,
+                                                     backoff=0.001)) as c:
+                await c.get_server_time()
+
+        with pytest.raises(CurrencyComServerException) as e:
+            asyncio.run(main())
+        assert e.value.message == 'down'
+        assert len(local_server.requests) == 3
@@ -0,0 +1,61 @@
+from unittest.mock import MagicMock
+
+from currencycom.client import Client
+from currencycom.session import PooledSession, PoolStats
+
+
+class TestPoolStats(object):
+    def test_empty(self):
+        assert PoolStats().as_dict() == {'hits': 0, 'misses': 0,
+                                         'requests': 0, 'hit_ratio': 0.0}
+
+    def test_record(self):
+        stats = PoolStats()
+        stats.record(False)
+        stats.record(True)
+        stats.record(True)
+        stats.record(True)
+        assert stats.as_dict() == {'hits': 3, 'misses': 1,
+                                   'requests': 4, 'hit_ratio': 0.75}
+        stats.reset()
+        assert stats.as_dict()['requests'] == 0
+
+
+class TestPooledSession(object):
+    def test_connection_reused(self, local_server):
+        session = PooledSession()
+        for _ in range(5):
+            session.get(local_server.url + '/time').json()
+        assert session.pool_stats()['misses'] == 1
+        assert session.pool_stats()['hits'] == 4
+
+    def test_no_keep_alive(self, local_server):
+        session = PooledSession(keep_alive=False)
+        for _ in range(3):
+            session.get(local_server.url + '/time').json()
+        assert session.pool_stats()['misses'] == 3
+
+    def test_default_timeout(self, local_server, monkeypatch):
+        session = PooledSession(timeout=3)
+        adapter = session.get_adapter(local_server.url)
+        send = MagicMock()
+        monkeypatch.setattr('requests.adapters.HTTPAdapter.send', send)
+        adapter.send('request')
+        send.assert_called_once_with('request', timeout=3)
+
+
+class TestClientSession(object):
+    def test_shared_session(self):
+        session = PooledSession()
+        assert Client('', '', session=session)._session is session
+
+    def test_public_and_signed_share_pool(self, local_server, monkeypatch):
+        monkeypatch.setattr(
+            'currencycom.client.CurrencyComConstants.SERVER_TIME_ENDPOINT',
+            local_server.url + '/time')
+        with Client('key', 'secret') as client:
+            client.get_server_time()
+            client._get(local_server.url + '/account')
+            client._post(local_server.url + '/order')
+            assert client.pool_stats()['hits'] == 2
+            assert client.pool_stats()['misses'] == 1
@@ -0,0 +1,37 @@
+import hashlib
+import hmac
+
+import pytest
+from requests.models import RequestEncodingMixin
+
+from currencycom.signing import Signer
+
+PARAMS = [
+    {},
+    {'symbol': 'BTC/USD', 'limit': 500, 'timestamp': 1577446511069},
+    {'symbol': 'Oil - Brent', 'recvWindow': None, 'showZeroBalance': False},
+    {'symbol': 'BTC%2FUSD_LEVERAGE', 'quantity': 0.001, 'price': 7173.6186},
+    {'stopLoss': 1e-05, 'takeProfit': 1e+20, 'guaranteedStopLoss': True},
+    {'symbols': ['BTC/USD', 'ETH/USD'], 'name': 'Ünïcode & co'},
+]
+
+
+class TestSigner(object):
+    @pytest.mark.parametrize('params', PARAMS)
+    def test_encode_same_as_requests(self, params):
+        # pylint: disable=no-member
+        assert Signer.encode(params) \
+            == RequestEncodingMixin._encode_params(params)
+
+    @pytest.mark.parametrize('params', PARAMS)
+    def test_signed_query(self, params):
+        query = RequestEncodingMixin._encode_params(params)
+        signature = hmac.new(b'secret', query.encode(),
+                             hashlib.sha256).hexdigest()
+        assert Signer(b'secret').signed_query(params) \
+            == query + '&signature=' + signature
+
+    def test_key_reused(self):
+        signer = Signer(b'secret')
+        assert signer.sign('a=1') == signer.sign('a=1') \
+            == hmac.new(b'secret', b'a=1', hashlib.sha256).hexdigest()
@@ -0,0 +1,201 @@
+from urllib.parse import urlparse
+
+import pytest
+
+from currencycom.client import (CandlesticksChartInervals, Client,
+                                NewOrderResponseType, OrderSide, OrderType)
+from currencycom.exceptions import (CurrencyComAPIException,
+                                    CurrencyComRateLimitException,
+                                    CurrencyComServerException)
+from currencycom.resilience import RetryPolicy
+from currencycom.signing import Signer
+from currencycom.simulator import (Faults, SimulatedExchange,
+                                   SimulatorServer, SymbolSpec,
+                                   redirect_endpoints)
+
+SYMBOLS = (SymbolSpec('BTC/USD', 'BTC', 'USD', 100.0, 1.0, 1.0),)
+
+
+class TestSimulatedExchange(object):
+    @pytest.fixture(autouse=True)
+    def set_exchange(self):
+        self.now = 1586953000.0
+        self.exchange = SimulatedExchange(
+            SYMBOLS, accounts={'key': 'secret'},
+            balances={'USD': 1000.0, 'BTC': 5.0}, levels=3,
+            clock=lambda: self.now)
+        self.signer = Signer(b'secret')
+
+    def signed(self, method, endpoint, api_key='key', signer=None,
+               **params):
+        params['timestamp'] = int(self.now * 1000)
+        query = (signer or self.signer).signed_query(params)
+        return self.exchange.handle(method, '/api/v1/' + endpoint, query,
+                                    api_key)
+
+    def balances(self):
+        status, account = self.signed('GET', 'account')
+        return {b['asset']: (b['free'], b['locked'])
+                for b in account['balances']}
+
+    def test_public(self):
+        status, book = self.exchange.handle('GET', '/api/v1/depth',
+                                            'symbol=BTC%2FUSD&limit=2')
+        assert status == 200
+        assert book['asks'] == [['101.0', '1.0'], ['102.0', '1.0']]
+        assert book['bids'] == [['99.0', '1.0'], ['98.0', '1.0']]
+        status, klines = self.exchange.handle(
+            'GET', '/api/v1/klines', 'symbol=BTC%2FUSD&interval=1h&limit=5')
+        assert len(klines) == 5
+        assert klines[1][0] - klines[0][0] == \
+            CandlesticksChartInervals.HOUR.to_milliseconds()
+        assert self.exchange.handle(
+            'GET', '/api/v1/klines',
+            'symbol=BTC%2FUSD&interval=1h&limit=5')[1] == klines
+        assert self.exchange.handle('GET', '/api/v1/nothing')[0] == 404
+        status, error = self.exchange.handle('GET', '/api/v1/depth',
+                                             'symbol=NOPE')
+        assert (status, error['code']) == (400, -1121)
+
+    def test_authentication(self):
+        assert self.signed('GET', 'account')[0] == 200
+        status, error = self.signed('GET', 'account', api_key='other')
+        assert (status, error['code']) == (401, -2015)
+        status, error = self.signed('GET', 'account',
+                                    signer=Signer(b'wrong'))
+        assert (status, error['code']) == (400, -1022)
+        query = self.signer.signed_query(
+            {'timestamp': int(self.now * 1000) - 6000})
+        status, error = self.exchange.handle('GET', '/api/v1/account', query,
+                                             'key')
+        assert (status, error['code']) == (400, -1021)
+        query = self.signer.signed_query(
+            {'timestamp': int(self.now * 1000) - 6000, 'recvWindow': 10000})
+        assert self.exchange.handle('GET', '/api/v1/account', query,
+                                    'key')[0] == 200
+
+    def test_market_order(self):
+        status, order = self.signed('POST', 'order', symbol='BTC/USD',
+                                    side='BUY', type='MARKET', quantity=1.5)
+        assert status == 200
+        assert order['status'] == 'FILLED'
+        assert order['executedQty'] == '1.5'
+        prices = [fill['price'] for fill in order['fills']]
+        assert prices == ['101.0', '102.0']
+        assert self.balances() == {'USD': (1000.0 - 101 - 51, 0.0),
+                                   'BTC': (6.5, 0.0)}
+        status, trades = self.signed('GET', 'myTrades', symbol='BTC/USD')
+        assert [trade['qty'] for trade in trades] == ['1.0', '0.5']
+        # The market makers refill the consumed level
+        book = self.exchange.handle('GET', '/api/v1/depth',
+                                    'symbol=BTC%2FUSD&limit=5')[1]
+        assert book['asks'] == [['102.0', '0.5'], ['103.0', '1.0'],
+                                ['104.0', '1.0']]
+
+    def test_limit_order_and_cancel(self):
+        status, order = self.signed('POST', 'order', symbol='BTC/USD',
+                                    side='BUY', type='LIMIT', price=90.0,
+                                    quantity=2.0, newOrderRespType='RESULT')
+        assert order['status'] == 'NEW'
+        assert self.balances()['USD'] == (820.0, 180.0)
+        status, orders = self.signed('GET', 'openOrders', symbol='BTC/USD')
+        assert [o['orderId'] for o in orders] == [order['orderId']]
+        status, cancelled = self.signed('DELETE', 'order', symbol='BTC/USD',
+                                        orderId=order['orderId'])
+        assert cancelled['status'] == 'CANCELED'
+        assert self.balances()['USD'] == (1000.0, 0.0)
+        status, error = self.signed('DELETE', 'order', symbol='BTC/USD',
+                                    orderId=order['orderId'])
+        assert (status, error['code']) == (400, -2011)
+
+    def test_resting_order_filled_by_another_account(self):
+        self.exchange.add_account('other', 'other-secret')
+        status, order = self.signed('POST', 'order', symbol='BTC/USD',
+                                    side='SELL', type='LIMIT', price=100.0,
+                                    quantity=1.0)
+        assert self.balances()['BTC'] == (4.0, 1.0)
+        status, taker = self.signed('POST', 'order', api_key='other',
+                                    signer=Signer(b'other-secret'),
+                                    symbol='BTC/USD', side='BUY',
+                                    type='MARKET', quantity=1.0)
+        assert taker['fills'][0]['price'] == '100.0'
+        assert self.balances() == {'USD': (1100.0, 0.0), 'BTC': (4.0, 0.0)}
+        assert self.signed('GET', 'openOrders')[1] == []
+
+    def test_insufficient_balance(self):
+        status, error = self.signed('POST', 'order', symbol='BTC/USD',
+                                    side='SELL', type='MARKET', quantity=6.0)
+        assert (status, error['code']) == (400, -2010)
+        assert self.balances()['BTC'] == (5.0, 0.0)
+
+    def test_leverage_position(self):
+        status, order = self.signed('POST', 'order',
+                                    symbol='BTC/USD_LEVERAGE', side='BUY',
+                                    type='MARKET', quantity=2.0, leverage=10)
+        assert order['status'] == 'FILLED'
+        status, positions = self.signed('GET', 'tradingPositions')
+        position, = positions['positions']
+        assert position['openQuantity'] == 2.0
+        assert position['openPrice'] == 101.5
+        assert position['margin'] == pytest.approx(20.3)
+        assert self.balances()['USD'] == (pytest.approx(979.7),
+                                          pytest.approx(20.3))
+        status, _ = self.signed('POST', 'closeTradingPosition',
+                                positionId=position['id'])
+        assert status == 200
+        assert self.signed('GET', 'tradingPositions')[1] == {'positions': []}
+        # Bought at 101 and 102, sold at 99 and 98
+        assert self.balances()['USD'] == (pytest.approx(1000.0 - 6.0), 0.0)
+
+    def test_stop_loss(self):
+        status, order = self.signed('POST', 'order',
+                                    symbol='BTC/USD_LEVERAGE', side='BUY',
+                                    type='MARKET', quantity=1.0)
+        position, = self.signed('GET', 'tradingPositions')[1]['positions']
+        status, _ = self.signed('POST', 'updateTradingPosition',
+                                positionId=position['id'], stopLoss=98.5)
+        assert status == 200
+        # Selling through the bids takes the price to the stop loss
+        self.signed('POST', 'order', symbol='BTC/USD', side='SELL',
+                    type='MARKET', quantity=2.0)
+        assert self.signed('GET', 'tradingPositions')[1] == {'positions': []}
+
+
+class TestSimulatorServer(object):
+    def test_client(self):
+        exchange = SimulatedExchange(accounts={'key': 'secret'})
+        with SimulatorServer(exchange) as url, redirect_endpoints(url):
+            client = Client('key', 'secret')
+            assert client.get_server_time()['serverTime'] > 0
+            order = client.new_order('ETH/USD', OrderSide.BUY,
+                                     OrderType.LIMIT, 1, price=150,
+                                     new_order_resp_type=NewOrderResponseType
+                                     .RESULT)
+            assert client.get_open_orders('ETH/USD')[0]['orderId'] \
+                == order['orderId']
+            assert client.cancel_order('ETH/USD', order['orderId'])[
+                'status'] == 'CANCELED'
+            with pytest.raises(CurrencyComAPIException) as e:
+                Client('key', 'wrong').get_account_info()
+            assert e.value.code == -1022
+
+    def test_faults(self):
+        faults = Faults(error_rate=1.0)
+        with SimulatorServer(faults=faults) as url, redirect_endpoints(url):
+            client = Client('', '', retry_policy=RetryPolicy(max_retries=0))
+            with pytest.raises(CurrencyComServerException):
+                client.get_server_time()
+            faults.error_rate = 0.0
+            faults.rate_limit_rate = 1.0
+            with pytest.raises(CurrencyComRateLimitException) as e:
+                client.get_server_time()
+            assert e.value.retry_after == 1.0
+            faults.rate_limit_rate = 0.0
+            assert 'serverTime' in client.get_server_time()
+
+    def test_port_in_use(self):
+        with SimulatorServer() as url:
+            server = SimulatorServer(port=urlparse(url).port)
+            with pytest.raises(OSError):
+                server.start()
+            server.stop()
@@ -0,0 +1,94 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from currencycom.client import CandlesticksChartInervals
+
+np = pytest.importorskip('numpy')
+
+from currencycom.store import KlineStore  # noqa: E402
+
+MINUTE = CandlesticksChartInervals.MINUTE
+
+
+def fake_iter_klines(symbol, interval, start, end):
+    step = interval.to_milliseconds()
+    first = start + (-start) % step
+    for t in range(first, end + 1, step):
+        yield [t, str(t), str(t + 1), str(t - 1), str(t), '1']
+
+
+class TestKlineStore(object):
+    @pytest.fixture(autouse=True)
+    def set_store(self, tmp_path):
+        self.client = MagicMock()
+        self.client.iter_klines = MagicMock(side_effect=fake_iter_klines)
+        self.store = KlineStore(str(tmp_path), self.client)
+        self.now = int(time.time() * 1000)
+        self.now -= self.now % 60000
+
+    def test_empty_store_requires_start(self):
+        with pytest.raises(ValueError):
+            self.store.sync('BTC/USD', MINUTE)
+
+    def test_empty(self):
+        bars = self.store.klines('BTC/USD', MINUTE)
+        assert len(bars.open_time) == 0
+
+    def test_sync_only_closed_bars(self):
+        start = self.now - 10 * 60000
+        added = self.store.sync('BTC/USD', MINUTE, start_time=start)
+        bars = self.store.klines('BTC/USD', MINUTE)
+        assert added == len(bars.open_time) == self.store.count(
+            'BTC/USD', MINUTE)
+        assert bars.open_time[0] == start
+        assert bars.open_time[-1] + 60000 <= time.time() * 1000
+        assert bars.high.tolist() == (bars.open_time + 1).tolist()
+
+    def test_incremental_sync(self):
+        start = self.now - 10 * 60000
+        self.store.sync('BTC/USD', MINUTE, start_time=start)
+        last = int(self.store.klines('BTC/USD', MINUTE).open_time[-1])
+        self.client.iter_klines.reset_mock()
+        self.store.sync('BTC/USD', MINUTE)
+        for c in self.client.iter_klines.call_args_list:
+            assert c.args[2] == last + 60000
+        open_times = self.store.klines('BTC/USD', MINUTE).open_time
+        assert np.all(np.diff(open_times) == 60000)
+
+    def test_sync_missing_head(self):
+        start = self.now - 10 * 60000
+        self.store.sync('BTC/USD', MINUTE, start_time=start)
+        self.client.iter_klines.reset_mock()
+        self.store.sync('BTC/USD', MINUTE, start_time=start - 5 * 60000)
+        head_call = self.client.iter_klines.call_args_list[0]
+        assert head_call.args[2:] == (start - 5 * 60000, start - 1)
+        open_times = self.store.klines('BTC/USD', MINUTE).open_time
+        assert open_times[0] == start - 5 * 60000
+        assert np.all(np.diff(open_times) == 60000)
+
+    def test_range_query(self):
+        start = self.now - 100 * 60000
+        self.store.sync('BTC/USD', MINUTE, start_time=start)
+        self.client.iter_klines.reset_mock()
+        bars = self.store.klines('BTC/USD', MINUTE,
+                                 start_time=start + 10 * 60000,
+                                 end_time=start + 19 * 60000)
+        assert bars.open_time.tolist() == [start + i * 60000
+                                           for i in range(10, 20)]
+        assert isinstance(bars.close, np.memmap)
+        self.client.iter_klines.assert_not_called()
+
+    def test_interrupted_append_ignored(self, tmp_path):
+        start = self.now - 10 * 60000
+        self.store.sync('BTC/USD', MINUTE, start_time=start)
+        count = self.store.count('BTC/USD', MINUTE)
+        directory = self.store._directory('BTC/USD', MINUTE)
+        with open(self.store._column_path(directory, 'open_time'),
+                  'ab') as f:
+            f.write(b'\0' * 8)
+        assert self.store.count('BTC/USD', MINUTE) == count
+        self.store.sync('BTC/USD', MINUTE)
+        open_times = self.store.klines('BTC/USD', MINUTE).open_time
+        assert np.all(np.diff(open_times) == 60000)
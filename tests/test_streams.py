@@ -0,0 +1,254 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from currencycom.client import CandlesticksChartInervals
+from currencycom.exceptions import (CurrencyComStreamException,
+                                    CurrencyComStreamTimeoutException)
+from currencycom.streams import Overflow, StreamClient, StreamType
+
+
+class StandInServer(object):
+    """
+    Local WebSocket server answering OK to every request
+    """
+
+    def __init__(self):
+        self.received = []
+        self.sockets = []
+        self.reject = set()
+        self.silent = set()
+        self.url = None
+        self._runner = None
+
+    async def _handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets.append(ws)
+        async for message in ws:
+            data = json.loads(message.data)
+            self.received.append(data)
+            if data['destination'] in self.silent:
+                continue
+            status = 'ERROR' if data['destination'] in self.reject else 'OK'
+            await ws.send_json({'status': status,
+                                'correlationId': str(data['correlationId']),
+                                'destination': data['destination'],
+                                'payload': {}})
+        return ws
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/connect', self._handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', 0).start()
+        port = self._runner.addresses[0][1]
+        self.url = 'ws://127.0.0.1:{}/connect'.format(port)
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+    async def push(self, destination, payload):
+        for ws in self.sockets:
+            if not ws.closed:
+                await ws.send_json({'destination': destination,
+                                    'payload': payload})
+
+    async def drop(self):
+        for ws in self.sockets:
+            await ws.close()
+
+    def destinations(self):
+        return [m['destination'] for m in self.received
+                if m['destination'] != 'ping']
+
+
+async def until(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.005)
+
+
+def run_with_server(test, **kwargs):
+    async def main():
+        server = StandInServer()
+        await server.start()
+        try:
+            async with StreamClient(server.url, **kwargs) as client:
+                await test(server, client)
+        finally:
+            await server.stop()
+
+    asyncio.run(main())
+
+
+class TestStreamClient(object):
+    def test_subscribe_and_iterate(self):
+        async def test(server, client):
+            depth = await client.subscribe_depth(['BTC/USD', 'ETH/USD'])
+            assert server.received[0]['destination'] == \
+                'depthMarketData.subscribe'
+            assert server.received[0]['payload'] == {
+                'symbols': ['BTC/USD', 'ETH/USD']}
+            await server.push('depthMarketData.update',
+                              {'symbol': 'BTC/USD', 'data': {'bid': 1}})
+            await server.push('depthMarketData.update',
+                              {'symbol': 'XRP/USD', 'data': {}})
+            await server.push('internal.quote', {'symbolName': 'BTC/USD'})
+            await server.push('depthMarketData.update',
+                              {'symbol': 'ETH/USD', 'data': {}})
+            events = [await depth.__anext__(), await depth.__anext__()]
+            assert [e.symbol for e in events] == ['BTC/USD', 'ETH/USD']
+            assert events[0].stream is StreamType.DEPTH
+            assert events[0].payload['data'] == {'bid': 1}
+
+        run_with_server(test)
+
+    def test_callbacks(self):
+        async def test(server, client):
+            events = []
+
+            async def on_trade(event):
+                events.append(event)
+
+            await client.subscribe_trades('BTC/USD', callback=on_trade)
+            await client.subscribe_ticker('BTC/USD', callback=events.append)
+            await server.push('internal.trade', {'symbol': 'BTC/USD'})
+            await server.push('internal.quote', {'symbolName': 'BTC/USD'})
+            await until(lambda: len(events) == 2)
+            assert [e.stream for e in events] == [StreamType.TRADES,
+                                                  StreamType.TICKER]
+
+        run_with_server(test)
+
+    def test_klines_interval(self):
+        async def test(server, client):
+            with pytest.raises(ValueError):
+                await client.subscribe(StreamType.KLINES, 'BTC/USD')
+            klines = await client.subscribe_klines(
+                'BTC/USD', CandlesticksChartInervals.MINUTE)
+            assert server.received[0]['payload'] == {
+                'symbols': ['BTC/USD'], 'intervals': ['1m']}
+            await server.push('ohlc.event',
+                              {'symbol': 'BTC/USD', 'interval': '5m'})
+            await server.push('ohlc.event',
+                              {'symbol': 'BTC/USD', 'interval': '1m'})
+            event = await klines.__anext__()
+            assert event.payload['interval'] == '1m'
+
+        run_with_server(test)
+
+    def test_unsubscribe(self):
+        async def test(server, client):
+            first = await client.subscribe_depth(['BTC/USD', 'ETH/USD'])
+            await client.subscribe_depth(['ETH/USD'])
+            assert server.received[1]['payload'] == {
+                'symbols': ['BTC/USD', 'ETH/USD']}
+            await first.unsubscribe()
+            assert server.received[2]['destination'] == \
+                'depthMarketData.unsubscribe'
+            assert server.received[2]['payload'] == {'symbols': ['BTC/USD']}
+            assert [e async for e in first] == []
+
+        run_with_server(test)
+
+    def test_rejected_subscription(self):
+        async def test(server, client):
+            server.reject.add('marketData.subscribe')
+            with pytest.raises(CurrencyComStreamException) as error:
+                await client.subscribe_ticker('BTC/USD')
+            assert error.value.status == 'ERROR'
+            assert client._subscriptions == []
+
+        run_with_server(test)
+
+    def test_reconnect_resubscribes(self):
+        async def test(server, client):
+            depth = await client.subscribe_depth('BTC/USD')
+            await client.subscribe_ticker('ETH/USD',
+                                          callback=lambda event: None)
+            await server.drop()
+            await until(lambda: len(server.sockets) == 2
+                        and len(server.destinations()) == 4)
+            assert client.reconnects == 1
+            assert sorted(server.destinations()[2:]) == [
+                'depthMarketData.subscribe', 'marketData.subscribe']
+            await server.push('depthMarketData.update',
+                              {'symbol': 'BTC/USD'})
+            assert (await depth.__anext__()).symbol == 'BTC/USD'
+
+        run_with_server(test, reconnect_delay=0.01)
+
+    def test_drop_oldest(self):
+        async def test(server, client):
+            depth = await client.subscribe_depth('BTC/USD', maxsize=2)
+            for i in range(5):
+                await server.push('depthMarketData.update',
+                                  {'symbol': 'BTC/USD', 'ts': i})
+            await until(lambda: depth.dropped == 3)
+            assert [(await depth.__anext__()).payload['ts']
+                    for _ in range(2)] == [3, 4]
+
+        run_with_server(test)
+
+    def test_drop_newest(self):
+        async def test(server, client):
+            depth = await client.subscribe_depth(
+                'BTC/USD', maxsize=2, overflow=Overflow.DROP_NEWEST)
+            for i in range(5):
+                await server.push('depthMarketData.update',
+                                  {'symbol': 'BTC/USD', 'ts': i})
+            await until(lambda: depth.dropped == 3)
+            assert [(await depth.__anext__()).payload['ts']
+                    for _ in range(2)] == [0, 1]
+
+        run_with_server(test)
+
+    def test_unsubscribe_blocked(self):
+        async def test(server, client):
+            depth = await client.subscribe_depth(
+                'BTC/USD', maxsize=1, overflow=Overflow.BLOCK)
+            ticker = await client.subscribe_ticker('ETH/USD')
+            for i in range(3):
+                await server.push('depthMarketData.update',
+                                  {'symbol': 'BTC/USD', 'ts': i})
+            await until(lambda: depth._queue.full())
+            # The reader waits for the consumer of depth, which stopped
+            await asyncio.wait_for(depth.unsubscribe(), 1)
+            await server.push('internal.quote', {'symbolName': 'ETH/USD'})
+            event = await asyncio.wait_for(ticker.__anext__(), 1)
+            assert event.symbol == 'ETH/USD'
+            assert [e.payload['ts'] async for e in depth] == [0]
+
+        run_with_server(test)
+
+    def test_ack_timeout(self):
+        async def test(server, client):
+            server.silent.add('trades.subscribe')
+            with pytest.raises(CurrencyComStreamTimeoutException) as error:
+                await client.subscribe_trades('BTC/USD')
+            assert isinstance(error.value, CurrencyComStreamException)
+            assert client._subscriptions == []
+
+        run_with_server(test, ack_timeout=0.05)
+
+    def test_close_ends_iteration(self):
+        async def main():
+            server = StandInServer()
+            await server.start()
+            client = StreamClient(server.url)
+            await client.connect()
+            depth = await client.subscribe_depth('BTC/USD')
+            consumer = asyncio.ensure_future(
+                asyncio.wait_for(depth.__anext__(), 2))
+            await asyncio.sleep(0.01)
+            await client.close()
+            with pytest.raises(StopAsyncIteration):
+                await consumer
+            await server.stop()
+
+        asyncio.run(main())
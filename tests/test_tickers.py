@@ -0,0 +1,81 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from currencycom.tickers import TickerPoller
+
+np = pytest.importorskip('numpy')
+
+
+def ticker(symbol, last_price, bid_price='1.0', volume=None):
+    return {'symbol': symbol, 'lastPrice': last_price, 'bidPrice': bid_price,
+            'volume': volume, 'openTime': 0, 'closeTime': 1}
+
+
+class TestTickerPoller(object):
+    @pytest.fixture(autouse=True)
+    def set_poller(self):
+        self.client = MagicMock()
+        self.poller = TickerPoller(self.client)
+        self.deltas = []
+        self.poller.subscribe(self.deltas.append)
+
+    def answer(self, *tickers):
+        self.client.get_24h_price_change = MagicMock(
+            return_value=list(tickers))
+
+    def test_first_poll_publishes_all(self):
+        self.answer(ticker('A', '1'), ticker('B', '2'))
+        delta = self.poller.poll()
+        assert [t['symbol'] for t in delta.changed] == ['A', 'B']
+        assert self.deltas == [delta]
+        assert self.poller['B']['lastPrice'] == '2'
+        assert self.poller.values.shape == (2, len(self.poller.fields))
+
+    def test_only_changes_published(self):
+        self.answer(ticker('A', '1'), ticker('B', '2'), ticker('C', '3'))
+        self.poller.poll()
+        changed = ticker('B', '2.5')
+        self.answer(ticker('A', '1'), changed, ticker('C', '3'))
+        delta = self.poller.poll()
+        assert delta.changed == [changed]
+        assert delta.removed == []
+
+    def test_nothing_changed(self):
+        self.answer(ticker('A', '1'), ticker('B', None))
+        self.poller.poll()
+        self.answer(dict(ticker('A', '1'), closeTime=2), ticker('B', None))
+        delta = self.poller.poll()
+        assert delta.changed == [] and delta.removed == []
+        assert len(self.deltas) == 1
+
+    def test_listed_and_removed(self):
+        self.answer(ticker('A', '1'), ticker('B', '2'), ticker('C', '3'))
+        self.poller.poll()
+        self.answer(ticker('C', '3'), ticker('D', '4'), ticker('A', '1.5'))
+        delta = self.poller.poll()
+        assert [t['symbol'] for t in delta.changed] == ['D', 'A']
+        assert delta.removed == ['B']
+        self.answer(ticker('C', '3'), ticker('D', '4'), ticker('A', '1.5'))
+        assert self.poller.poll().changed == []
+
+    def test_null_becomes_value(self):
+        self.answer(ticker('A', '1'))
+        self.poller.poll()
+        self.answer(ticker('A', '1', volume='10'))
+        assert len(self.poller.poll().changed) == 1
+
+    def test_unsubscribe(self):
+        self.poller.unsubscribe(self.deltas.append)
+        self.answer(ticker('A', '1'))
+        self.poller.poll()
+        assert self.deltas == []
+
+    def test_async_poll(self):
+        async def get_24h_price_change():
+            return [ticker('A', '1')]
+
+        self.client.get_24h_price_change = get_24h_price_change
+        delta = asyncio.run(self.poller.async_poll())
+        assert len(delta.changed) == 1
@@ -0,0 +1,111 @@
+import asyncio
+from unittest.mock import MagicMock
+from urllib.parse import parse_qs
+
+import pytest
+
+from currencycom.client import Client, CurrencyComConstants
+from currencycom.timesync import TimeSync
+
+
+class TestTimeSync(object):
+    @pytest.fixture(autouse=True)
+    def set_sync(self, monkeypatch):
+        self.client = MagicMock()
+        self.sync = TimeSync(self.client, samples=4)
+        self.clock = {'wall': 1000.0, 'perf': 0.0}
+        monkeypatch.setattr('currencycom.timesync.time.time',
+                            lambda: self.clock['wall'])
+        monkeypatch.setattr('currencycom.timesync.time.perf_counter',
+                            lambda: self.clock['perf'])
+
+    def answer(self, server_time, rtt_ms):
+        def get_server_time():
+            self.clock['wall'] += rtt_ms / 1000
+            self.clock['perf'] += rtt_ms / 1000
+            return {'serverTime': server_time}
+        self.client.get_server_time = MagicMock(side_effect=get_server_time)
+
+    def test_offset(self):
+        # sent at 1000000 ms, server answered 1500 ms ahead mid-way
+        self.answer(1000000 + 10 + 1500, 20)
+        self.sync.sample()
+        assert self.sync.rtt == 20
+        assert self.sync.offset == 1500
+        assert self.sync.timestamp() == int(self.clock['wall'] * 1000 + 1500)
+
+    def test_min_rtt_sample_used(self):
+        self.answer(1000000 + 100 + 1600, 200)
+        self.sync.sample()
+        now = self.clock['wall'] * 1000
+        self.answer(now + 5 + 1500, 10)
+        self.sync.sample()
+        now = self.clock['wall'] * 1000
+        self.answer(now + 150 + 1400, 300)
+        self.sync.sample()
+        assert self.sync.rtt == pytest.approx(10)
+        assert self.sync.offset == pytest.approx(1500)
+
+    def test_recv_window(self):
+        assert self.sync.recv_window() is None
+        self.answer(1000000 + 10, 20)
+        self.sync.sample()
+        assert self.sync.recv_window() == TimeSync.DEFAULT_RECV_WINDOW
+        now = self.clock['wall'] * 1000
+        self.answer(now + 2500, 5000)
+        self.sync.sample()
+        assert self.sync.recv_window() == 15000
+        now = self.clock['wall'] * 1000
+        self.answer(now + 50000, 100000)
+        self.sync.sample()
+        assert self.sync.recv_window() \
+            == CurrencyComConstants.RECV_WINDOW_MAX_LIMIT
+
+    def test_async_sample(self):
+        async def get_server_time():
+            return {'serverTime': 1000000 + 1500}
+        self.client.get_server_time = get_server_time
+        asyncio.run(self.sync.async_sample())
+        assert self.sync.offset == 1500
+
+    def test_async_run(self, monkeypatch):
+        answers = [{'serverTime': 1000000 + 1500}] * 2 \
+            + [ValueError('down'), {'serverTime': 1000000 + 1400}]
+        sleeps = []
+
+        async def get_server_time():
+            answer = answers.pop(0)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+
+        async def sleep(delay):
+            sleeps.append(delay)
+            if not answers:
+                raise asyncio.CancelledError
+
+        self.client.get_server_time = get_server_time
+        monkeypatch.setattr('currencycom.timesync.asyncio.sleep', sleep)
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(self.sync.async_run(samples=2))
+        assert sleeps == [self.sync.interval] * 3
+        assert self.sync.offset == 1400
+        with pytest.raises(TypeError):
+            self.sync.start()
+
+    def test_failed_sample_logged(self, caplog):
+        self.client.get_server_time = MagicMock(side_effect=ValueError)
+        self.sync._stop.wait = MagicMock(side_effect=[False, True])
+        self.sync._run()
+        assert 'Server time sample failed' in caplog.text
+
+    def test_client_signs_with_server_time(self):
+        self.answer(1000000 + 10 + 1500, 20)
+        self.sync.sample()
+        client = Client('', 'secret', time_sync=self.sync)
+        params = parse_qs(client._get_params_with_signature(symbol='TEST'))
+        assert params['timestamp'] == [str(self.sync.timestamp())]
+        assert params['recvWindow'] == [str(TimeSync.DEFAULT_RECV_WINDOW)]
+        params = parse_qs(client._get_params_with_signature(recvWindow=100))
+        assert params['recvWindow'] == ['100']
+        self.client.get_server_time.assert_called_once_with()